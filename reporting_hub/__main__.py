@@ -1,14 +1,35 @@
 from __future__ import annotations
 
 import argparse
+import os
 import sys
+import time
 
 from pathlib import Path
 
-from .app import App
-from .config.constants import SETTINGS_PATH
+from .config.constants import (
+    ADDIN_STATES_PATH,
+    ARTIFACTS_DIR,
+    CALC_PROFILES_DIR,
+    EXCEL_ATTACH_PATH,
+    EXCEL_INSTANCES_PATH,
+    PREFLIGHT_CACHE_PATH,
+    RUN_HISTORY_PATH,
+    SETTINGS_PATH,
+)
 from .config.io import load_settings
+from .config.models import RequiredInput
+from .excel.addins import AddinStateStore
+from .excel.attach import AttachStore
+from .excel.lifecycle import ExcelLifecycle, PidRegistry
+from .services.artifacts import ArtifactStore
+from .services.lease import ON_BUSY, LeaseManager, RunBusy
 from .services.macro_runner import MacroRunner, RunRequest
+from .services.preflight import ModuleCache, preflight
+from .services.readiness import ReadinessGate, format_status
+from .services.run_history import RunHistory, format_history
+from .utils.log import setup_logging, shutdown_logging
+from .utils.timing import process_uptime
 
 
 def _parse_args(argv: list[str]) -> argparse.Namespace:
@@ -21,16 +42,122 @@ def _parse_args(argv: list[str]) -> argparse.Namespace:
     p.add_argument("--args", dest="args", default="", help="Args separated by ';'")
     p.add_argument("--excel-mode", dest="excel_mode", default="", help="minimized|hidden|visible")
     p.add_argument("--quit-excel", action="store_true", help="Quit Excel after running (headless)")
+    p.add_argument(
+        "--attach",
+        action="store_true",
+        help="Reuse the Excel instance that already has the workbook open (GUI or previous run); "
+        "same as 'excel_attach' in settings.json",
+    )
+    p.add_argument(
+        "--watch",
+        action="store_true",
+        help="Headless: wait without time limit until the workbook and the profile's required inputs "
+        "are ready, then run",
+    )
+    p.add_argument(
+        "--on-busy",
+        choices=ON_BUSY,
+        default="",
+        help="Headless: when another process or machine is running the same workbook, abort, wait "
+        "for it, or follow its status (attach); enables the run lease ('run_lease' in settings.json)",
+    )
+    p.add_argument(
+        "--metrics-out",
+        dest="metrics_out",
+        default="",
+        help="Write run timings (headless): *.prom = Prometheus text file, else JSON lines (appended)",
+    )
+    p.add_argument(
+        "--verify-artifacts",
+        nargs="?",
+        const="fast",
+        choices=["fast", "full"],
+        default=None,
+        help="Check the artifact store (fast: stat only, full: re-hash)",
+    )
+    p.add_argument(
+        "--watchdog",
+        nargs="?",
+        type=float,
+        const=1.0,
+        default=0.0,
+        metavar="SECONDS",
+        help="GUI: log main-thread stacks when the UI stalls longer than SECONDS (default 1.0)",
+    )
+    p.add_argument(
+        "--profile",
+        nargs="?",
+        const="reporting_hub.pstats",
+        default="",
+        metavar="PATH",
+        help="Run under cProfile (main thread) and write pstats to PATH",
+    )
+    p.add_argument(
+        "--restart",
+        action="store_true",
+        help="Multi-step macros: run every step again instead of resuming a failed run",
+    )
+    p.add_argument(
+        "--history",
+        nargs="?",
+        type=int,
+        const=10,
+        default=0,
+        metavar="N",
+        help="Show the last N runs with per-step durations (filtered by --macro if given)",
+    )
+    p.add_argument(
+        "--profile-calc",
+        nargs="?",
+        const="auto",
+        default="",
+        metavar="JSON",
+        help="Time a full recalculation and each sheet of the workbook (--pilot / --macro); "
+        "JSON report to JSON (default: .reporting_hub/calc_profiles/)",
+    )
+    p.add_argument(
+        "--analyze",
+        nargs="?",
+        const="pilot",
+        default="",
+        metavar="WORKBOOK",
+        help="Static analysis of an .xlsx/.xlsm without Excel (default: the pilot / --macro workbook)",
+    )
+    p.add_argument("--json", action="store_true", help="--analyze: print the report as JSON")
+    p.add_argument(
+        "--extract",
+        nargs="*",
+        default=None,
+        metavar="SOURCE OUTPUT",
+        help="Read values from the saved workbook without Excel: SOURCE ('Sheet!A1:D10', sheet, "
+        "defined name or table) to OUTPUT (.csv/.parquet); without arguments, the --macro extracts",
+    )
+    p.add_argument("--chunk-rows", type=int, default=50_000, help="--extract: rows per written block")
+    p.add_argument(
+        "--bench-startup",
+        action="store_true",
+        help="Open the GUI, print the time from process start to an interactive window, then exit",
+    )
     return p.parse_args(argv)
 
 
-def _log_to_stdout(msg: str) -> None:
-    print(msg, flush=True)
-
-
 def main(argv: list[str] | None = None) -> int:
     ns = _parse_args(list(argv) if argv is not None else sys.argv[1:])
 
+    if not ns.profile:
+        return _run(ns)
+
+    import cProfile
+
+    prof = cProfile.Profile()
+    try:
+        return prof.runcall(_run, ns)
+    finally:
+        prof.dump_stats(ns.profile)
+        print(f"Profile written to {ns.profile} (python -m pstats {ns.profile})", flush=True)
+
+
+def _run(ns: argparse.Namespace) -> int:
     settings = load_settings(SETTINGS_PATH)
 
     if ns.list:
@@ -41,6 +168,28 @@ def main(argv: list[str] | None = None) -> int:
             print(f"{macro_id}: {m.label} -> {m.macro}")
         return 0
 
+    if ns.history:
+        print(format_history(RunHistory(RUN_HISTORY_PATH).read(ns.history, profile=ns.macro_id)))
+        return 0
+
+    if ns.profile_calc:
+        return _profile_calc(ns, settings)
+
+    if ns.analyze:
+        return _analyze(ns, settings)
+
+    if ns.extract is not None:
+        return _extract(ns, settings)
+
+    if ns.verify_artifacts:
+        report = ArtifactStore(ARTIFACTS_DIR).verify(full=ns.verify_artifacts == "full")
+        for digest in report.missing:
+            print(f"missing: {digest}")
+        for digest in report.corrupted:
+            print(f"corrupted: {digest}")
+        print(f"{report.checked} blob(s) checked, {'OK' if report.ok else 'ERRORS'}.")
+        return 0 if report.ok else 1
+
     if ns.headless:
         # Resolve request from CLI overrides / settings
         if ns.macro_id:
@@ -51,10 +200,18 @@ def main(argv: list[str] | None = None) -> int:
             workbook_path = (ns.pilot_path or m.workbook_path or settings.pilot_path).strip()
             macro_name = (ns.macro_name or m.macro or settings.pilot_macro).strip()
             raw_args = ns.args if ns.args else (m.args or settings.pilot_args)
+            profile, outputs, execution, launch = ns.macro_id, list(m.outputs), m.execution, m.launch
+            requires, wait_inputs_s = list(m.requires), m.wait_inputs_s
+            inputs, extracts = list(m.inputs), list(m.extracts)
+            # --macro-name runs that single macro instead of the profile's steps
+            steps = [] if ns.macro_name else list(m.steps)
         else:
             workbook_path = (ns.pilot_path or settings.pilot_path).strip()
             macro_name = (ns.macro_name or settings.pilot_macro).strip()
             raw_args = ns.args if ns.args else settings.pilot_args
+            profile, outputs, execution, launch = "", [], None, None
+            requires, wait_inputs_s = [], 0
+            inputs, extracts, steps = [], [], []
 
         args = [a.strip() for a in str(raw_args).split(";") if a.strip()]
         excel_mode = (ns.excel_mode or settings.excel_mode or "minimized").strip().lower()
@@ -66,16 +223,204 @@ def main(argv: list[str] | None = None) -> int:
             print("Missing macro name. Use --macro-name or set 'pilot_macro' in settings.json.")
             return 2
 
-        runner = MacroRunner(_log_to_stdout)
-        runner.run(
-            RunRequest(workbook_path=workbook_path, macro_name=macro_name, args=args, excel_mode=excel_mode),
-            quit_excel_when_done=bool(ns.quit_excel),
+        attach_store = AttachStore(EXCEL_ATTACH_PATH) if (ns.attach or settings.excel_attach) else None
+        leases = None
+        # Attach mode always takes the run lease: the instance of a live run is never taken over
+        if ns.on_busy or settings.run_lease or attach_store is not None:
+            leases = LeaseManager(settings.run_lease_dir, ttl_s=settings.run_lease_ttl_s)
+        runner = MacroRunner(
+            artifacts_max_mb=settings.artifacts_max_mb,
+            attach_store=attach_store,
+            leases=leases,
+            on_busy=ns.on_busy or settings.run_lease_on_busy,
+        )
+
+        # Readiness gate before the preflight: the workbook itself may still be syncing
+        if ns.watch and not requires:
+            requires = [RequiredInput(path=os.path.basename(workbook_path))]
+        if requires:
+            gate = ReadinessGate(
+                requires,
+                os.path.dirname(os.path.abspath(workbook_path)),
+                own_locks=runner.own_locks(workbook_path),  # attach: the kept instance's ~$ lock
+            )
+            timeout = None if ns.watch or not wait_inputs_s else float(wait_inputs_s)
+            if not gate.wait(timeout, on_status=lambda st: print(f"Waiting for inputs: {format_status(st)}")):
+                print(f"Inputs not ready after {wait_inputs_s}s: {format_status(gate.check())}")
+                return 2
+            print(f"{len(requires)} required input(s) ready.")
+
+        # Path / extension / procedure names checked before Excel is launched
+        macros = [s.macro for s in steps] or [macro_name]
+        check = preflight(workbook_path, macros, ModuleCache(PREFLIGHT_CACHE_PATH))
+        if check.summary():
+            print(check.summary())
+        if not check.ok:
+            return 2
+
+        # Timestamped, levelled records on stdout + the rotating log files
+        setup_logging(console=True)
+        # Excel instances left behind by a crashed run are terminated first
+        lifecycle = ExcelLifecycle(
+            PidRegistry(EXCEL_INSTANCES_PATH),
+            attach_store=attach_store,
+            addin_store=AddinStateStore(ADDIN_STATES_PATH),
         )
+        lifecycle.attach(runner.controller)
+        try:
+            lifecycle.reap_orphans()
+        except Exception as e:
+            print(f"Orphan Excel cleanup failed: {e}")
+        try:
+            lifecycle.restore_addins()
+        except Exception as e:
+            print(f"COM add-in restore failed: {e}")
+        busy = ""
+        try:
+            runner.run(
+                RunRequest(
+                    workbook_path=workbook_path,
+                    macro_name=macro_name,
+                    args=args,
+                    excel_mode=excel_mode,
+                    profile=profile,
+                    outputs=outputs,
+                    inputs=inputs,
+                    extracts=extracts,
+                    execution=execution,
+                    launch=launch,
+                    steps=steps,
+                    resume=not ns.restart,
+                ),
+                quit_excel_when_done=bool(ns.quit_excel),
+            )
+        except RunBusy as e:
+            busy = str(e)  # not an error of this run: no traceback
+        finally:
+            if not ns.quit_excel and attach_store is None:
+                lifecycle.release(runner.controller.excel_pid)  # left open for the user
+            shutdown_logging()  # drain queued records before the report
+            # Also reported when the run fails: shows where the time went.
+            if runner.timer is not None:
+                print(runner.timer.summary(), flush=True)
+                print(runner.controller.com_stats.summary(), flush=True)
+                if ns.metrics_out:
+                    try:
+                        runner.timer.write(Path(ns.metrics_out))
+                    except OSError as e:
+                        print(f"Could not write metrics: {e}")
+        if busy:
+            print(busy)
+            return 3
         return 0
 
-    # GUI
-    app = App()
+    # GUI (imported here: the CLI paths do not pay for customtkinter)
+    from .app import App
+
+    app = App(watchdog_s=max(0.0, ns.watchdog or 0.0))
+    if ns.bench_startup:
+        return _bench_startup(app)
+    app.mainloop()
+    return 0
+
+
+def _analyze(ns: argparse.Namespace, settings) -> int:
+    from .services.xlsx_analyzer import analyze_workbook
+
+    path = ns.analyze
+    if path == "pilot":
+        m = settings.macros.get(ns.macro_id) if ns.macro_id else None
+        path = (ns.pilot_path or (m.workbook_path if m else "") or settings.pilot_path).strip()
+    if not path or not Path(path).is_file():
+        print(f"Workbook not found: {path or '(none)'}")
+        return 2
+    try:
+        report = analyze_workbook(Path(path))
+    except Exception as e:  # not a ZIP package (.xls, .xlsb...), corrupted file
+        print(f"Cannot analyze {path}: {e}")
+        return 1
+    print(report.to_json() if ns.json else report.to_text())
+    return 0
+
+
+def _extract(ns: argparse.Namespace, settings) -> int:
+    from .config.models import ExtractSpec
+    from .services.extract import resolve_path
+    from .services.xlsx_extract import extract_file
+
+    m = settings.macros.get(ns.macro_id) if ns.macro_id else None
+    workbook_path = (ns.pilot_path or (m.workbook_path if m else "") or settings.pilot_path).strip()
+    if not workbook_path or not Path(workbook_path).is_file():
+        print(f"Workbook not found: {workbook_path or '(none)'}")
+        return 2
+    if len(ns.extract) == 2:
+        specs = [ExtractSpec(source=ns.extract[0], output=ns.extract[1], chunk_rows=ns.chunk_rows)]
+    elif not ns.extract and m is not None and m.extracts:
+        specs = list(m.extracts)
+    else:
+        print("Usage: --extract SOURCE OUTPUT, or --macro <id> --extract for the profile's extracts.")
+        return 2
+
+    base_dir = str(Path(workbook_path).resolve().parent)
+    for spec in specs:
+        output = resolve_path(spec.output, base_dir)
+        t0 = time.perf_counter()
+        try:
+            rows = extract_file(Path(workbook_path), spec.source, output, spec.header, spec.chunk_rows)
+        except Exception as e:  # unknown range, not a ZIP package (.xls/.xlsb), I/O error
+            print(f"Extract {spec.source} failed: {e}")
+            return 1
+        print(f"{spec.source} -> {output} ({rows:,} rows, {time.perf_counter() - t0:.1f}s)")
+    return 0
+
+
+def _profile_calc(ns: argparse.Namespace, settings) -> int:
+    from .excel.controller import ExcelController
+    from .services.calc_profile import default_report_path, profile_workbook
+
+    m = settings.macros.get(ns.macro_id) if ns.macro_id else None
+    workbook_path = (ns.pilot_path or (m.workbook_path if m else "") or settings.pilot_path).strip()
+    if not workbook_path:
+        print("Missing workbook path. Use --pilot or --macro.")
+        return 2
+    if not Path(workbook_path).is_file():
+        print(f"Workbook not found: {workbook_path}")
+        return 2
+
+    setup_logging(console=True)
+    controller = ExcelController()
+    try:
+        controller.launch_new_instance()
+        controller.set_excel_mode("hidden")
+        report = profile_workbook(controller, workbook_path)
+    finally:
+        if controller.excel is not None:
+            controller.quit_excel()
+        shutdown_logging()
+
+    out = Path(ns.profile_calc)
+    if ns.profile_calc == "auto":
+        out = default_report_path(CALC_PROFILES_DIR, workbook_path)
+    print(report.to_text())
+    try:
+        report.write(out)
+        print(f"JSON report: {out}")
+    except OSError as e:
+        print(f"Could not write JSON report: {e}")
+    return 0
+
+
+def _bench_startup(app) -> int:
+    result = {}
+
+    def interactive() -> None:
+        result["startup_s"] = process_uptime()
+        app.on_close()
+
+    # Same hop as App's own post-paint work: runs once the first frame is drawn.
+    app.after(0, lambda: app.after_idle(interactive))
     app.mainloop()
+    print(f"Startup: {result.get('startup_s', float('nan')):.3f}s (process start -> interactive window)")
     return 0
 
 
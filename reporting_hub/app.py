@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import ctypes
+import threading
 import time
 from datetime import datetime
 
@@ -9,8 +10,13 @@ import customtkinter as ctk
 from tkinter import filedialog
 
 from .config.constants import (
+    ADDIN_STATES_PATH,
     APP_TITLE,
     DEFAULT_PILOT_MACRO,
+    DIAGNOSTICS_LOG,
+    EXCEL_ATTACH_PATH,
+    EXCEL_INSTANCES_PATH,
+    PREFLIGHT_CACHE_PATH,
     SETTINGS_PATH,
     REPORT_TYPE_OPTIONS,
     DEFAULT_REPORT_TYPE,
@@ -19,16 +25,25 @@ from .config.constants import (
 from .config.io import load_settings, save_settings
 from .config.models import MacroDefinition
 
+from .excel.addins import AddinStateStore
+from .excel.attach import AttachStore
+from .excel.lifecycle import ExcelLifecycle, PidRegistry
 from .excel.worker import ExcelWorker
-from .gui.style import BG_APP, MUTED, TEXT, apply_app_style
+from .gui.style import BG_APP, MUTED, TEXT, apply_app_style, font
+from .gui.dispatcher import UiDispatcher
 from .gui.widgets import Card, ToastHost, btn_primary, btn_ghost
 from .pages.update import build_update_page
 from .pages.emails import build_emails_page
 from .pages.settings import build_settings_page
+from .pages.logs import build_logs_page
+from .services.lease import LeaseManager
+from .services.preflight import ModuleCache, PreflightResult, preflight
+from .utils.log import get_logger, setup_logging, shutdown_logging
+from .utils.watchdog import MainThreadWatchdog
 
 
 class App(ctk.CTk):
-    def __init__(self):
+    def __init__(self, watchdog_s: float = 0.0):
         super().__init__()
 
         # Load settings first (to apply appearance)
@@ -54,6 +69,14 @@ class App(ctk.CTk):
         self._running = False
         self._run_start_ts: float | None = None
 
+        # Callbacks from background threads run on Tk through this queue
+        self.dispatcher = UiDispatcher(self)
+        self.dispatcher.start()
+
+        # Every log line (UI and worker) reaches the log box via the pipeline
+        self._logger = get_logger("app")
+        setup_logging(gui=self._on_log_record)
+
         # Optional references (kept for future extensions)
         self._update_grid = None
         self._card_run = None
@@ -62,33 +85,74 @@ class App(ctk.CTk):
         self._card_mini = None
 
         self._build_root()
+        self._apply_settings_to_widgets()
 
-        # Start the Excel worker AFTER UI widgets exist (toast/log uses Tk).
-        self.excel_worker = ExcelWorker(self, ui_log=self.log, ui_toast=self.toast.show)
+        # Anything not needed for the first frame runs once it is painted
+        # (timer first, so the idle callback queues behind Tk's redraws).
+        self.after(0, lambda: self.after_idle(self._after_first_paint))
 
-        self._apply_settings_to_widgets()
+        # Opt-in UI stall detector (--watchdog)
+        self.watchdog: MainThreadWatchdog | None = None
+        if watchdog_s > 0:
+            self.watchdog = MainThreadWatchdog(self, DIAGNOSTICS_LOG, threshold_s=watchdog_s)
+            self.watchdog.start()
+            self.log(f"Watchdog on (>{watchdog_s:g}s stalls -> {DIAGNOSTICS_LOG.name}).")
 
-        # Start background worker (Excel COM thread)
+        # Graceful shutdown
         try:
-            self.excel_worker.start()
-            self.excel_worker.submit("set_mode", self.excel_mode.get())
+            self.protocol("WM_DELETE_WINDOW", self.on_close)
         except Exception:
             pass
 
-        # Graceful shutdown
+    def _after_first_paint(self):
+        # Start the Excel worker AFTER UI widgets exist (toast/log uses Tk).
+        attach_store = AttachStore(EXCEL_ATTACH_PATH) if self.settings.excel_attach else None
+        lifecycle = ExcelLifecycle(
+            PidRegistry(EXCEL_INSTANCES_PATH),
+            max_runs=self.settings.excel_recycle_runs,
+            max_memory_mb=self.settings.excel_recycle_mb,
+            attach_store=attach_store,
+            addin_store=AddinStateStore(ADDIN_STATES_PATH),
+        )
+        leases = None
+        # Attach mode always takes the run lease: a headless run cannot take over our instance mid-run
+        if self.settings.run_lease or attach_store is not None:
+            leases = LeaseManager(self.settings.run_lease_dir, ttl_s=self.settings.run_lease_ttl_s)
+        self.excel_worker = ExcelWorker(
+            self.dispatcher,
+            ui_toast=self.toast.show,
+            lifecycle=lifecycle,
+            attach_store=attach_store,
+            leases=leases,
+            on_busy=self.settings.run_lease_on_busy,
+        )
+        self._preflight_cache = ModuleCache(PREFLIGHT_CACHE_PATH)
+
+        # Start background worker (Excel COM thread)
         try:
-            self.protocol("WM_DELETE_WINDOW", self.on_close)
+            self.excel_worker.start()
+            self.excel_worker.submit("set_mode", self.excel_mode.get())
         except Exception:
             pass
 
         self.toast.show("Ready.")
 
     def on_close(self):
+        try:
+            if self.watchdog is not None:
+                self.watchdog.stop()
+        except Exception:
+            pass
         try:
             if self.excel_worker is not None:
                 self.excel_worker.stop()
         except Exception:
             pass
+        try:
+            shutdown_logging()
+        except Exception:
+            pass
+        self.dispatcher.stop()
         try:
             self.destroy()
         except Exception:
@@ -152,7 +216,7 @@ class App(ctk.CTk):
         self.page_title = ctk.CTkLabel(
             self.topbar,
             text="Update",
-            font=ctk.CTkFont(size=22, weight="bold"),
+            font=font(22, "bold"),
             text_color=TEXT,
         )
         self.page_title.grid(row=0, column=0, sticky="w")
@@ -181,9 +245,14 @@ class App(ctk.CTk):
         # Sidebar + pages
         self._build_sidebar()
 
-        self.page_update = build_update_page(self, self.pages)
-        self.page_emails = build_emails_page(self, self.pages)
-        self.page_settings = build_settings_page(self, self.pages)
+        # Pages are built on first show_page (only Update is visible at startup)
+        self._page_builders = {
+            "update": build_update_page,
+            "emails": build_emails_page,
+            "settings": build_settings_page,
+            "logs": build_logs_page,
+        }
+        self._pages: dict = {}
 
         self.show_page("update")
 
@@ -191,14 +260,14 @@ class App(ctk.CTk):
         ctk.CTkLabel(
             self.sidebar,
             text="REPORTING HUB",
-            font=ctk.CTkFont(size=12, weight="bold"),
+            font=font(12, "bold"),
             text_color=MUTED,
         ).grid(row=0, column=0, padx=18, pady=(18, 6), sticky="w")
 
         ctk.CTkLabel(
             self.sidebar,
             text="Automation",
-            font=ctk.CTkFont(size=24, weight="bold"),
+            font=font(24, "bold"),
             text_color=TEXT,
         ).grid(row=1, column=0, padx=18, pady=(0, 18), sticky="w")
 
@@ -211,6 +280,9 @@ class App(ctk.CTk):
         btn_ghost(self.sidebar, "Settings", command=lambda: self.show_page("settings"), height=42).grid(
             row=4, column=0, padx=18, pady=10, sticky="ew"
         )
+        btn_ghost(self.sidebar, "Logs", command=lambda: self.show_page("logs"), height=42).grid(
+            row=5, column=0, padx=18, pady=0, sticky="ew"
+        )
 
         excel_card = Card(self.sidebar, "Excel", "Discret + dialogues visibles")
         excel_card.grid(row=10, column=0, padx=18, pady=(18, 12), sticky="ew")
@@ -263,17 +335,23 @@ class App(ctk.CTk):
         for child in self.pages.winfo_children():
             child.grid_forget()
 
+    def _get_page(self, key: str) -> ctk.CTkFrame:
+        page = self._pages.get(key)
+        if page is None:
+            page = self._pages[key] = self._page_builders[key](self, self.pages)
+            setattr(self, f"page_{key}", page)
+        return page
+
     def show_page(self, key: str) -> None:
+        if key not in self._page_builders:
+            key = "settings"
         self._clear_pages()
-        if key == "update":
-            self.page_title.configure(text="Update")
-            self.page_update.grid(row=0, column=0, sticky="nsew")
-        elif key == "emails":
-            self.page_title.configure(text="Emails")
-            self.page_emails.grid(row=0, column=0, sticky="nsew")
-        else:
-            self.page_title.configure(text="Settings")
-            self.page_settings.grid(row=0, column=0, sticky="nsew")
+        titles = {"update": "Update", "emails": "Emails", "logs": "Logs"}
+        self.page_title.configure(text=titles.get(key, "Settings"))
+        built = key in self._pages
+        self._get_page(key).grid(row=0, column=0, sticky="nsew")
+        if key == "logs" and built:
+            self.log_viewer.search()  # pick up lines written since last visit
 
     # ---------- Profiles ----------
     def _report_type_label(self, key: str) -> str:
@@ -402,7 +480,15 @@ class App(ctk.CTk):
 
     # ---------- Logging ----------
     def log(self, msg: str):
-        ts = datetime.now().strftime("%H:%M:%S")
+        # Goes through the pipeline like worker logs: file + _on_log_record
+        self._logger.info(msg)
+
+    def _on_log_record(self, record) -> None:
+        # Listener thread: only hand the record over to Tk
+        self.dispatcher.post(self._show_log, record.created, record.getMessage())
+
+    def _show_log(self, created: float, msg: str):
+        ts = datetime.fromtimestamp(created).strftime("%H:%M:%S")
         line = f"[{ts}] {msg}\n"
         try:
             self.logbox.insert("end", line)
@@ -537,10 +623,45 @@ class App(ctk.CTk):
             self.toast.show("Excel worker not ready.")
             return
 
+        profile = self._active_report_type
+        prof = self._get_profile(profile)
+        excel_mode = self.excel_mode.get() if hasattr(self, "excel_mode") else "minimized"
         self._set_running(True)
-        self.toast.show("Running…")
+        self.toast.show("Checking…")
 
-        excel_mode = self.excel_mode.get() if hasattr(self, "excel_mode") else "minimized"
+        # Fail fast on a wrong file / macro name instead of after Workbooks.Open.
+        # Reading the VBA project can take a while on a synced folder: off the Tk thread.
+        def work() -> None:
+            try:
+                check = preflight(pilot_path, [s.macro for s in prof.steps] or [macro], self._preflight_cache)
+            except Exception as e:
+                check = PreflightResult(workbook_path=pilot_path, errors=[str(e)])
+            self.dispatcher.post(self._submit_pilot, check, profile, prof, pilot_path, macro, args, excel_mode)
+
+        threading.Thread(target=work, name="Preflight", daemon=True).start()
+
+    def _submit_pilot(
+        self,
+        check: PreflightResult,
+        profile: str,
+        prof: MacroDefinition,
+        pilot_path: str,
+        macro: str,
+        args: list,
+        excel_mode: str,
+    ) -> None:
+        if check.summary():
+            self.log(check.summary())
+        if not check.ok:
+            self._set_running(False)
+            self.toast.show(f"Cannot run: {check.errors[0]}")
+            return
+        if self.excel_worker is None:
+            self._set_running(False)
+            self.toast.show("Excel worker not ready.")
+            return
+
+        self.toast.show("Running…")
 
         def ok(_result: object) -> None:
             self._set_running(False)
@@ -558,6 +679,16 @@ class App(ctk.CTk):
             macro,
             args,
             excel_mode,
+            profile=profile,
+            outputs=list(prof.outputs),
+            inputs=list(prof.inputs),
+            extracts=list(prof.extracts),
+            execution=prof.execution,
+            launch=prof.launch,
+            requires=list(prof.requires),
+            wait_inputs_s=prof.wait_inputs_s,
+            steps=list(prof.steps),
+            artifacts_max_mb=self.settings.artifacts_max_mb,
             on_ok=ok,
             on_err=err,
         )
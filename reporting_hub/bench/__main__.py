@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from .budget import Baselines, Metric
+
+
+# python -m reporting_hub.bench [--case worker ...] [--update] [--tolerance 0.3]
+#
+# Each case runs in its own process, with a scratch folder as working
+# directory: settings.json, .reporting_hub/ and the log files of the
+# measured code never touch the real ones.
+
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    from .cases import CASES
+
+    p = argparse.ArgumentParser(prog="python -m reporting_hub.bench", description="Reporting Hub benchmarks")
+    p.add_argument("--case", action="append", choices=sorted(CASES), help="Run only these cases (repeatable)")
+    p.add_argument("--quick", action="store_true", help="Smaller workloads (smoke run, noisier numbers)")
+    p.add_argument(
+        "--baselines",
+        default="",
+        metavar="JSON",
+        help="Baselines file (default: .reporting_hub/bench_baselines[_quick].json)",
+    )
+    p.add_argument("--tolerance", type=float, default=None, help="Accepted regression, e.g. 0.25 = 25%%")
+    p.add_argument("--update", action="store_true", help="Record the measured values as the new baselines")
+    p.add_argument("--child", default="", help=argparse.SUPPRESS)
+    return p.parse_args(argv)
+
+
+def _run_child(case: str, quick: bool) -> int:
+    from .cases import CASES, Skip
+
+    try:
+        metrics = CASES[case](quick)
+    except Skip as e:
+        print(json.dumps({"skip": str(e)}))
+        return 0
+    print(json.dumps({"metrics": [m.__dict__ for m in metrics]}))
+    return 0
+
+
+def _run_case(case: str, quick: bool) -> dict:
+    root = str(Path(__file__).resolve().parents[2])
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    cmd = [sys.executable, "-m", "reporting_hub.bench", "--child", case] + (["--quick"] if quick else [])
+    with tempfile.TemporaryDirectory(prefix="rh-bench-") as tmp:
+        proc = subprocess.run(cmd, cwd=tmp, env=env, capture_output=True, text=True, timeout=600)
+    if proc.returncode != 0:
+        return {"error": (proc.stderr or proc.stdout).strip().splitlines()[-1:] or ["failed"]}
+    try:
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        return {"error": [f"unexpected output: {proc.stdout[-200:]!r}"]}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ns = _parse_args(list(argv) if argv is not None else sys.argv[1:])
+    if ns.child:
+        return _run_child(ns.child, ns.quick)
+
+    from ..config.constants import STATE_DIR
+    from .cases import CASES
+
+    # --quick workloads are smaller: their numbers get their own baselines
+    default = STATE_DIR / ("bench_baselines_quick.json" if ns.quick else "bench_baselines.json")
+    baselines = Baselines(Path(ns.baselines) if ns.baselines else default)
+    measured: List[Metric] = []
+    failures = 0
+    for case in ns.case or list(CASES):
+        print(f"{case}:", flush=True)
+        result = _run_case(case, ns.quick)
+        if "skip" in result:
+            print(f"  skipped: {result['skip']}")
+            continue
+        if "error" in result:
+            print(f"  ERROR: {' '.join(result['error'])}")
+            failures += 1
+            continue
+        for item in result["metrics"]:
+            metric = Metric(**item)
+            measured.append(metric)
+            verdict = baselines.check(metric, ns.tolerance)
+            print(verdict.line())
+            if verdict.regressed and not ns.update:
+                failures += 1
+
+    if ns.update and measured:
+        baselines.update(measured)
+        print(f"Baselines written to {baselines.path}")
+    elif failures:
+        tolerance = ns.tolerance if ns.tolerance is not None else baselines.tolerance
+        print(f"{failures} regression(s) or error(s) (tolerance {tolerance:.0%}).")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+DEFAULT_TOLERANCE = 0.25  # 25% worse than the baseline fails
+
+
+@dataclass
+class Metric:
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool = False
+
+    def format(self) -> str:
+        return f"{self.value:,.3f} {self.unit}"
+
+
+@dataclass
+class Verdict:
+    metric: Metric
+    baseline: Optional[float]
+    limit: Optional[float]  # worst accepted value
+
+    @property
+    def regressed(self) -> bool:
+        if self.limit is None:
+            return False
+        if self.metric.higher_is_better:
+            return self.metric.value < self.limit
+        return self.metric.value > self.limit
+
+    @property
+    def change(self) -> Optional[float]:
+        """Relative change vs the baseline, positive = better."""
+        if not self.baseline:
+            return None
+        delta = (self.metric.value - self.baseline) / self.baseline
+        return delta if self.metric.higher_is_better else -delta
+
+    def line(self) -> str:
+        m = self.metric
+        if self.baseline is None:
+            return f"  NEW   {m.name:<28} {m.format():>20}"
+        status = "FAIL" if self.regressed else "ok"
+        change = self.change
+        trend = f"{change * 100:+.1f}%" if change is not None else ""
+        return f"  {status:<5} {m.name:<28} {m.format():>20}  baseline {self.baseline:,.3f}  {trend}"
+
+
+class Baselines:
+    """Reference value per metric, plus a tolerance (global or per metric).
+
+    {"tolerance": 0.25,
+     "metrics": {"worker_tasks_per_s": {"value": 41000.0, "unit": "tasks/s",
+                                        "higher_is_better": true, "tolerance": 0.4}}}
+
+    Numbers depend on the machine: baselines are recorded where the suite
+    runs (--update) rather than shipped.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.tolerance = DEFAULT_TOLERANCE
+        self.metrics: Dict[str, dict] = {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        if isinstance(data, dict):
+            self.tolerance = float(data.get("tolerance", DEFAULT_TOLERANCE))
+            metrics = data.get("metrics", {})
+            self.metrics = metrics if isinstance(metrics, dict) else {}
+
+    def check(self, metric: Metric, tolerance: Optional[float] = None) -> Verdict:
+        ref = self.metrics.get(metric.name)
+        if not ref or "value" not in ref:
+            return Verdict(metric, None, None)
+        baseline = float(ref["value"])
+        tol = float(tolerance if tolerance is not None else ref.get("tolerance", self.tolerance))
+        limit = baseline * (1.0 - tol) if metric.higher_is_better else baseline * (1.0 + tol)
+        return Verdict(metric, baseline, limit)
+
+    def update(self, metrics: List[Metric]) -> None:
+        for m in metrics:
+            item = self.metrics.setdefault(m.name, {})
+            item.update(value=round(m.value, 6), unit=m.unit, higher_is_better=m.higher_is_better)
+        data = {
+            "tolerance": self.tolerance,
+            "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "metrics": self.metrics,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import wait
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from .budget import Metric
+
+
+# Each case returns its metrics, or raises Skip when it cannot run here
+# (no Tk display, ...). Cases never touch Excel: the worker runs against
+# a stub controller and the UI watcher against a fake window list.
+
+
+class Skip(Exception):
+    """The case cannot run in this environment."""
+
+
+def best_of(fn: Callable[[], None], repeat: int) -> float:
+    """Shortest wall time of `repeat` calls (least disturbed by noise)."""
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+# ---------- settings.json ----------
+def bench_settings(quick: bool = False) -> List[Metric]:
+    from ..config.io import load_settings, save_settings
+    from ..config.models import ExecutionProfile, ExtractSpec, InjectSpec, MacroDefinition, Settings, StepSpec
+
+    n = 300 if quick else 2000
+    settings = Settings(pilot_path="C:/Reports/pilot.xlsm")
+    for i in range(n):
+        settings.macros[f"report_{i:05d}"] = MacroDefinition(
+            label=f"Report {i}",
+            workbook_path=f"C:/Reports/{i:05d}/pilot.xlsm",
+            macro="Run_MonthEnd_Update",
+            args="2024;12;FR",
+            outputs=["out/*.xlsx", "out/*.pdf"],
+            inputs=[InjectSpec(source="in/data.csv", target="tblInput")],
+            extracts=[ExtractSpec(source="Results!A1:H5000", output=f"extract/{i}.parquet")],
+            execution=ExecutionProfile(calculation="manual", screen_updating=False),
+            steps=[StepSpec(macro=f"Step_{k}", save_after=k == 2) for k in range(3)],
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "settings.json"
+        save_s = best_of(lambda: save_settings(path, settings), 5)
+        load_s = best_of(lambda: load_settings(path), 5)
+        loaded = load_settings(path)
+        if len(loaded.macros) != n:
+            raise RuntimeError(f"settings round trip lost macros ({len(loaded.macros)}/{n})")
+    return [
+        Metric("settings_save_s", save_s, "s"),
+        Metric("settings_load_s", load_s, "s"),
+    ]
+
+
+# ---------- ExcelWorker ----------
+class _StubController:
+    """Just enough of ExcelController for the worker's cheap actions."""
+
+    def __init__(self):
+        self.excel = None
+        self.mode = "minimized"
+
+
+def bench_worker(quick: bool = False) -> List[Metric]:
+    from ..excel.worker import ExcelWorker
+
+    worker = ExcelWorker(controller_factory=_StubController)
+    try:
+        # Throughput: many queued tasks, then wait for all of them
+        n = 2_000 if quick else 20_000
+        t0 = time.perf_counter()
+        futures = [worker.submit("set_mode", "hidden") for _ in range(n)]
+        wait(futures, timeout=60)
+        elapsed = time.perf_counter() - t0
+        if not all(f.done() and f.exception() is None for f in futures):
+            raise RuntimeError("worker tasks did not complete")
+
+        # Latency: one task at a time, submit -> result
+        latencies = []
+        for _ in range(200 if quick else 1_000):
+            t1 = time.perf_counter()
+            worker.submit("set_mode", "minimized").result(timeout=5)
+            latencies.append(time.perf_counter() - t1)
+
+        # Callbacks without dispatcher: on_ok runs on the worker thread
+        done = threading.Event()
+        worker.submit("set_mode", "visible", on_ok=lambda _r: done.set())
+        if not done.wait(5):
+            raise RuntimeError("on_ok callback not called")
+    finally:
+        worker.stop(wait=2.0)
+
+    return [
+        Metric("worker_tasks_per_s", n / elapsed, "tasks/s", higher_is_better=True),
+        Metric("worker_latency_p50_ms", _percentile(latencies, 0.50) * 1000, "ms"),
+        Metric("worker_latency_p95_ms", _percentile(latencies, 0.95) * 1000, "ms"),
+    ]
+
+
+# ---------- ExcelUIWatcher ----------
+class _FakeDesktop:
+    """WindowOps over a fixed window list; window actions are counted only."""
+
+    def __init__(self, excel_pids: List[int], other_windows: int = 600):
+        self.windows: List[tuple] = []
+        self.classes: Dict[int, str] = {}
+        self.actions = 0
+        hwnd = 0
+        for pid in excel_pids:
+            # A busy Excel: main window, workbook windows, tooltips, one dialog and one userform
+            kinds = ["XLMAIN", "#32770", "ThunderDFrame"]
+            others = ("EXCEL7", "EXCEL;", "tooltips_class32", "MsoCommandBar", "NUIPane")
+            kinds += [others[i % 5] for i in range(40)]
+            for cls in kinds:
+                hwnd += 1
+                self.windows.append((hwnd, pid))
+                self.classes[hwnd] = cls
+        for i in range(other_windows):  # the rest of the desktop
+            hwnd += 1
+            self.windows.append((hwnd, 90_000 + i % 50))
+            self.classes[hwnd] = "Chrome_WidgetWin_1"
+
+    def available(self) -> bool:
+        return False  # no service thread: ticks are driven by the bench
+
+    def enumerate(self) -> List[tuple]:
+        return self.windows
+
+    def class_name(self, hwnd) -> str:
+        return self.classes.get(hwnd, "")
+
+    def enforce_main(self, hwnd, mode: str) -> None:
+        self.actions += 1
+
+    def bring_dialog(self, hwnd) -> None:
+        self.actions += 1
+
+
+def bench_ui_watcher(quick: bool = False) -> List[Metric]:
+    from ..excel.ui_watcher import UIWatcherService
+
+    ticks = 300 if quick else 3_000
+    metrics: List[Metric] = []
+    for instances in (1, 4):
+        pids = list(range(1000, 1000 + instances))
+        desktop = _FakeDesktop(pids)
+        service = UIWatcherService(ops=desktop, main_enforce_period_s=0.0)
+        for pid in pids:
+            service.register(pid, "hidden")
+
+        main_hwnds, dialog_hwnds = service.classify([h for h, p in desktop.windows if p == pids[0]])
+        if len(main_hwnds) != 9 or len(dialog_hwnds) != 2:
+            found = f"{len(main_hwnds)} main, {len(dialog_hwnds)} dialogs"
+            raise RuntimeError(f"unexpected classification: {found}")
+        # Anti-flicker: main windows hidden and dialogs raised on the first tick only
+        service.tick()
+        service.tick()
+        if desktop.actions != 11 * instances:
+            raise RuntimeError(f"unexpected window actions: {desktop.actions} for {instances} instance(s)")
+
+        def run_ticks() -> None:
+            for _ in range(ticks):
+                service.tick()
+
+        seconds = best_of(run_ticks, 3)
+        metrics.append(
+            Metric(
+                f"watcher_tick_us_{instances}_excel",
+                seconds / ticks * 1e6,
+                f"us/tick ({len(desktop.windows)} windows)",
+            )
+        )
+    return metrics
+
+
+# ---------- App.log ----------
+def bench_app_log(quick: bool = False) -> List[Metric]:
+    if sys.platform != "win32" and not os.environ.get("DISPLAY"):
+        raise Skip("no display for Tk")
+    try:
+        from ..app import App
+    except ImportError as e:
+        raise Skip(f"GUI dependencies missing ({e})") from None
+    try:
+        app = App(watchdog_s=0.0)
+    except Exception as e:  # TclError: no display / Tk not installed
+        raise Skip(f"Tk unavailable ({e})") from None
+
+    n = 1_000 if quick else 10_000
+    shown = [0]
+    show_log = app._show_log
+
+    def counting_show_log(created: float, msg: str) -> None:
+        shown[0] += 1
+        show_log(created, msg)
+
+    app._show_log = counting_show_log  # looked up when each record is posted
+    try:
+        app.withdraw()
+        app.update()
+        t0 = time.perf_counter()
+        for i in range(n):
+            app.log(f"bench line {i}")
+        deadline = t0 + 60
+        while shown[0] < n and time.perf_counter() < deadline:
+            app.update()
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - t0
+    finally:
+        app.on_close()
+    if shown[0] < n:
+        raise RuntimeError(f"only {shown[0]}/{n} log lines reached the log box")
+    return [Metric("app_log_lines_per_s", n / elapsed, "lines/s", higher_is_better=True)]
+
+
+# ---------- CLI ----------
+def bench_cli_startup(quick: bool = False) -> List[Metric]:
+    # --list: interpreter + package import + settings load, no Excel, no Tk
+    root = str(Path(__file__).resolve().parents[2])
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    cmd = [sys.executable, "-m", "reporting_hub", "--list"]
+
+    def run() -> None:
+        subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+    bare = best_of(lambda: subprocess.run([sys.executable, "-c", "pass"], check=True), 3 if quick else 5)
+    total = best_of(run, 3 if quick else 5)
+    return [
+        Metric("cli_startup_s", total, "s"),
+        Metric("cli_startup_over_python_s", max(0.0, total - bare), "s"),
+    ]
+
+
+CASES: Dict[str, Callable[[bool], List[Metric]]] = {
+    "settings": bench_settings,
+    "worker": bench_worker,
+    "ui_watcher": bench_ui_watcher,
+    "app_log": bench_app_log,
+    "cli": bench_cli_startup,
+}
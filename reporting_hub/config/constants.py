@@ -19,4 +19,39 @@ REPORT_TYPE_DEFAULT_MACROS = {
     "semiannual": "Run_Semiannual_Update",
 }
 
+# Named execution profiles usable as "execution": "<name>" in settings.json
+EXECUTION_PRESETS = {
+    "turbo": {
+        "calculation": "manual",
+        "screen_updating": False,
+        "enable_events": False,
+        "display_status_bar": False,
+        "calc_threads": 0,
+    },
+}
+
 SETTINGS_PATH = Path.cwd() / "settings.json"
+
+# Local state folder (artifact store, run manifests...)
+STATE_DIR = Path.cwd() / ".reporting_hub"
+ARTIFACTS_DIR = STATE_DIR / "artifacts"
+DIAGNOSTICS_LOG = STATE_DIR / "diagnostics.log"
+MACRO_TIMINGS_PATH = STATE_DIR / "macro_timings.json"
+# Last Excel launch duration, standard vs lean (add-ins disconnected)
+LAUNCH_TIMINGS_PATH = STATE_DIR / "launch_timings.json"
+CHECKPOINTS_DIR = STATE_DIR / "checkpoints"
+RUN_HISTORY_PATH = STATE_DIR / "run_history.jsonl"
+CALC_PROFILES_DIR = STATE_DIR / "calc_profiles"
+PREFLIGHT_CACHE_PATH = STATE_DIR / "preflight_cache.json"
+# Excel instances launched by reporting_hub (orphans are reaped at startup)
+EXCEL_INSTANCES_PATH = STATE_DIR / "excel_instances.json"
+# Attach mode: instance (PID + open workbooks) later runs reconnect to
+EXCEL_ATTACH_PATH = STATE_DIR / "excel_attach.json"
+# Lean launch: original state of the COM add-ins disconnected (restored at startup after a crash)
+ADDIN_STATES_PATH = STATE_DIR / "addin_states.json"
+
+# Persisted logs (rotating files, browsed from the Logs page)
+LOG_DIR = STATE_DIR / "logs"
+LOG_FILE_NAME = "reporting_hub.log"
+LOG_MAX_BYTES = 20 * 1024 * 1024
+LOG_BACKUPS = 50
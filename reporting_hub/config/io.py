@@ -2,9 +2,175 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any, Dict
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
 
-from .models import MacroDefinition, Settings
+from .constants import EXECUTION_PRESETS
+from .models import (
+    ExecutionProfile,
+    ExtractSpec,
+    InjectSpec,
+    LaunchProfile,
+    MacroDefinition,
+    RequiredInput,
+    Settings,
+    StepSpec,
+)
+
+
+def _parse_str_list(raw: Any) -> List[str]:
+    if isinstance(raw, str):
+        raw = raw.split(";")
+    if not isinstance(raw, list):
+        return []
+    return [str(x).strip() for x in raw if str(x).strip()]
+
+
+def _parse_int(raw: Any, default: int) -> int:
+    try:
+        return int(raw)
+    except Exception:
+        return default
+
+
+def _parse_opt_bool(raw: Any) -> Optional[bool]:
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        v = raw.strip().lower()
+        if v in ("true", "1", "yes", "on"):
+            return True
+        if v in ("false", "0", "no", "off"):
+            return False
+        return None
+    return bool(raw)
+
+
+def _bool_or(raw: Any, default: bool) -> bool:
+    value = _parse_opt_bool(raw)
+    return default if value is None else value
+
+
+def _parse_execution(raw: Any) -> ExecutionProfile:
+    if isinstance(raw, str):
+        raw = {"preset": raw}
+    if not isinstance(raw, dict):
+        return ExecutionProfile()
+
+    # A preset gives defaults, explicit keys override it
+    values: Dict[str, Any] = dict(EXECUTION_PRESETS.get(str(raw.get("preset", "")).strip().lower(), {}))
+    values.update({k: v for k, v in raw.items() if k != "preset"})
+
+    calculation = str(values.get("calculation") or "").strip().lower()
+    if calculation not in ("manual", "automatic", "semiautomatic"):
+        calculation = ""
+    threads = values.get("calc_threads")
+    return ExecutionProfile(
+        calculation=calculation,
+        screen_updating=_parse_opt_bool(values.get("screen_updating")),
+        enable_events=_parse_opt_bool(values.get("enable_events")),
+        display_status_bar=_parse_opt_bool(values.get("display_status_bar")),
+        calc_threads=None if threads is None else max(0, _parse_int(threads, 0)),
+    )
+
+
+def _parse_launch(raw: Any) -> LaunchProfile:
+    if isinstance(raw, str):
+        return LaunchProfile(lean=raw.strip().lower() == "lean")
+    if not isinstance(raw, dict):
+        return LaunchProfile()
+    return LaunchProfile(lean=_bool_or(raw.get("lean"), False), addins=_parse_str_list(raw.get("addins")))
+
+
+def _parse_extracts(raw: Any) -> List[ExtractSpec]:
+    if not isinstance(raw, list):
+        return []
+    out: List[ExtractSpec] = []
+    for item in raw:
+        if not isinstance(item, dict):
+            continue
+        source = str(item.get("source", "")).strip()
+        output = str(item.get("output", "")).strip()
+        if not source or not output:
+            continue
+        out.append(
+            ExtractSpec(
+                source=source,
+                output=output,
+                header=_bool_or(item.get("header"), True),
+                chunk_rows=max(1, _parse_int(item.get("chunk_rows"), ExtractSpec.chunk_rows)),
+            )
+        )
+    return out
+
+
+def _parse_inputs(raw: Any) -> List[InjectSpec]:
+    if not isinstance(raw, list):
+        return []
+    out: List[InjectSpec] = []
+    for item in raw:
+        if not isinstance(item, dict):
+            continue
+        source = str(item.get("source", "")).strip()
+        target = str(item.get("target", "")).strip()
+        if not source or not target:
+            continue
+        d = InjectSpec(source=source, target=target)
+        out.append(
+            InjectSpec(
+                source=source,
+                target=target,
+                header=_bool_or(item.get("header"), d.header),
+                write_header=_bool_or(item.get("write_header"), d.write_header),
+                clear=_bool_or(item.get("clear"), d.clear),
+                chunk_rows=max(0, _parse_int(item.get("chunk_rows"), d.chunk_rows)),
+            )
+        )
+    return out
+
+
+def _parse_steps(raw: Any) -> List[StepSpec]:
+    """["Step_A", {"macro": "Step_B", "args": "x;y", "save_after": true}, ...]"""
+    if not isinstance(raw, list):
+        return []
+    out: List[StepSpec] = []
+    for item in raw:
+        if isinstance(item, str):
+            item = {"macro": item}
+        if not isinstance(item, dict):
+            continue
+        macro = str(item.get("macro", "")).strip()
+        if not macro:
+            continue
+        out.append(
+            StepSpec(
+                macro=macro,
+                args=str(item.get("args", "") or ""),
+                save_after=_bool_or(item.get("save_after"), False),
+            )
+        )
+    return out
+
+
+def _parse_requires(raw: Any) -> List[RequiredInput]:
+    """["in/*.csv", {"path": "pilot.xlsm", "stable_s": 30}, ...]"""
+    if not isinstance(raw, list):
+        return []
+    out: List[RequiredInput] = []
+    for item in raw:
+        if isinstance(item, str):
+            item = {"path": item}
+        if not isinstance(item, dict):
+            continue
+        path = str(item.get("path", "")).strip()
+        if not path:
+            continue
+        try:
+            stable_s = max(0.0, float(item.get("stable_s", 10.0)))
+        except (TypeError, ValueError):
+            stable_s = 10.0
+        out.append(RequiredInput(path=path, stable_s=stable_s))
+    return out
 
 
 def _parse_macros(raw: Any) -> Dict[str, MacroDefinition]:
@@ -20,13 +186,29 @@ def _parse_macros(raw: Any) -> Dict[str, MacroDefinition]:
         workbook_path = str(item.get("workbook_path", ""))
         macro = str(item.get("macro", ""))
         args = str(item.get("args", ""))
+        outputs = _parse_str_list(item.get("outputs"))
+        inputs = _parse_inputs(item.get("inputs"))
+        extracts = _parse_extracts(item.get("extracts"))
+        execution = _parse_execution(item.get("execution"))
+        launch = _parse_launch(item.get("launch"))
+        requires = _parse_requires(item.get("requires"))
+        wait_inputs_s = max(0, _parse_int(item.get("wait_inputs_s"), 600))
+        steps = _parse_steps(item.get("steps"))
 
-        if macro.strip():
+        if macro.strip() or steps:
             out[str(macro_id)] = MacroDefinition(
                 label=label,
                 workbook_path=workbook_path,
                 macro=macro,
                 args=args,
+                outputs=outputs,
+                inputs=inputs,
+                extracts=extracts,
+                execution=execution,
+                launch=launch,
+                requires=requires,
+                wait_inputs_s=wait_inputs_s,
+                steps=steps,
             )
 
     return out
@@ -57,10 +239,54 @@ def load_settings(path: Path) -> Settings:
     s.pilot_macro = str(data.get("pilot_macro", s.pilot_macro))
     s.pilot_args = str(data.get("pilot_args", s.pilot_args))
 
+    s.artifacts_max_mb = _parse_int(data.get("artifacts_max_mb"), s.artifacts_max_mb)
+    s.excel_recycle_runs = _parse_int(data.get("excel_recycle_runs"), s.excel_recycle_runs)
+    s.excel_recycle_mb = _parse_int(data.get("excel_recycle_mb"), s.excel_recycle_mb)
+    s.excel_attach = _bool_or(data.get("excel_attach"), s.excel_attach)
+    s.run_lease = _bool_or(data.get("run_lease"), s.run_lease)
+    s.run_lease_dir = str(data.get("run_lease_dir", s.run_lease_dir) or "")
+    on_busy = str(data.get("run_lease_on_busy", s.run_lease_on_busy) or "").strip().lower()
+    s.run_lease_on_busy = on_busy if on_busy in ("abort", "wait", "attach") else "abort"
+    s.run_lease_ttl_s = max(10, _parse_int(data.get("run_lease_ttl_s"), s.run_lease_ttl_s))
+
     s.macros = _parse_macros(data.get("macros"))
     return s
 
 
+def _macro_to_dict(m: MacroDefinition) -> Dict[str, Any]:
+    out: Dict[str, Any] = {
+        "label": m.label,
+        "workbook_path": m.workbook_path,
+        "macro": m.macro,
+        "args": m.args,
+    }
+    # Optional keys are only written when used (keeps settings.json readable)
+    if m.outputs:
+        out["outputs"] = list(m.outputs)
+    if m.inputs:
+        out["inputs"] = [asdict(x) for x in m.inputs]
+    if m.extracts:
+        out["extracts"] = [asdict(x) for x in m.extracts]
+    if not m.execution.is_empty():
+        out["execution"] = _execution_to_json(m.execution)
+    if m.requires:
+        out["requires"] = [asdict(x) for x in m.requires]
+        out["wait_inputs_s"] = m.wait_inputs_s
+    if m.launch.lean:
+        out["launch"] = {"lean": True, "addins": list(m.launch.addins)} if m.launch.addins else "lean"
+    if m.steps:
+        out["steps"] = [asdict(x) for x in m.steps]
+    return out
+
+
+def _execution_to_json(e: ExecutionProfile) -> Any:
+    values = {k: v for k, v in asdict(e).items() if v not in (None, "")}
+    for name, preset in EXECUTION_PRESETS.items():
+        if values == preset:
+            return name
+    return values
+
+
 def _settings_to_dict(settings: Settings) -> Dict[str, Any]:
     return {
         "appearance": settings.appearance,
@@ -69,15 +295,15 @@ def _settings_to_dict(settings: Settings) -> Dict[str, Any]:
         "pilot_path": settings.pilot_path,
         "pilot_macro": settings.pilot_macro,
         "pilot_args": settings.pilot_args,
-        "macros": {
-            macro_id: {
-                "label": m.label,
-                "workbook_path": m.workbook_path,
-                "macro": m.macro,
-                "args": m.args,
-            }
-            for macro_id, m in settings.macros.items()
-        },
+        "artifacts_max_mb": settings.artifacts_max_mb,
+        "excel_recycle_runs": settings.excel_recycle_runs,
+        "excel_recycle_mb": settings.excel_recycle_mb,
+        "excel_attach": settings.excel_attach,
+        "run_lease": settings.run_lease,
+        "run_lease_dir": settings.run_lease_dir,
+        "run_lease_on_busy": settings.run_lease_on_busy,
+        "run_lease_ttl_s": settings.run_lease_ttl_s,
+        "macros": {macro_id: _macro_to_dict(m) for macro_id, m in settings.macros.items()},
     }
 
 
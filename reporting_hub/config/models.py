@@ -1,7 +1,80 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Dict, List, Optional
+
+
+@dataclass
+class ExecutionProfile:
+    """Excel application settings applied while a macro runs.
+
+    None / "" = leave the setting untouched. Previous values are restored
+    after the run.
+    """
+
+    calculation: str = ""  # "" | manual | automatic | semiautomatic
+    screen_updating: Optional[bool] = None
+    enable_events: Optional[bool] = None
+    display_status_bar: Optional[bool] = None
+    calc_threads: Optional[int] = None  # 0 = all processors
+
+    def is_empty(self) -> bool:
+        return not self.calculation and all(
+            v is None
+            for v in (self.screen_updating, self.enable_events, self.display_status_bar, self.calc_threads)
+        )
+
+
+@dataclass
+class LaunchProfile:
+    """How the dedicated Excel instance is started.
+
+    Lean: COM add-ins are disconnected and only the add-ins listed in
+    `addins` (COM add-in ProgId/description, add-in name or title) are
+    loaded.
+    """
+
+    lean: bool = False
+    addins: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ExtractSpec:
+    """A range read back from the workbook after the run."""
+
+    source: str  # defined name, table (ListObject) name or "Sheet!A1:D10"
+    output: str  # .csv or .parquet (relative to the workbook folder)
+    header: bool = True  # first row holds column names
+    chunk_rows: int = 50_000  # rows per Value2 block
+
+
+@dataclass
+class InjectSpec:
+    """An input file written into the workbook before the macro runs."""
+
+    source: str  # .csv or .parquet (relative to the workbook folder)
+    target: str  # defined name, table (ListObject) name or "Sheet!A1"
+    header: bool = True  # the source file starts with a header row
+    write_header: bool = False  # also write the header (ignored for tables)
+    clear: bool = True  # clear previous content / table rows first
+    chunk_rows: int = 0  # rows per block (0 = sized from the column count)
+
+
+@dataclass
+class RequiredInput:
+    """A file that must be ready before the run starts (readiness gate)."""
+
+    path: str  # relative to the workbook folder; glob patterns allowed
+    stable_s: float = 10.0  # size and modification time unchanged for N seconds
+
+
+@dataclass
+class StepSpec:
+    """One macro of a multi-step run."""
+
+    macro: str
+    args: str = ""  # semicolon-separated
+    save_after: bool = False  # save the workbook once the step succeeded
 
 
 @dataclass
@@ -13,6 +86,30 @@ class MacroDefinition:
     macro: str
     args: str = ""  # semicolon-separated
 
+    # Files produced by the run (glob patterns, relative to the workbook folder).
+    # They are stored in the artifact store after each successful run.
+    outputs: List[str] = field(default_factory=list)
+
+    # Input files written into the workbook before the run
+    inputs: List[InjectSpec] = field(default_factory=list)
+
+    # Ranges exported to CSV/Parquet after the run
+    extracts: List[ExtractSpec] = field(default_factory=list)
+
+    # Excel settings during the run ("execution": "turbo" or a dict in settings.json)
+    execution: ExecutionProfile = field(default_factory=ExecutionProfile)
+
+    # Files the run waits for: present, stable, not locked / being written
+    requires: List[RequiredInput] = field(default_factory=list)
+    wait_inputs_s: int = 600  # give up after N seconds (0 = no limit)
+
+    # Excel instance launch ("launch": "lean" or {"lean": true, "addins": [...]})
+    launch: LaunchProfile = field(default_factory=LaunchProfile)
+
+    # Ordered step macros, run instead of `macro` when set. A checkpoint is
+    # kept after each step so a failed run resumes from the failed step.
+    steps: List[StepSpec] = field(default_factory=list)
+
 
 @dataclass
 class Settings:
@@ -29,5 +126,24 @@ class Settings:
     pilot_macro: str = "Run_MonthEnd_Update"
     pilot_args: str = ""
 
+    # Artifact store retention (MB, 0 = unlimited)
+    artifacts_max_mb: int = 2048
+
+    # Restart the dedicated Excel instance after N runs / above N MB of
+    # private memory, checked between runs (0 = never)
+    excel_recycle_runs: int = 0
+    excel_recycle_mb: int = 0
+
+    # Keep the Excel instance alive on exit and reconnect to it (workbook
+    # still open) instead of launching a new one
+    excel_attach: bool = False
+
+    # Run lease: one run per workbook across processes and machines. The
+    # lease file lives next to the workbook or in run_lease_dir (shared).
+    run_lease: bool = False
+    run_lease_dir: str = ""
+    run_lease_on_busy: str = "abort"  # abort | wait | attach
+    run_lease_ttl_s: int = 120  # lease expires without heartbeat for that long
+
     # Optional registry for multiple macros
     macros: Dict[str, MacroDefinition] = field(default_factory=dict)
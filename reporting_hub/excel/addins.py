@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import winreg
+except Exception:  # pragma: no cover
+    winreg = None
+
+from ..config.models import LaunchProfile
+
+
+# XlRunAutoMacro
+XL_AUTO_OPEN = 1
+
+# Where Excel persists the Connect state of per-user COM add-ins
+# (LoadBehavior 3 = loaded at startup, 2 = not loaded).
+_ADDINS_KEY = r"Software\Microsoft\Office\Excel\Addins"
+
+
+def _names(*values) -> Set[str]:
+    """Lower-case identifiers an add-in can be listed under in a profile."""
+    out = set()
+    for value in values:
+        text = str(value or "").strip().lower()
+        if text:
+            out.add(text)
+            out.add(os.path.splitext(text)[0])  # "analys32.xll" -> "analys32"
+    return out
+
+
+def _load_behavior(prog_id: str) -> Optional[int]:
+    if winreg is None:
+        return None
+    try:
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, f"{_ADDINS_KEY}\\{prog_id}") as key:
+            return int(winreg.QueryValueEx(key, "LoadBehavior")[0])
+    except (OSError, ValueError):
+        return None
+
+
+def _set_load_behavior(prog_id: str, value: int) -> bool:
+    if winreg is None:
+        return False
+    access = winreg.KEY_SET_VALUE
+    try:
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, f"{_ADDINS_KEY}\\{prog_id}", 0, access) as key:
+            winreg.SetValueEx(key, "LoadBehavior", 0, winreg.REG_DWORD, int(value))
+        return True
+    except OSError:
+        return False
+
+
+def _startup_addins() -> Dict[str, Tuple[int, str]]:
+    """Per-user COM add-ins loaded at startup: ProgId -> (LoadBehavior, FriendlyName)."""
+    out: Dict[str, Tuple[int, str]] = {}
+    if winreg is None:
+        return out
+    try:
+        root = winreg.OpenKey(winreg.HKEY_CURRENT_USER, _ADDINS_KEY)
+    except OSError:
+        return out
+    with root:
+        i = 0
+        while True:
+            try:
+                prog_id = winreg.EnumKey(root, i)
+            except OSError:
+                break
+            i += 1
+            try:
+                with winreg.OpenKey(root, prog_id) as key:
+                    value = int(winreg.QueryValueEx(key, "LoadBehavior")[0])
+                    try:
+                        friendly = str(winreg.QueryValueEx(key, "FriendlyName")[0])
+                    except OSError:
+                        friendly = ""
+            except (OSError, ValueError):
+                continue
+            if value & 3 == 3:
+                out[prog_id] = (value, friendly)
+    return out
+
+
+class AddinStateStore:
+    """Original state of the COM add-ins a lean launch changed (JSON file).
+
+    An entry is written before the add-in is disconnected and removed once
+    `AddinSetup.restore()` put it back. Entries still there at the next
+    start belong to an instance that crashed or was reaped: their
+    LoadBehavior is written back to the registry (`restore_leftovers`).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def entries(self) -> Dict[str, dict]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _write(self, entries: Dict[str, dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entries, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def record(self, prog_id: str, connected: bool, excel_pid: Optional[int]) -> bool:
+        """Remember the state before a change; returns the original one.
+
+        An entry left by an earlier instance keeps its original state: the
+        add-in may still be disconnected because of it.
+        """
+        with self._lock:
+            entries = self.entries()
+            entry = entries.setdefault(
+                prog_id, {"connect": bool(connected), "load_behavior": _load_behavior(prog_id)}
+            )
+            entry["excel_pid"] = excel_pid or 0
+            try:
+                self._write(entries)
+            except OSError:
+                pass  # restore() before Quit still works
+            return bool(entry["connect"])
+
+    def remove(self, prog_ids: List[str]) -> None:
+        with self._lock:
+            entries = self.entries()
+            if any(p in entries for p in prog_ids):
+                try:
+                    self._write({k: v for k, v in entries.items() if k not in prog_ids})
+                except OSError:
+                    pass
+
+    def restore_leftovers(self, alive: Callable[[int], bool], logger: logging.Logger) -> int:
+        """Write back the LoadBehavior of entries whose Excel instance is gone."""
+        done: List[str] = []
+        failed: List[str] = []
+        for prog_id, entry in self.entries().items():
+            if alive(int(entry.get("excel_pid") or 0)):
+                continue  # still used by a running instance: its own restore() applies
+            value = entry.get("load_behavior")
+            if value is None or _set_load_behavior(prog_id, value):
+                done.append(prog_id)  # None: the change was not persisted beyond that instance
+            else:
+                failed.append(prog_id)
+        self.remove(done)
+        if done:
+            logger.warning(f"Excel: état restauré pour {len(done)} complément(s) COM ({', '.join(done)}).")
+        if failed:
+            logger.warning(
+                f"Excel: état non restauré pour {', '.join(failed)} (nouvel essai au prochain démarrage)."
+            )
+        return len(done)
+
+
+class StartupAddins:
+    """Keeps unlisted per-user COM add-ins from loading with a new instance.
+
+    COM add-ins load while Excel starts, before DispatchEx returns:
+    disconnecting them afterwards saves no launch time. `suppress()` sets
+    their LoadBehavior to 2 in HKCU just before the launch, `restore()`
+    writes the original values back once the instance is up. The original
+    values go to the `store` first: after a crash in between, the next
+    start restores them (`AddinStateStore.restore_leftovers`).
+
+    Add-ins registered for all users (HKLM) are left to AddinSetup.
+    """
+
+    def __init__(self, log: Callable[[str], None], store: Optional[AddinStateStore] = None):
+        self._log = log
+        self.store = store
+        self._changed: Dict[str, int] = {}  # ProgId -> original LoadBehavior
+
+    def suppress(self, profile: LaunchProfile) -> None:
+        keep = {name.strip().lower() for name in profile.addins if name.strip()}
+        for prog_id, (value, friendly) in _startup_addins().items():
+            if _names(prog_id, friendly) & keep or prog_id in self._changed:
+                continue
+            if self.store is not None:
+                self.store.record(prog_id, True, None)  # no instance yet: a leftover if we crash
+            if _set_load_behavior(prog_id, 2):
+                self._changed[prog_id] = value
+        if self._changed:
+            self._log(f"Excel: {len(self._changed)} complément(s) COM non chargé(s) au démarrage.")
+
+    def restore(self) -> None:
+        """Write the original LoadBehavior back (once Excel has read it)."""
+        failed = []
+        restored = []
+        while self._changed:
+            prog_id, value = self._changed.popitem()
+            (restored if _set_load_behavior(prog_id, value) else failed).append(prog_id)
+        if self.store is not None:
+            self.store.remove(restored)  # failures stay: retried at the next start
+        if failed:
+            self._log(f"Excel: état non restauré pour {', '.join(failed)}.")
+
+
+class AddinSetup:
+    """Applies a lean LaunchProfile to an Excel instance.
+
+    - COM add-ins not listed and still connected (registered for all users,
+      or an instance kept from a standard launch) are disconnected
+      (Connect = False). Excel keeps
+      the Connect state of per-user add-ins in the registry, so `restore()`
+      puts every changed add-in back before Quit: the user's own Excel must
+      not lose them. With a `store`, the original state is also written to
+      disk first, for when the instance dies before `restore()`.
+    - listed add-ins (.xlam / .xla / .xll) are opened explicitly: an
+      automation instance does not load installed add-ins by itself.
+
+    Each add-in is best effort: one failing add-in never stops the others.
+    Applying twice only changes what differs (profiles sharing an instance).
+    """
+
+    def __init__(
+        self,
+        excel,
+        log: Callable[[str], None],
+        store: Optional[AddinStateStore] = None,
+        excel_pid: Optional[int] = None,
+    ):
+        self.excel = excel
+        self._log = log
+        self.store = store
+        self.excel_pid = excel_pid
+        self._changed: Dict[str, tuple] = {}  # ProgId -> (COMAddIn, original Connect)
+        self._opened: Set[str] = set()  # FullName of add-ins loaded by us
+
+    def apply(self, profile: LaunchProfile) -> None:
+        keep = {name.strip().lower() for name in profile.addins if name.strip()}
+        found: Set[str] = set()
+        disconnected: List[str] = []
+        failed: List[str] = []
+
+        try:
+            com_addins = list(self.excel.COMAddIns)
+        except Exception:
+            com_addins = []
+        for addin in com_addins:
+            try:
+                prog_id = str(addin.ProgId)
+                names = _names(prog_id, addin.Description) & keep
+                connected = bool(addin.Connect)
+                if names:
+                    found |= names
+                if connected == bool(names):
+                    continue
+                if prog_id not in self._changed:
+                    if self.store is not None:
+                        connected = self.store.record(prog_id, connected, self.excel_pid)
+                    self._changed[prog_id] = (addin, connected)
+                addin.Connect = bool(names)
+                if not names:
+                    disconnected.append(prog_id)
+            except Exception:
+                failed.append(str(getattr(addin, "ProgId", "?")))
+
+        try:
+            addins = list(self.excel.AddIns)
+        except Exception:
+            addins = []
+        for addin in addins:
+            try:
+                names = _names(addin.Name, addin.Title) & keep
+                if not names:
+                    continue
+                found |= names
+                full_name = str(addin.FullName)
+                if full_name in self._opened:
+                    continue
+                if full_name.lower().endswith(".xll"):
+                    self.excel.RegisterXLL(full_name)
+                else:
+                    wb = self.excel.Workbooks.Open(full_name)
+                    try:
+                        wb.RunAutoMacros(XL_AUTO_OPEN)
+                    except Exception:
+                        pass
+                self._opened.add(full_name)
+            except Exception:
+                failed.append(str(getattr(addin, "Name", "?")))
+
+        self._log(
+            f"Excel: lancement allégé ({len(disconnected)} complément(s) COM déconnecté(s), "
+            f"{len(self._opened)} complément(s) chargé(s))."
+        )
+        missing = sorted(name for name in keep if name not in found)
+        if missing:
+            self._log(f"Excel: complément(s) introuvable(s): {', '.join(missing)}.")
+        if failed:
+            self._log(f"Excel: complément(s) en erreur: {', '.join(failed)}.")
+
+    def restore(self) -> None:
+        """Put the Connect state of the COM add-ins back (before Quit)."""
+        failed = []
+        restored = []
+        while self._changed:
+            prog_id, (addin, connected) = self._changed.popitem()
+            try:
+                addin.Connect = connected
+                restored.append(prog_id)
+            except Exception:
+                failed.append(prog_id)
+        if self.store is not None:
+            self.store.remove(restored)  # failures stay: retried at the next start
+        if failed:
+            self._log(f"Excel: état non restauré pour {', '.join(failed)}.")
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    import pythoncom
+    import win32com.client
+except Exception:  # pragma: no cover
+    pythoncom = None
+    win32com = None
+
+
+def _norm(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+@dataclass
+class AttachState:
+    """The automation instance a later run (or process) may reconnect to."""
+
+    pid: int
+    workbooks: List[str] = field(default_factory=list)  # normalized paths opened in it
+    updated_at: float = field(default_factory=time.time)
+    created: Optional[float] = None  # process creation time: tells a reused PID apart
+
+    def same_instance(self, pid: int, created: Optional[float]) -> bool:
+        if self.pid != pid:
+            return False
+        # Creation times from different APIs can differ by rounding only
+        return self.created is None or created is None or abs(self.created - created) < 1.0
+
+    def has(self, workbook_path: str) -> bool:
+        return _norm(workbook_path) in self.workbooks
+
+
+class AttachStore:
+    """Small JSON state file (STATE_DIR/excel_attach.json)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def load(self) -> Optional[AttachState]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return AttachState(**data)
+        except Exception:
+            return None
+
+    def record(self, pid: Optional[int], workbook_path: str, created: Optional[float] = None) -> None:
+        """Remember that `pid` (created at `created`) holds `workbook_path` (best effort)."""
+        if not pid:
+            return
+        state = self.load()
+        if state is None or not state.same_instance(pid, created):
+            state = AttachState(pid=pid, created=created)
+        key = _norm(workbook_path)
+        if key not in state.workbooks:
+            state.workbooks.append(key)
+        state.updated_at = time.time()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(asdict(state), indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+def running_workbook(workbook_path: str):
+    """The open Workbook registered in the Running Object Table, or None.
+
+    Only the ROT is looked up: GetObject(path) would open the file in some
+    instance when it is not already open.
+    """
+    if pythoncom is None:
+        return None
+    target = _norm(workbook_path)
+    try:
+        rot = pythoncom.GetRunningObjectTable()
+        ctx = pythoncom.CreateBindCtx(0)
+        monikers = rot.EnumRunning()
+    except pythoncom.com_error:
+        return None
+    for moniker in monikers:
+        try:
+            if _norm(moniker.GetDisplayName(ctx, None)) != target:
+                continue
+            obj = rot.GetObject(moniker)
+            return win32com.client.Dispatch(obj.QueryInterface(pythoncom.IID_IDispatch))
+        except Exception:
+            continue
+    return None
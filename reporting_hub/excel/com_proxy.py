@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+
+class ComCallStats:
+    """Counts and times COM round trips, grouped by controller operation.
+
+    Only the Excel worker thread talks to COM, but the snapshot can be read
+    from anywhere (benchmarks, UI), hence the lock.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._op = "other"
+        self._calls: Dict[str, Dict[str, int]] = {}
+        self._seconds: Dict[str, float] = {}
+
+    @contextmanager
+    def operation(self, name: str) -> Iterator[None]:
+        prev = self._op
+        self._op = name
+        try:
+            yield
+        finally:
+            self._op = prev
+
+    def record(self, call: str, seconds: float) -> None:
+        with self._lock:
+            per_op = self._calls.setdefault(self._op, {})
+            per_op[call] = per_op.get(call, 0) + 1
+            self._seconds[self._op] = self._seconds.get(self._op, 0.0) + seconds
+
+    def calls(self, operation: str = "") -> int:
+        with self._lock:
+            if operation:
+                return sum(self._calls.get(operation, {}).values())
+            return sum(sum(v.values()) for v in self._calls.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """{operation: {"calls": n, "seconds": s, "detail": {call: n}}}"""
+        with self._lock:
+            return {
+                op: {
+                    "calls": sum(detail.values()),
+                    "seconds": self._seconds.get(op, 0.0),
+                    "detail": dict(detail),
+                }
+                for op, detail in self._calls.items()
+            }
+
+    def summary(self) -> str:
+        snap = self.snapshot()
+        if not snap:
+            return "COM: no call."
+        parts = [f"{op}={v['calls']} ({v['seconds']:.2f}s)" for op, v in snap.items()]
+        return "COM calls: " + ", ".join(parts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._seconds.clear()
+
+
+def _is_com_object(value: Any) -> bool:
+    return hasattr(value, "_oleobj_")
+
+
+class ComProxy:
+    """Thin accounting wrapper around a pywin32 dispatch object.
+
+    Every attribute get/set and every call is timed and recorded in
+    `ComCallStats`. COM objects returned by the wrapped object are wrapped
+    too (Workbooks, Application...), so chained calls are counted.
+    """
+
+    __slots__ = ("_obj", "_stats", "_path")
+
+    def __init__(self, obj: Any, stats: ComCallStats, path: str = "Application"):
+        object.__setattr__(self, "_obj", obj)
+        object.__setattr__(self, "_stats", stats)
+        object.__setattr__(self, "_path", path)
+
+    def _wrap(self, value: Any, path: str) -> Any:
+        if _is_com_object(value):
+            return ComProxy(value, self._stats, path)
+        return value
+
+    def __getattr__(self, name: str) -> Any:
+        path = f"{self._path}.{name}"
+        t0 = time.perf_counter()
+        value = getattr(self._obj, name)
+        if callable(value) and not _is_com_object(value):
+            # Method lookup: the round trip happens on call
+            return _ComMethod(value, self._stats, path)
+        self._stats.record(f"get {path}", time.perf_counter() - t0)
+        return self._wrap(value, path)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        t0 = time.perf_counter()
+        try:
+            setattr(self._obj, name, value)
+        finally:
+            self._stats.record(f"set {self._path}.{name}", time.perf_counter() - t0)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        # Default member, e.g. Workbooks(path)
+        t0 = time.perf_counter()
+        try:
+            value = self._obj(*args, **kwargs)
+        finally:
+            self._stats.record(f"call {self._path}", time.perf_counter() - t0)
+        return self._wrap(value, f"{self._path}()")
+
+    def __iter__(self) -> Iterator[Any]:
+        # COM collections (Worksheets, ListObjects...): one round trip per item
+        it = iter(self._obj)
+        while True:
+            t0 = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                self._stats.record(f"iter {self._path}", time.perf_counter() - t0)
+            yield self._wrap(item, f"{self._path}[]")
+
+    def __repr__(self) -> str:
+        return f"<ComProxy {self._path}>"
+
+
+class _ComMethod:
+    __slots__ = ("_fn", "_stats", "_path")
+
+    def __init__(self, fn, stats: ComCallStats, path: str):
+        self._fn = fn
+        self._stats = stats
+        self._path = path
+
+    def __call__(self, *args, **kwargs) -> Any:
+        t0 = time.perf_counter()
+        try:
+            value = self._fn(*args, **kwargs)
+        finally:
+            self._stats.record(f"call {self._path}", time.perf_counter() - t0)
+        if _is_com_object(value):
+            return ComProxy(value, self._stats, f"{self._path}()")
+        return value
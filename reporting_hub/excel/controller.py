@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import logging
 import os
 import time
-from typing import Callable, Optional
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 try:
     import pythoncom
@@ -17,10 +18,27 @@ except Exception:  # pragma: no cover
     win32con = None
     win32process = None
 
+from ..config.models import ExecutionProfile, LaunchProfile
+from ..utils.log import get_logger
+from .addins import AddinSetup, AddinStateStore, StartupAddins
+from .attach import running_workbook
+from .com_proxy import ComCallStats, ComProxy
+from .processes import Win32ProcessTable, process_created, same_process
+from .tuning import ApplicationTuning
 from .ui_watcher import ExcelUIWatcher
 
 
-Logger = Callable[[str], None]
+Rows = Tuple[tuple, ...]
+
+# XlCellType
+XL_CELL_TYPE_FORMULAS = -4123
+
+
+def _as_rows(values) -> Rows:
+    """Value2 of a single cell is a scalar, of a block a tuple of row tuples."""
+    if isinstance(values, tuple):
+        return values
+    return ((values,),)
 
 
 class ExcelController:
@@ -30,18 +48,41 @@ class ExcelController:
     - opens/activates workbooks
     - runs macros
     - optionally keeps dialogs visible via ExcelUIWatcher
+
+    Every COM round trip goes through ComProxy and is counted per operation
+    in `com_stats`. Values that cannot change for an instance (Hwnd, PID)
+    are read once, and the last applied window state is tracked so no-op
+    mode transitions cost no COM call.
     """
 
-    def __init__(self, logger: Logger):
-        self.logger = logger
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger or get_logger("excel")
         self.excel = None
         self.excel_pid: Optional[int] = None
+        self.excel_created: Optional[float] = None  # process creation time: PID + this = same instance
+        self.excel_hwnd: Optional[int] = None
         self.ui_watcher: Optional[ExcelUIWatcher] = None
         self.mode = "minimized"  # minimized | hidden | visible
-
-    def _log(self, msg: str) -> None:
+        self.com_stats = ComCallStats()
+        # Called with the PID of each launched / attached instance (ExcelLifecycle)
+        self.on_launch: Optional[Callable[[Optional[int]], None]] = None
+        # Instance found already running (attach mode) rather than launched
+        self.attached = False
+        # Add-ins changed by a lean launch profile (restored before Quit)
+        self._addins: Optional[AddinSetup] = None
+        # Their original state on disk, for an instance that dies first (ExcelLifecycle)
+        self.addin_store: Optional[AddinStateStore] = None
+        # Seconds spent in the last DispatchEx (add-ins, window mode not included)
+        self.launch_s = 0.0
+
+        # Last state pushed to Excel (None = unknown)
+        self._visible: Optional[bool] = None
+        self._applied_mode: Optional[str] = None
+
+    def _log(self, msg: str, level: int = logging.INFO) -> None:
+        # Only enqueues: never blocks the COM thread on I/O
         try:
-            self.logger(msg)
+            self.logger.log(level, msg)
         except Exception:
             pass
 
@@ -49,16 +90,123 @@ class ExcelController:
         if self.excel is None:
             raise RuntimeError("Excel n'est pas lancé.")
 
-    def launch_new_instance(self) -> None:
+    def _reset_instance_state(self) -> None:
+        self.excel = None
+        self.excel_pid = None
+        self.excel_created = None
+        self.excel_hwnd = None
+        self.ui_watcher = None
+        self.attached = False
+        self._addins = None
+        self._visible = None
+        self._applied_mode = None
+
+    def launch_new_instance(self, launch: Optional[LaunchProfile] = None) -> None:
         if not pythoncom or not win32com:
             raise RuntimeError("pywin32 est requis (Windows uniquement).")
 
-        # NOTE:
-        # Excel COM objects MUST be created and used on the same thread.
-        # We initialize COM once in the dedicated Excel worker thread.
-        self.excel = win32com.client.DispatchEx("Excel.Application")
-        self._log("Excel: instance dédiée lancée.")
+        # Lean: unlisted COM add-ins must be off in the registry before Excel
+        # starts, they are loaded before DispatchEx returns
+        startup = StartupAddins(self._log, self.addin_store) if launch is not None and launch.lean else None
+        try:
+            if startup is not None:
+                startup.suppress(launch)
+            with self.com_stats.operation("launch"):
+                # NOTE:
+                # Excel COM objects MUST be created and used on the same thread.
+                # We initialize COM once in the dedicated Excel worker thread.
+                t0 = time.perf_counter()
+                excel = win32com.client.DispatchEx("Excel.Application")
+                self.launch_s = time.perf_counter() - t0
+                self.excel = ComProxy(excel, self.com_stats)
+                self._log("Excel: instance dédiée lancée.")
+                self._adopt()
+        finally:
+            if startup is not None:
+                startup.restore()  # read at startup only: the user's next Excel gets them back
+
+        if launch is not None and launch.lean:
+            self.apply_launch_profile(launch)
+        self.set_excel_mode(self.mode)
+
+    def apply_launch_profile(self, launch: LaunchProfile) -> None:
+        """Lean launch: disconnect COM add-ins, load only the listed add-ins."""
+        self._ensure_excel()
+        with self.com_stats.operation("addins"):
+            if self._addins is None:
+                self._addins = AddinSetup(self.excel, self._log, self.addin_store, self.excel_pid)
+            self._addins.apply(launch)
+
+    def _restore_addins(self) -> None:
+        if self._addins is not None:
+            with self.com_stats.operation("addins"):
+                self._addins.restore()
+
+    def attach_to_workbook(
+        self, workbook_path: str, expected_pid: Optional[int], expected_created: Optional[float] = None
+    ) -> bool:
+        """Reuse the automation instance that already has the workbook open.
+
+        The instance is found through the Running Object Table and kept only
+        if it is the recorded process (PID and, when known, creation time):
+        the user's own Excel is never recorded. UserControl cannot tell them
+        apart, Visible=True sets it on our instance too. False = nothing to
+        attach to: launch instead.
+        """
+        if not pythoncom or not win32com or not expected_pid:
+            return False
+        with self.com_stats.operation("attach"):
+            wb = running_workbook(workbook_path)
+            if wb is None:
+                return False
+            try:
+                app = wb.Application
+                _, pid = win32process.GetWindowThreadProcessId(app.Hwnd)
+                if pid != expected_pid:
+                    return False
+                if expected_created is not None and not same_process(
+                    Win32ProcessTable().info(pid), expected_created
+                ):
+                    return False  # PID reused since it was recorded
+            except Exception:
+                return False
+            self.excel = ComProxy(app, self.com_stats)
+            self.attached = True
+            self._log(f"Excel: instance existante rattachée (PID={pid}).")
+            self._adopt()
+
+        self.set_excel_mode(self.mode)
+        return True
+
+    def holds_workbook(self, workbook_path: str, kept_pid: Optional[int] = None) -> bool:
+        """The workbook is open in our instance, or in the kept instance `kept_pid`.
 
+        Its lock file (~$name) is then ours, not a user's or a writer's.
+        """
+        key = os.path.normcase(os.path.abspath(workbook_path))
+        if self.excel is not None:
+            with self.com_stats.operation("workbooks"):
+                return any(os.path.normcase(str(wb.FullName)) == key for wb in self.excel.Workbooks)
+        if not pythoncom or not win32com or not kept_pid:
+            return False
+        with self.com_stats.operation("attach"):
+            wb = running_workbook(workbook_path)
+            if wb is None:
+                return False
+            _, pid = win32process.GetWindowThreadProcessId(wb.Application.Hwnd)
+            return pid == kept_pid
+
+    def detach(self) -> None:
+        """Release the instance without quitting it (attach mode)."""
+        if self.ui_watcher:
+            self.ui_watcher.stop()
+        if self.excel is not None:
+            self._restore_addins()
+            self._log("Excel: instance laissée ouverte pour la prochaine exécution.")
+        self._reset_instance_state()
+
+    def _adopt(self) -> None:
+        """Prompts, UI watcher and lifecycle hook for the current instance."""
         # Best effort to reduce prompts
         for attr, value in (("DisplayAlerts", False), ("AskToUpdateLinks", False)):
             try:
@@ -68,9 +216,10 @@ class ExcelController:
 
         # Setup watcher
         try:
-            hwnd = self.excel.Hwnd
+            self.excel_hwnd = hwnd = self.excel.Hwnd
             _, pid = win32process.GetWindowThreadProcessId(hwnd)
             self.excel_pid = pid
+            self.excel_created = process_created(pid)
             # Keep the *main* Excel window discreet, but still allow dialogs
             # (MsgBox/UserForms) to surface via the watcher.
             self.ui_watcher = ExcelUIWatcher(pid, main_mode=self.mode)
@@ -79,23 +228,50 @@ class ExcelController:
         except Exception:
             self._log("Excel: watcher UI non initialisé (pas bloquant).")
 
-        self.set_excel_mode(self.mode)
+        if self.on_launch is not None:
+            try:
+                self.on_launch(self.excel_pid)
+            except Exception:
+                self._log("Excel: suivi de l'instance impossible.", logging.WARNING)
 
     def quit_excel(self) -> None:
         self._ensure_excel()
         try:
-            if self.ui_watcher:
-                self.ui_watcher.stop()
+            with self.com_stats.operation("quit"):
+                if self.ui_watcher:
+                    self.ui_watcher.stop()
+                self._restore_addins()
+                try:
+                    self.excel.DisplayAlerts = False
+                except Exception:
+                    pass
+                self.excel.Quit()
+                self._log("Excel: fermé.")
+        finally:
+            self._reset_instance_state()
+
+    def _hwnd(self) -> Optional[int]:
+        # Hwnd is immutable for the lifetime of the instance: one round trip.
+        if self.excel_hwnd is None:
             try:
-                self.excel.DisplayAlerts = False
+                self.excel_hwnd = self.excel.Hwnd
             except Exception:
                 pass
-            self.excel.Quit()
-            self._log("Excel: fermé.")
-        finally:
-            self.excel = None
-            self.excel_pid = None
-            self.ui_watcher = None
+        return self.excel_hwnd
+
+    @staticmethod
+    def _window_in_mode(hwnd, mode: str) -> bool:
+        """Local (non-COM) check of the main window state."""
+        try:
+            visible = bool(win32gui.IsWindowVisible(hwnd))
+            iconic = bool(win32gui.IsIconic(hwnd))
+        except Exception:
+            return False
+        if mode == "hidden":
+            return not visible
+        if mode == "minimized":
+            return visible and iconic
+        return visible and not iconic
 
     def set_excel_mode(self, mode: str) -> None:
         self._ensure_excel()
@@ -112,29 +288,37 @@ class ExcelController:
         except Exception:
             pass
 
-        hwnd = None
-        try:
-            hwnd = self.excel.Hwnd
-        except Exception:
-            pass
+        with self.com_stats.operation("set_excel_mode"):
+            hwnd = self._hwnd()
+
+            # No-op transition: same mode already applied and the window
+            # (checked without COM) is still in that state.
+            if (
+                self._applied_mode == mode
+                and self._visible
+                and hwnd
+                and win32gui
+                and self._window_in_mode(hwnd, mode)
+            ):
+                return
 
-        try:
-            if mode == "hidden":
-                # Keep Excel "Visible" at the COM level so dialogs/UserForms
-                # can still surface, but hide the main window.
-                self.excel.Visible = True
-                if hwnd and win32gui:
-                    win32gui.ShowWindow(hwnd, win32con.SW_HIDE)
-            elif mode == "minimized":
-                self.excel.Visible = True
-                if hwnd and win32gui:
-                    win32gui.ShowWindow(hwnd, win32con.SW_MINIMIZE)
-            else:
-                self.excel.Visible = True
-                if hwnd and win32gui:
-                    win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-        except Exception:
-            pass
+            try:
+                # Keep Excel "Visible" at the COM level in every mode so
+                # dialogs/UserForms can still surface; only the main window
+                # state changes.
+                if not self._visible:
+                    self.excel.Visible = True
+                    self._visible = True
+                if hwnd and win32gui and not self._window_in_mode(hwnd, mode):
+                    show = {
+                        "hidden": win32con.SW_HIDE,
+                        "minimized": win32con.SW_MINIMIZE,
+                    }.get(mode, win32con.SW_RESTORE)
+                    win32gui.ShowWindow(hwnd, show)
+                self._applied_mode = mode
+            except Exception:
+                self._visible = None
+                self._applied_mode = None
 
     def show_excel_for_seconds(self, seconds: int = 10) -> None:
         """Show Excel temporarily.
@@ -158,6 +342,10 @@ class ExcelController:
         if not os.path.exists(path):
             raise RuntimeError(f"Classeur introuvable: {path}")
 
+        with self.com_stats.operation("open"):
+            return self._open_or_activate(path)
+
+    def _open_or_activate(self, path: str) -> str:
         # Try already open
         try:
             wb = self.excel.Workbooks(path)
@@ -179,7 +367,177 @@ class ExcelController:
         except Exception as e:
             raise RuntimeError(f"Erreur ouverture pilote: {e}")
 
-    def run_macro(self, wb_name: str, macro_name: str, *args) -> None:
+    def save_workbook(self, wb_name: str) -> None:
+        self._ensure_excel()
+        t0 = time.perf_counter()
+        with self.com_stats.operation("save"):
+            try:
+                self.excel.Workbooks(wb_name).Save()
+            except Exception as e:
+                raise RuntimeError(f"Erreur enregistrement {wb_name}: {e}")
+        self._log(f"Classeur enregistré: {wb_name} ({time.perf_counter() - t0:.1f}s)")
+
+    def measure_calculation(self, wb_name: str) -> Tuple[float, List[dict]]:
+        """Time a full recalculation, then each worksheet on its own.
+
+        Returns (full_s, [{sheet, seconds, used_range, rows, columns, formulas}]).
+        A sheet is forced dirty (EnableCalculation off/on) before its
+        Calculate so the whole sheet is timed, not only dirty cells.
+        Calculation is manual meanwhile and restored afterwards.
+        """
+        self._ensure_excel()
+        wb = self.excel.Workbooks(wb_name)
+        quiet = ExecutionProfile(calculation="manual", screen_updating=False, enable_events=False)
+        sheets: List[dict] = []
+        with self.com_stats.operation("profile_calc"), ApplicationTuning(self.excel, quiet, self._log):
+            t0 = time.perf_counter()
+            self.excel.CalculateFull()
+            full_s = time.perf_counter() - t0
+
+            for ws in wb.Worksheets:
+                used = ws.UsedRange
+                item = {
+                    "sheet": str(ws.Name),
+                    "used_range": str(used.Address).replace("$", ""),
+                    "rows": int(used.Rows.Count),
+                    "columns": int(used.Columns.Count),
+                    "formulas": 0,
+                }
+                try:
+                    item["formulas"] = int(used.SpecialCells(XL_CELL_TYPE_FORMULAS).CountLarge)
+                except Exception:
+                    pass  # SpecialCells raises when the sheet has no formula
+
+                ws.EnableCalculation = False
+                ws.EnableCalculation = True
+                t0 = time.perf_counter()
+                ws.Calculate()
+                item["seconds"] = time.perf_counter() - t0
+                sheets.append(item)
+        self._log(f"Profil de calcul: {wb_name} ({full_s:.2f}s, {len(sheets)} feuilles)")
+        return full_s, sheets
+
+    def resolve_range(self, wb_name: str, ref: str):
+        """COM Range for a defined name, a table (ListObject) or 'Sheet!A1:D10'."""
+        self._ensure_excel()
+        wb = self.excel.Workbooks(wb_name)
+        ref = (ref or "").strip()
+        if "!" in ref:
+            sheet, addr = ref.rsplit("!", 1)
+            return wb.Worksheets(sheet.strip("'")).Range(addr)
+        try:
+            return wb.Names(ref).RefersToRange
+        except Exception:
+            pass
+        table = self._find_table(wb, ref)
+        if table is not None:
+            return table.Range
+        raise RuntimeError(f"Plage introuvable: {ref}")
+
+    @staticmethod
+    def _find_table(wb, name: str):
+        if "!" in name:
+            return None
+        for ws in wb.Worksheets:
+            try:
+                return ws.ListObjects(name)
+            except Exception:
+                continue
+        return None
+
+    def iter_range_values(self, wb_name: str, ref: str, chunk_rows: int = 50_000) -> Iterator[Rows]:
+        """Read a range with one Value2 call per block of `chunk_rows` rows."""
+        with self.com_stats.operation("extract"):
+            rng = self.resolve_range(wb_name, ref)
+            n_rows = int(rng.Rows.Count)
+            n_cols = int(rng.Columns.Count)
+
+        chunk_rows = max(1, int(chunk_rows))
+        for start in range(0, n_rows, chunk_rows):
+            n = min(chunk_rows, n_rows - start)
+            with self.com_stats.operation("extract"):
+                block = rng if n == n_rows else rng.Offset(start, 0).Resize(n, n_cols)
+                values = block.Value2
+            yield _as_rows(values)
+
+    def write_range_rows(
+        self,
+        wb_name: str,
+        target: str,
+        chunks: Iterable[Rows],
+        width: int,
+        header: Optional[Sequence[object]] = None,
+        clear: bool = True,
+    ) -> int:
+        """Write row blocks into a range or table; one Value2 assignment per block.
+
+        - table (ListObject): rows go in the data body (header ignored), then
+          the table is resized to the written rows;
+        - defined name / 'Sheet!A1': written from the top-left cell, and a
+          defined name is re-pointed to the written area.
+        Returns the number of data rows written.
+        """
+        self._ensure_excel()
+        with self.com_stats.operation("inject"):
+            wb = self.excel.Workbooks(wb_name)
+            table = self._find_table(wb, target)
+            offset = 0
+            if table is not None:
+                table_cols = int(table.ListColumns.Count)
+                if width > table_cols:
+                    raise RuntimeError(f"Table {target}: {width} colonnes en entrée pour {table_cols}.")
+                if clear:
+                    body = table.DataBodyRange
+                    if body is not None:
+                        body.Delete()
+                else:
+                    offset = int(table.ListRows.Count)
+                top_left = table.HeaderRowRange.Cells(1, 1)
+                offset += 1  # below the header row
+                header = None
+            else:
+                rng = self.resolve_range(wb_name, target)
+                if clear:
+                    rng.ClearContents()
+                top_left = rng.Cells(1, 1)
+
+            if header is not None:
+                top_left.Resize(1, width).Value2 = (tuple(header),)
+                offset += 1
+
+        start = offset
+        for rows in chunks:
+            if not rows:
+                continue
+            with self.com_stats.operation("inject"):
+                top_left.Offset(offset, 0).Resize(len(rows), width).Value2 = rows
+            offset += len(rows)
+
+        written = offset - start
+        with self.com_stats.operation("inject"):
+            if table is not None:
+                if written:
+                    table.Resize(top_left.Resize(offset, max(width, table_cols)))
+            elif offset and "!" not in target:
+                try:
+                    area = top_left.Resize(offset, width)
+                    wb.Names(target).RefersTo = "=" + area.Address(True, True, 1, True)
+                except Exception:
+                    pass
+        return written
+
+    def run_macro(
+        self,
+        wb_name: str,
+        macro_name: str,
+        *args,
+        execution: Optional[ExecutionProfile] = None,
+    ) -> float:
+        """Run a macro; returns its duration in seconds.
+
+        `execution` (calculation mode, screen updating...) is applied right
+        before Application.Run and restored afterwards, even on error.
+        """
         self._ensure_excel()
         macro_name = (macro_name or "").strip()
         if not macro_name:
@@ -193,12 +551,15 @@ class ExcelController:
             attempts.append(f"{wb_name}!{macro_name}")
 
         last_err = None
-        for m in attempts:
-            try:
-                self.excel.Application.Run(m, *args)
-                self._log(f"Macro OK: {m}")
-                return
-            except Exception as e:
-                last_err = e
+        with self.com_stats.operation("run_macro"), ApplicationTuning(self.excel, execution, self._log):
+            for m in attempts:
+                t0 = time.perf_counter()
+                try:
+                    self.excel.Run(m, *args)  # self.excel is the Application
+                    elapsed = time.perf_counter() - t0
+                    self._log(f"Macro OK: {m} ({elapsed:.1f}s)")
+                    return elapsed
+                except Exception as e:
+                    last_err = e
 
         raise RuntimeError(f"Macro KO. Dernière erreur: {last_err}")
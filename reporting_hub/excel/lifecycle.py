@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import gc
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from ..utils.log import get_logger
+from .addins import AddinStateStore
+from .attach import AttachStore
+from .controller import ExcelController
+from .processes import EXCEL_IMAGE, ProcessInfo, ProcessTable, Win32ProcessTable, same_process
+
+
+@dataclass
+class InstanceRecord:
+    pid: int
+    created: float  # Excel process creation time
+    owner_pid: int  # reporting_hub process that launched it
+    owner_created: float
+    launched_at: float
+
+
+class PidRegistry:
+    """Excel instances launched by reporting_hub (JSON file, all processes)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def entries(self) -> List[InstanceRecord]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return [InstanceRecord(**item) for item in data.get("instances", [])]
+        except Exception:
+            return []
+
+    def _write(self, entries: List[InstanceRecord]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"instances": [asdict(e) for e in entries]}, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def add(self, record: InstanceRecord) -> None:
+        with self._lock:
+            entries = [e for e in self.entries() if e.pid != record.pid]
+            self._write(entries + [record])
+
+    def remove(self, pid: int) -> None:
+        with self._lock:
+            entries = self.entries()
+            kept = [e for e in entries if e.pid != pid]
+            if len(kept) != len(entries):
+                self._write(kept)
+
+
+class ExcelLifecycle:
+    """Tracks the Excel instances this process launches.
+
+    - every launched instance is written to the PID registry, so a crashed
+      session's EXCEL.EXE can be terminated by the next start
+      (`reap_orphans`); Excel processes not in the registry (the user's
+      own) are never touched;
+    - COM add-ins a lean launch left disconnected in an instance that is
+      gone are put back at the same time (`restore_addins`);
+    - `after_task` recycles the instance after `max_runs` runs or when its
+      private memory exceeds `max_memory_mb` (checked between tasks only).
+    """
+
+    def __init__(
+        self,
+        registry: PidRegistry,
+        table: Optional[ProcessTable] = None,
+        max_runs: int = 0,
+        max_memory_mb: int = 0,
+        logger: Optional[logging.Logger] = None,
+        quit_grace_s: float = 10.0,
+        attach_store: Optional[AttachStore] = None,
+        addin_store: Optional[AddinStateStore] = None,
+    ):
+        self.registry = registry
+        self.table = table or Win32ProcessTable()
+        self.max_runs = max(0, int(max_runs or 0))
+        self.max_memory_mb = max(0, int(max_memory_mb or 0))
+        self.logger = logger or get_logger("excel")
+        self.quit_grace_s = quit_grace_s
+        self.runs = 0  # runs in the current instance
+        # Attach mode: the instance kept for reconnection is not an orphan
+        self.attach_store = attach_store
+        self.addin_store = addin_store
+        self._me: Optional[ProcessInfo] = None
+
+    # ---------- registry ----------
+    def _owner(self) -> ProcessInfo:
+        if self._me is None:
+            self._me = self.table.info(os.getpid()) or ProcessInfo(os.getpid(), "", 0.0)
+        return self._me
+
+    def attach(self, controller: ExcelController) -> None:
+        """Register every instance the controller launches."""
+        controller.on_launch = self.register
+        controller.addin_store = self.addin_store
+
+    def register(self, pid: Optional[int]) -> None:
+        self.runs = 0
+        info = self.table.info(pid) if pid else None
+        if info is None:
+            return
+        me = self._owner()
+        try:
+            self.registry.add(InstanceRecord(pid, info.created, me.pid, me.created, time.time()))
+        except OSError:
+            self.logger.warning("Excel: registre des instances non écrit.", exc_info=True)
+
+    def release(self, pid: Optional[int]) -> None:
+        """Forget an instance (closed, or deliberately left open for the user)."""
+        if pid:
+            try:
+                self.registry.remove(pid)
+            except OSError:
+                pass
+
+    def reap_orphans(self) -> int:
+        """Terminate instances launched by a reporting_hub process that is gone."""
+        reaped = 0
+        kept = self.attach_store.load() if self.attach_store is not None else None
+        for rec in self.registry.entries():
+            info = self.table.info(rec.pid)
+            if not same_process(info, rec.created) or info.name not in ("", EXCEL_IMAGE):
+                self.release(rec.pid)  # exited, or PID reused by another process
+                continue
+            if same_process(self.table.info(rec.owner_pid), rec.owner_created):
+                continue  # its reporting_hub is still running
+            if kept is not None and kept.same_instance(rec.pid, rec.created):
+                continue  # left open on purpose, next run attaches to it
+            if self.table.terminate(rec.pid):
+                reaped += 1
+                self.logger.warning(f"Excel orphelin terminé (PID={rec.pid}).")
+                self.release(rec.pid)
+        return reaped
+
+    def restore_addins(self) -> int:
+        """Put back the add-ins left disconnected by instances that are gone.
+
+        Call after `reap_orphans`: a reaped instance never ran its restore.
+        """
+        if self.addin_store is None:
+            return 0
+
+        def alive(pid: int) -> bool:
+            info = self.table.info(pid) if pid else None
+            return info is not None and info.name in ("", EXCEL_IMAGE)
+
+        return self.addin_store.restore_leftovers(alive, self.logger)
+
+    # ---------- recycling ----------
+    def memory_mb(self, pid: Optional[int]) -> float:
+        info = self.table.info(pid) if pid else None
+        return info.memory_bytes / (1024 * 1024) if info else 0.0
+
+    def recycle_reason(self, controller: ExcelController) -> str:
+        if controller.excel is None:
+            return ""
+        if self.max_runs and self.runs >= self.max_runs:
+            return f"{self.runs} exécutions"
+        if self.max_memory_mb:
+            mb = self.memory_mb(controller.excel_pid)
+            if mb > self.max_memory_mb:
+                return f"{mb:,.0f} Mo"
+        return ""
+
+    def after_task(self, controller: ExcelController, counted: bool) -> None:
+        """Between two tasks: recycle the instance when a limit is reached.
+
+        The next run launches a fresh instance.
+        """
+        if counted:
+            self.runs += 1
+        reason = self.recycle_reason(controller)
+        if reason:
+            self.logger.info(f"Excel: recyclage de l'instance ({reason}).")
+            self.quit(controller)
+
+    def quit(self, controller: ExcelController) -> None:
+        """Quit the instance; terminate it if the process outlives Quit."""
+        pid = controller.excel_pid
+        rec = next((e for e in self.registry.entries() if e.pid == pid), None)
+        try:
+            if controller.excel is not None:
+                controller.quit_excel()
+        except Exception:
+            self.logger.warning("Excel: Quit a échoué.", exc_info=True)
+        self.runs = 0
+        if not pid:
+            return
+        gc.collect()  # drop the last COM references so EXCEL.EXE can exit
+        deadline = time.monotonic() + self.quit_grace_s
+        while rec is not None and same_process(self.table.info(pid), rec.created):
+            if time.monotonic() >= deadline:
+                if self.table.terminate(pid):
+                    self.logger.warning(f"Excel: processus terminé après Quit (PID={pid}).")
+                break
+            time.sleep(0.2)
+        self.release(pid)
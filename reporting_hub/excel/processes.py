@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import pywintypes
+    import win32api
+    import win32con
+    import win32process
+except Exception:  # pragma: no cover
+    pywintypes = None
+    win32api = None
+    win32con = None
+    win32process = None
+
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_SYNCHRONIZE = 0x00100000
+_STILL_ACTIVE = 259
+EXCEL_IMAGE = "excel.exe"
+
+
+# Process identity for state kept across runs (PID registry, attach, checkpoints):
+# Windows reuses PIDs, so a PID only names the same process with its creation time.
+
+
+@dataclass
+class ProcessInfo:
+    pid: int
+    name: str  # image name, lower case ("excel.exe")
+    created: float  # epoch seconds: tells a PID apart from a reused one
+    memory_bytes: int = 0  # private bytes
+
+
+def same_process(info: Optional[ProcessInfo], created: Optional[float]) -> bool:
+    # Creation times from different APIs can differ by rounding only
+    return info is not None and created is not None and abs(info.created - created) < 1.0
+
+
+def process_created(pid: Optional[int]) -> Optional[float]:
+    """Creation time (epoch seconds) of a running process, or None."""
+    info = Win32ProcessTable().info(pid) if pid else None
+    return info.created if info is not None else None
+
+
+class ProcessTable:
+    """What the lifecycle manager needs from the OS (fake it in tests)."""
+
+    def info(self, pid: int) -> Optional[ProcessInfo]:
+        """The running process with this PID, or None."""
+        raise NotImplementedError
+
+    def terminate(self, pid: int) -> bool:
+        raise NotImplementedError
+
+
+class Win32ProcessTable(ProcessTable):
+    def info(self, pid: int) -> Optional[ProcessInfo]:
+        if win32api is None or not pid:
+            return None
+        access = win32con.PROCESS_QUERY_INFORMATION | win32con.PROCESS_VM_READ
+        try:
+            handle = win32api.OpenProcess(access, False, pid)
+        except pywintypes.error:
+            try:  # elevated / other user's process: no memory figures
+                handle = win32api.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+                access = _PROCESS_QUERY_LIMITED_INFORMATION
+            except pywintypes.error:
+                return None
+        try:
+            if win32process.GetExitCodeProcess(handle) != _STILL_ACTIVE:
+                return None
+            created = win32process.GetProcessTimes(handle)["CreationTime"].timestamp()
+            try:
+                name = os.path.basename(win32process.GetModuleFileNameEx(handle, 0)).lower()
+            except pywintypes.error:
+                name = ""
+            memory = 0
+            if access != _PROCESS_QUERY_LIMITED_INFORMATION:
+                memory = int(win32process.GetProcessMemoryInfo(handle).get("PagefileUsage", 0))
+            return ProcessInfo(pid=pid, name=name, created=created, memory_bytes=memory)
+        except pywintypes.error:
+            return None
+        finally:
+            handle.Close()
+
+    def terminate(self, pid: int) -> bool:
+        if win32api is None:
+            return False
+        try:
+            handle = win32api.OpenProcess(win32con.PROCESS_TERMINATE | _SYNCHRONIZE, False, pid)
+        except pywintypes.error:
+            return False
+        try:
+            win32api.TerminateProcess(handle, 1)
+            return True
+        except pywintypes.error:
+            return False
+        finally:
+            handle.Close()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import Any, Callable, List, Optional, Tuple
+
+from ..config.models import ExecutionProfile
+
+
+# XlCalculation
+XL_CALCULATION = {
+    "automatic": -4105,
+    "manual": -4135,
+    "semiautomatic": 2,
+}
+
+# XlThreadMode
+XL_THREAD_MODE_AUTOMATIC = 0
+XL_THREAD_MODE_MANUAL = 1
+
+
+class ApplicationTuning:
+    """Applies an ExecutionProfile to Excel for the duration of a `with` block.
+
+    Previous values are read before any change and restored in reverse order
+    on exit, including when the macro raises. Each setting is best effort:
+    one failing property never prevents the others from being restored.
+    """
+
+    def __init__(self, excel, profile: Optional[ExecutionProfile], log: Callable[[str], None]):
+        self.excel = excel
+        self.profile = profile
+        self._log = log
+        # (description, restore function)
+        self._undo: List[Tuple[str, Callable[[], None]]] = []
+
+    @property
+    def active(self) -> bool:
+        return self.profile is not None and not self.profile.is_empty()
+
+    def _set(self, obj, attr: str, value: Any) -> None:
+        prev = getattr(obj, attr)
+        if prev == value:
+            return
+        setattr(obj, attr, value)
+        self._undo.append((attr, lambda: setattr(obj, attr, prev)))
+
+    def _apply_threads(self, count: int) -> None:
+        mtc = self.excel.MultiThreadedCalculation
+        self._set(mtc, "Enabled", True)
+        if count <= 0:
+            self._set(mtc, "ThreadMode", XL_THREAD_MODE_AUTOMATIC)
+        else:
+            # ThreadCount is only writable in manual thread mode
+            self._set(mtc, "ThreadMode", XL_THREAD_MODE_MANUAL)
+            self._set(mtc, "ThreadCount", count)
+
+    def __enter__(self) -> "ApplicationTuning":
+        if not self.active:
+            return self
+        p = self.profile
+        steps: List[Tuple[str, Callable[[], None]]] = []
+        if p.calculation:
+            steps.append(("Calculation", lambda: self._set(self.excel, "Calculation", XL_CALCULATION[p.calculation])))
+        if p.screen_updating is not None:
+            steps.append(("ScreenUpdating", lambda: self._set(self.excel, "ScreenUpdating", p.screen_updating)))
+        if p.enable_events is not None:
+            steps.append(("EnableEvents", lambda: self._set(self.excel, "EnableEvents", p.enable_events)))
+        if p.display_status_bar is not None:
+            steps.append(
+                ("DisplayStatusBar", lambda: self._set(self.excel, "DisplayStatusBar", p.display_status_bar))
+            )
+        if p.calc_threads is not None:
+            steps.append(("MultiThreadedCalculation", lambda: self._apply_threads(int(p.calc_threads))))
+
+        failed = []
+        for name, fn in steps:
+            try:
+                fn()
+            except Exception:
+                failed.append(name)
+
+        applied = ", ".join(name for name, _ in self._undo) or "rien"
+        self._log(f"Exécution: profil appliqué ({applied}).")
+        if failed:
+            self._log(f"Exécution: non appliqué: {', '.join(failed)}.")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        failed = []
+        while self._undo:
+            name, restore = self._undo.pop()
+            try:
+                restore()
+            except Exception:
+                failed.append(name)
+        if self.active:
+            if failed:
+                self._log(f"Exécution: restauration KO pour {', '.join(failed)}.")
+            else:
+                self._log("Exécution: paramètres Excel restaurés.")
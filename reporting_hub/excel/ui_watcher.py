@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import threading
 import time
+from typing import Dict, List, Optional, Tuple
 
 try:
     import win32con
@@ -13,96 +14,53 @@ except Exception:  # pragma: no cover
     win32process = None
 
 
-class ExcelUIWatcher:
-    """
-    Goal: keep Excel main window minimized/hidden while letting MsgBox/UserForms appear.
-
-    Key stability rule (anti-flicker):
-    - NEVER "bring to front" a dialog repeatedly.
-    - Enforce main window state only:
-        * periodically when no dialog exists,
-        * once when a dialog first appears (to hide the workbook),
-        * then pause enforcement while the dialog is open.
-    """
-
-    def __init__(self, excel_pid: int, main_mode: str = "minimized"):
-        self.excel_pid = excel_pid
-        self._stop = threading.Event()
-        self._thread = None
-        self._main_mode = (main_mode or "minimized").strip().lower()
+def _is_main_class(cls: str) -> bool:
+    return cls in ("XLMAIN", "EXCEL7")
 
-        # Anti-flicker state
-        self._had_dialogs = False
-        self._seen_dialogs: set[int] = set()
-        self._last_main_enforce = 0.0
 
-        # Tunables
-        self._poll_s = 0.45              # lower frequency = less redraw/flicker
-        self._main_enforce_period_s = 1.5  # only enforce main window every Xs (when no dialog)
+def _is_dialog_class(cls: str) -> bool:
+    if cls in ("XLMAIN", "EXCEL7"):
+        return False
+    if cls == "#32770":            # standard dialog
+        return True
+    if cls.startswith("Thunder"):  # VBA UserForms
+        return True
+    return False
 
-    def set_main_mode(self, mode: str) -> None:
-        m = (mode or "").strip().lower()
-        if m not in ("minimized", "hidden", "visible"):
-            m = "minimized"
-        self._main_mode = m
 
-    def start(self) -> None:
-        if not win32gui or not win32process or not win32con:
-            return
-        if self._thread and self._thread.is_alive():
-            return
-        self._stop.clear()
-        self._thread = threading.Thread(target=self._run, daemon=True)
-        self._thread.start()
+class WindowOps:
+    """Desktop access used by the watcher service (win32; fake it in benches)."""
 
-    def stop(self) -> None:
-        self._stop.set()
+    def available(self) -> bool:
+        return bool(win32gui and win32process and win32con)
 
-    def _iter_excel_windows(self):
-        hwnds = []
+    def enumerate(self) -> List[Tuple[int, int]]:
+        """(hwnd, pid) of every top-level window: ONE EnumWindows call."""
+        out: List[Tuple[int, int]] = []
 
         def enum_cb(hwnd, _):
             try:
-                _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                if pid != self.excel_pid:
-                    return True
-                if not win32gui.IsWindow(hwnd):
-                    return True
-                hwnds.append(hwnd)
+                out.append((hwnd, win32process.GetWindowThreadProcessId(hwnd)[1]))
             except Exception:
                 pass
             return True
 
         win32gui.EnumWindows(enum_cb, None)
-        return hwnds
+        return out
 
-    def _class_name(self, hwnd) -> str:
+    def class_name(self, hwnd) -> str:
         try:
             return win32gui.GetClassName(hwnd)
         except Exception:
             return ""
 
-    def _is_main_excel_window(self, hwnd) -> bool:
-        cls = self._class_name(hwnd)
-        return cls in ("XLMAIN", "EXCEL7")
-
-    def _is_dialog_or_userform(self, hwnd) -> bool:
-        cls = self._class_name(hwnd)
-        if cls in ("XLMAIN", "EXCEL7"):
-            return False
-        if cls == "#32770":            # standard dialog
-            return True
-        if cls.startswith("Thunder"):  # VBA UserForms
-            return True
-        return False
-
-    def _enforce_main_window_state(self, hwnd) -> None:
+    def enforce_main(self, hwnd, mode: str) -> None:
         """Keep the workbook UI out of sight, but do it gently (only if needed)."""
         try:
-            if self._main_mode == "visible":
+            if mode == "visible":
                 return
 
-            if self._main_mode == "hidden":
+            if mode == "hidden":
                 # Hide only if currently visible
                 if win32gui.IsWindowVisible(hwnd):
                     win32gui.ShowWindow(hwnd, win32con.SW_HIDE)
@@ -114,7 +72,7 @@ class ExcelUIWatcher:
         except Exception:
             pass
 
-    def _bring_dialog_once(self, hwnd) -> None:
+    def bring_dialog(self, hwnd) -> None:
         """
         Bring dialog/userform to the front ONCE (no repeated topmost toggles).
         This avoids stealing focus while user clicks OK.
@@ -158,44 +116,191 @@ class ExcelUIWatcher:
         except Exception:
             pass
 
+
+class _PidState:
+    """
+    Anti-flicker state machine of one Excel process.
+
+    Key stability rule:
+    - NEVER "bring to front" a dialog repeatedly.
+    - Enforce main window state only:
+        * periodically when no dialog exists,
+        * once when a dialog first appears (to hide the workbook),
+        * then pause enforcement while the dialog is open.
+    """
+
+    def __init__(self, pid: int, main_mode: str):
+        self.pid = pid
+        self.main_mode = main_mode
+        self.had_dialogs = False
+        self.seen_dialogs: set[int] = set()
+        self.last_main_enforce = 0.0
+
+    def tick(
+        self, main_hwnds: List[int], dialog_hwnds: List[int], now: float, period_s: float, ops: WindowOps
+    ) -> None:
+        # If a dialog just appeared: enforce main state ONCE (hide workbook),
+        # then stop touching main window while dialog exists (prevents flicker).
+        if dialog_hwnds and not self.had_dialogs:
+            for mh in main_hwnds:
+                ops.enforce_main(mh, self.main_mode)
+            self.had_dialogs = True
+            # reset so we can "single-shot" dialogs
+            self.seen_dialogs.clear()
+
+        # Handle dialogs: bring each dialog/userform ONLY ONCE per appearance.
+        if dialog_hwnds:
+            for dh in dialog_hwnds:
+                dhi = int(dh)
+                if dhi not in self.seen_dialogs:
+                    self.seen_dialogs.add(dhi)
+                    ops.bring_dialog(dh)
+            return
+
+        # No dialogs: periodically enforce main window state (gentle)
+        if (now - self.last_main_enforce) >= period_s:
+            for mh in main_hwnds:
+                ops.enforce_main(mh, self.main_mode)
+            self.last_main_enforce = now
+
+        # reset dialog state
+        self.had_dialogs = False
+        self.seen_dialogs.clear()
+
+
+class UIWatcherService:
+    """ONE thread watching the windows of every registered Excel process.
+
+    Each tick enumerates the desktop once and hands each registered PID its
+    own windows, so the cost per tick barely depends on how many instances
+    run. The thread starts with the first registration and idles (no
+    enumeration) while nothing is registered.
+    """
+
+    def __init__(
+        self, ops: Optional[WindowOps] = None, poll_s: float = 0.45, main_enforce_period_s: float = 1.5
+    ):
+        self.ops = ops or WindowOps()
+        # Tunables
+        self.poll_s = poll_s                              # lower frequency = less redraw/flicker
+        self.main_enforce_period_s = main_enforce_period_s  # main window enforced every Xs (no dialog)
+
+        self._states: Dict[int, _PidState] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, pid: int, main_mode: str = "minimized") -> _PidState:
+        with self._lock:
+            state = self._states[pid] = _PidState(pid, main_mode)
+            if self.ops.available() and (self._thread is None or not self._thread.is_alive()):
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="ExcelUIWatcher", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return state
+
+    def unregister(self, state: _PidState) -> None:
+        with self._lock:
+            if self._states.get(state.pid) is state:
+                del self._states[state.pid]
+
+    def watched(self) -> List[int]:
+        with self._lock:
+            return list(self._states)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def classify(self, hwnds) -> Tuple[List[int], List[int]]:
+        """(main windows, dialogs/userforms); one GetClassName per window."""
+        main_hwnds, dialog_hwnds = [], []
+        for hwnd in hwnds:
+            cls = self.ops.class_name(hwnd)
+            if _is_main_class(cls):
+                main_hwnds.append(hwnd)
+            elif _is_dialog_class(cls):
+                dialog_hwnds.append(hwnd)
+        return main_hwnds, dialog_hwnds
+
+    def tick(self) -> None:
+        with self._lock:
+            states = dict(self._states)
+        if not states:
+            return
+        by_pid: Dict[int, List[int]] = {pid: [] for pid in states}
+        for hwnd, pid in self.ops.enumerate():
+            windows = by_pid.get(pid)
+            if windows is not None:
+                windows.append(hwnd)
+        now = time.monotonic()
+        for pid, state in states.items():
+            main_hwnds, dialog_hwnds = self.classify(by_pid[pid])
+            state.tick(main_hwnds, dialog_hwnds, now, self.main_enforce_period_s, self.ops)
+
     def _run(self) -> None:
         while not self._stop.is_set():
             try:
-                windows = self._iter_excel_windows()
-                main_hwnds = [h for h in windows if self._is_main_excel_window(h)]
-                dialog_hwnds = [h for h in windows if self._is_dialog_or_userform(h)]
-
-                dialogs_present = len(dialog_hwnds) > 0
-
-                # If a dialog just appeared: enforce main state ONCE (hide workbook),
-                # then stop touching main window while dialog exists (prevents flicker).
-                if dialogs_present and not self._had_dialogs:
-                    for mh in main_hwnds:
-                        self._enforce_main_window_state(mh)
-                    self._had_dialogs = True
-                    # reset so we can "single-shot" dialogs
-                    self._seen_dialogs.clear()
-
-                # Handle dialogs: bring each dialog/userform ONLY ONCE per appearance.
-                if dialogs_present:
-                    for dh in dialog_hwnds:
-                        dhi = int(dh)
-                        if dhi not in self._seen_dialogs:
-                            self._seen_dialogs.add(dhi)
-                            self._bring_dialog_once(dh)
-                else:
-                    # No dialogs: periodically enforce main window state (gentle)
-                    now = time.monotonic()
-                    if (now - self._last_main_enforce) >= self._main_enforce_period_s:
-                        for mh in main_hwnds:
-                            self._enforce_main_window_state(mh)
-                        self._last_main_enforce = now
-
-                    # reset dialog state
-                    self._had_dialogs = False
-                    self._seen_dialogs.clear()
-
+                self.tick()
             except Exception:
                 pass
+            if self.watched():
+                self._stop.wait(self.poll_s)
+            else:
+                self._wake.wait()
+                self._wake.clear()
+
+
+_shared: Optional[UIWatcherService] = None
+_shared_lock = threading.Lock()
 
-            time.sleep(self._poll_s)
+
+def shared_watcher() -> UIWatcherService:
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = UIWatcherService()
+        return _shared
+
+
+class ExcelUIWatcher:
+    """
+    Goal: keep Excel main window minimized/hidden while letting MsgBox/UserForms appear.
+
+    One handle per Excel process: start() registers the PID with the shared
+    UIWatcherService, stop() unregisters it. The anti-flicker rules live in
+    the per-PID state machine (_PidState).
+    """
+
+    def __init__(
+        self, excel_pid: int, main_mode: str = "minimized", service: Optional[UIWatcherService] = None
+    ):
+        self.excel_pid = excel_pid
+        self._service = service
+        self._state: Optional[_PidState] = None
+        self._main_mode = "minimized"
+        self.set_main_mode(main_mode)
+
+    def set_main_mode(self, mode: str) -> None:
+        m = (mode or "").strip().lower()
+        if m not in ("minimized", "hidden", "visible"):
+            m = "minimized"
+        self._main_mode = m
+        if self._state is not None:
+            self._state.main_mode = m
+
+    def start(self) -> None:
+        if self._state is not None:
+            return
+        service = self._service or shared_watcher()
+        if not service.ops.available():
+            return
+        self._service = service
+        self._state = service.register(self.excel_pid, self._main_mode)
+
+    def stop(self) -> None:
+        if self._state is not None and self._service is not None:
+            self._service.unregister(self._state)
+        self._state = None
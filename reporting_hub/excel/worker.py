@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import queue
 import threading
 import time
 import traceback
-from dataclasses import dataclass
+from concurrent.futures import Future
+from dataclasses import dataclass, field
 from typing import Any, Callable, Optional
 
 try:
@@ -12,12 +14,22 @@ try:
 except Exception:  # pragma: no cover
     pythoncom = None
 
+from ..gui.dispatcher import UiDispatcher
+from ..services.lease import LeaseManager
+from ..services.macro_runner import MacroRunner, RunRequest
+from ..utils.log import get_logger
+from .attach import AttachStore
 from .controller import ExcelController
+from .lifecycle import ExcelLifecycle
 
 
 UIFn = Callable[..., None]
 
 
+class WorkerBusy(RuntimeError):
+    """The task queue stayed full for the whole timeout."""
+
+
 @dataclass
 class _Task:
     action: str
@@ -25,6 +37,7 @@ class _Task:
     kwargs: dict
     on_ok: Optional[Callable[[Any], None]] = None
     on_err: Optional[Callable[[BaseException], None]] = None
+    future: Future = field(default_factory=Future)
 
 
 class ExcelWorker:
@@ -34,25 +47,90 @@ class ExcelWorker:
     - Excel COM objects are thread-affine (create + use in the same thread)
     - long-running macros (30-60min) must NOT freeze the UI
 
-    The UI thread communicates via a queue of tasks.
+    Callers communicate via a queue of tasks. Each task has a
+    concurrent.futures.Future (`submit`) or can be awaited (`run`); the
+    optional on_ok/on_err callbacks come back through the UiDispatcher (this
+    thread never calls Tk). Without a dispatcher (headless, services,
+    tests) callbacks run on the worker thread.
+
+    `max_pending` > 0 bounds the queue: producers wait for a free slot
+    instead of piling up tasks.
+
+    With an ExcelLifecycle, orphans of a crashed session are reaped when the
+    thread starts and the instance is recycled between tasks. With an
+    AttachStore (attach mode), runs reconnect to the instance that has the
+    workbook open and the instance is left running when the worker stops.
+    With a LeaseManager, run_pilot takes the workbook's run lease first.
     """
 
-    def __init__(self, ui_root, ui_log: UIFn, ui_toast: UIFn):
-        self._ui_root = ui_root
-        self._ui_log = ui_log
+    def __init__(
+        self,
+        dispatcher: Optional[UiDispatcher] = None,
+        ui_toast: Optional[UIFn] = None,
+        max_pending: int = 0,
+        controller_factory: Optional[Callable[[], ExcelController]] = None,
+        lifecycle: Optional[ExcelLifecycle] = None,
+        attach_store: Optional[AttachStore] = None,
+        leases: Optional[LeaseManager] = None,
+        on_busy: str = "abort",
+    ):
+        self._dispatcher = dispatcher
         self._ui_toast = ui_toast
+        self._controller_factory = controller_factory
+        self._lifecycle = lifecycle
+        self._attach_store = attach_store
+        self._leases = leases
+        self._on_busy = on_busy
 
-        self._q: "queue.Queue[_Task]" = queue.Queue()
+        self._q: "queue.Queue[_Task]" = queue.Queue(maxsize=max(0, int(max_pending)))
         self._stop = threading.Event()
 
         self._thread = threading.Thread(target=self._run, name="ExcelWorker", daemon=True)
         self._thread.start()
 
     # ------------------------------
-    # Public API (called from UI)
+    # Public API (any thread)
     # ------------------------------
-    def submit(self, action: str, *args, on_ok=None, on_err=None, **kwargs) -> None:
-        self._q.put(_Task(action=action, args=args, kwargs=kwargs, on_ok=on_ok, on_err=on_err))
+    def submit(
+        self,
+        action: str,
+        *args,
+        on_ok=None,
+        on_err=None,
+        block: bool = True,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Future:
+        """Queue a task; the Future resolves with its result or exception.
+
+        When the queue is full, waits up to `timeout` (forever if None) for
+        a slot, then raises WorkerBusy. Pass block=False from the Tk thread.
+        """
+        if self._stop.is_set():
+            raise RuntimeError("ExcelWorker is stopped.")
+        task = _Task(action=action, args=args, kwargs=kwargs, on_ok=on_ok, on_err=on_err)
+        try:
+            self._q.put(task, block=block, timeout=timeout)
+        except queue.Full:
+            raise WorkerBusy(f"ExcelWorker queue full ({self._q.maxsize} pending).") from None
+        return task.future
+
+    async def run(self, action: str, *args, poll_s: float = 0.02, **kwargs) -> Any:
+        """`await worker.run("run_pilot", ...)` from an asyncio event loop.
+
+        Never blocks the loop: while the queue is full it retries after
+        short sleeps, then awaits the task's Future.
+        """
+        while True:
+            try:
+                fut = self.submit(action, *args, block=False, **kwargs)
+                break
+            except WorkerBusy:
+                await asyncio.sleep(poll_s)
+        return await asyncio.wrap_future(fut)
+
+    def pending(self) -> int:
+        return self._q.qsize()
 
     def start(self) -> None:
         """Compatibility no-op.
@@ -61,27 +139,57 @@ class ExcelWorker:
         """
         return None
 
-    def stop(self) -> None:
-        """Stops the worker thread (best effort)."""
+    def stop(self, wait: float = 0.0) -> None:
+        """Stops the worker thread (best effort); queued tasks are cancelled."""
         self._stop.set()
-        self._q.put(_Task(action="__stop__", args=(), kwargs={}))
+        try:
+            self._q.put_nowait(_Task(action="__stop__", args=(), kwargs={}))
+        except queue.Full:
+            pass  # the loop also checks the stop event
+        if wait > 0:
+            self._thread.join(wait)
 
     # ------------------------------
     # Internal
     # ------------------------------
-    def _ui(self, fn: Callable, *args, **kwargs) -> None:
+    def _ui(self, fn: Optional[Callable], *args, **kwargs) -> None:
+        if fn is None:
+            return
+        if self._dispatcher is not None:
+            self._dispatcher.post(fn, *args, **kwargs)
+            return
         try:
-            self._ui_root.after(0, lambda: fn(*args, **kwargs))
+            fn(*args, **kwargs)
         except Exception:
-            # If UI is gone, ignore.
             pass
 
-    def _run(self) -> None:
+    def _create_controller(self) -> Optional[ExcelController]:
+        if self._controller_factory is not None:
+            return self._controller_factory()
         if pythoncom is None:  # pragma: no cover
-            controller: Optional[ExcelController] = None
-        else:
+            return None
+        # Logs go through the logging pipeline, not through Tk
+        return ExcelController()
+
+    def _run(self) -> None:
+        if pythoncom is not None:
             pythoncom.CoInitialize()
-            controller = ExcelController(logger=lambda m: self._ui(self._ui_log, m))
+        try:
+            controller = self._create_controller()
+        except Exception:
+            get_logger("excel").exception("ExcelWorker: controller creation failed.")
+            controller = None
+
+        if controller is not None and self._lifecycle is not None:
+            self._lifecycle.attach(controller)
+            try:
+                self._lifecycle.reap_orphans()
+            except Exception:
+                get_logger("excel").exception("ExcelWorker: orphan cleanup failed.")
+            try:
+                self._lifecycle.restore_addins()
+            except Exception:
+                get_logger("excel").exception("ExcelWorker: add-in restore failed.")
 
         while not self._stop.is_set():
             try:
@@ -91,25 +199,44 @@ class ExcelWorker:
 
             if task.action == "__stop__":
                 break
+            if not task.future.set_running_or_notify_cancel():
+                continue  # cancelled by the caller while queued
 
             try:
                 if controller is None:
                     raise RuntimeError("pywin32 est requis (Windows uniquement).")
 
                 result = self._dispatch(controller, task)
-                if task.on_ok:
-                    self._ui(task.on_ok, result)
-            except BaseException:
+            except BaseException as e:
+                task.future.set_exception(e)
                 if task.on_err:
                     tb = traceback.format_exc()
                     self._ui(task.on_err, RuntimeError(tb))
                 else:
                     self._ui(self._ui_toast, "Excel error (see logs).")
+                self._after_task(controller, task)
+                continue
+            task.future.set_result(result)
+            if task.on_ok:
+                self._ui(task.on_ok, result)
+            self._after_task(controller, task)
+
+        # Tasks still queued will never run
+        while True:
+            try:
+                task = self._q.get_nowait()
+            except queue.Empty:
+                break
+            if task.future.set_running_or_notify_cancel():
+                task.future.set_exception(RuntimeError("ExcelWorker stopped."))
 
         # Best effort cleanup
         try:
             if controller and controller.excel is not None:
-                controller.quit_excel()
+                if self._attach_store is not None:
+                    controller.detach()
+                else:
+                    self._quit(controller)
         except Exception:
             pass
 
@@ -119,18 +246,33 @@ class ExcelWorker:
         except Exception:
             pass
 
+    def _quit(self, controller: ExcelController) -> None:
+        if self._lifecycle is not None:
+            self._lifecycle.quit(controller)
+        else:
+            controller.quit_excel()
+
+    def _after_task(self, controller: Optional[ExcelController], task: _Task) -> None:
+        # Between tasks: nothing runs in Excel, the instance can be replaced
+        if controller is None or self._lifecycle is None:
+            return
+        try:
+            self._lifecycle.after_task(controller, counted=(task.action or "").strip().lower() == "run_pilot")
+        except Exception:
+            get_logger("excel").exception("ExcelWorker: instance recycling failed.")
+
     def _dispatch(self, controller: ExcelController, task: _Task) -> Any:
         action = (task.action or "").strip().lower()
 
         if action == "launch":
             if controller.excel is None:
+                # launch_new_instance already applies controller.mode
                 controller.launch_new_instance()
-                controller.set_excel_mode(controller.mode)
             return True
 
         if action == "quit":
             if controller.excel is not None:
-                controller.quit_excel()
+                self._quit(controller)
             return True
 
         if action == "set_mode":
@@ -179,28 +321,42 @@ class ExcelWorker:
             if isinstance(args, tuple):
                 args = list(args)
 
-            if controller.excel is None:
-                controller.launch_new_instance()
-
             desired = str(excel_mode).strip().lower() or controller.mode
 
             # Hide main Excel window, keep dialogs/userforms visible (UIWatcher handles them)
-            if desired in ("minimized", "hidden"):
-                controller.set_excel_mode("hidden")
-            else:
-                controller.set_excel_mode("visible")
-
-            wb_name = controller.open_or_activate_by_path(str(pilot_path))
-
+            run_mode = "hidden" if desired in ("minimized", "hidden") else "visible"
+
+            runner = MacroRunner(
+                controller=controller,
+                artifacts_max_mb=int(task.kwargs.get("artifacts_max_mb", 0) or 0),
+                attach_store=self._attach_store,
+                leases=self._leases,
+                on_busy=self._on_busy,
+                cancel=self._stop,
+            )
             try:
-                controller.run_macro(wb_name, str(macro), *list(args))
+                runner.run(
+                    RunRequest(
+                        workbook_path=str(pilot_path),
+                        macro_name=str(macro),
+                        args=list(args),
+                        excel_mode=desired,
+                        run_mode=run_mode,
+                        profile=str(task.kwargs.get("profile", "")),
+                        outputs=list(task.kwargs.get("outputs", []) or []),
+                        inputs=list(task.kwargs.get("inputs", []) or []),
+                        extracts=list(task.kwargs.get("extracts", []) or []),
+                        execution=task.kwargs.get("execution"),
+                        launch=task.kwargs.get("launch"),
+                        requires=list(task.kwargs.get("requires", []) or []),
+                        wait_inputs_s=task.kwargs.get("wait_inputs_s") or None,
+                        steps=list(task.kwargs.get("steps", []) or []),
+                        resume=bool(task.kwargs.get("resume", True)),
+                    )
+                )
             finally:
-                # Restore user preference after macro ends
-                try:
-                    controller.set_excel_mode(desired)
-                except Exception:
-                    pass
-
+                if runner.timer is not None:
+                    runner.log(runner.timer.one_line())
             return True
 
         raise RuntimeError(f"Unknown ExcelWorker action: {task.action}")
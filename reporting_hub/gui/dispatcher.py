@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Tuple
+
+
+_Call = Tuple[Callable[..., Any], tuple, dict]
+
+
+class UiDispatcher:
+    """Runs callbacks posted from any thread on the Tk thread.
+
+    Background threads only append to a deque (thread-safe, never touches
+    Tk). One `after()` poll on the Tk thread drains it, for at most
+    `budget_ms` per tick: a burst of log lines becomes a few batches instead
+    of one Tk event each, and the UI keeps handling input in between.
+    """
+
+    def __init__(self, root, interval_ms: int = 30, budget_ms: float = 8.0):
+        self._root = root
+        self.interval_ms = max(1, int(interval_ms))
+        self.budget_s = max(0.001, float(budget_ms) / 1000.0)
+
+        self._calls: Deque[_Call] = deque()
+        self._after_id = None
+        self._stopped = False
+
+    def start(self) -> None:
+        """Must be called from the Tk thread."""
+        self._stopped = False
+        if self._after_id is None:
+            self._after_id = self._root.after(self.interval_ms, self._drain)
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._calls.clear()
+        try:
+            if self._after_id is not None:
+                self._root.after_cancel(self._after_id)
+        except Exception:
+            pass
+        self._after_id = None
+
+    def post(self, fn: Callable[..., Any], *args, **kwargs) -> None:
+        """Thread-safe; runs `fn(*args, **kwargs)` on the next tick."""
+        if not self._stopped:
+            self._calls.append((fn, args, kwargs))
+
+    def pending(self) -> int:
+        return len(self._calls)
+
+    def _drain(self) -> None:
+        self._after_id = None
+        deadline = time.perf_counter() + self.budget_s
+        calls = self._calls
+        while calls:
+            fn, args, kwargs = calls.popleft()
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                pass  # one failing callback never stops the others
+            if time.perf_counter() >= deadline:
+                break
+        if self._stopped:
+            return
+        # Leftovers: come back right after Tk has processed pending events
+        delay = 1 if calls else self.interval_ms
+        try:
+            self._after_id = self._root.after(delay, self._drain)
+        except Exception:
+            pass  # root destroyed
@@ -35,8 +35,18 @@ def apply_app_style(appearance: str = "Dark") -> None:
     ctk.set_default_color_theme("blue")
 
 
+_FONTS: dict = {}
+
+
 def font(size: int = 13, weight: str = "normal"):
+    """Shared CTkFont per (size, weight): widgets reuse one Tk named font."""
+    key = (size, weight)
+    f = _FONTS.get(key)
+    if f is not None:
+        return f
     try:
-        return ctk.CTkFont(size=size, weight=weight)
+        f = _FONTS[key] = ctk.CTkFont(size=size, weight=weight)
+        return f
     except Exception:
+        # No root yet: do not cache the failure
         return None
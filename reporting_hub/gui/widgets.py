@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from collections import deque
+from typing import Deque, Dict, List
+
 import customtkinter as ctk
 
 from .style import BORDER, CARD, BTN_GHOST_HOVER, BTN_MAIN_BG, BTN_MAIN_HOVER, BTN_MAIN_TEXT, TEXT, MUTED, font
@@ -26,7 +29,42 @@ class Card(ctk.CTkFrame):
             )
 
 
+class _Toast:
+    """A pooled toast widget (frame + label) and its current message."""
+
+    def __init__(self, master):
+        self.frame = ctk.CTkFrame(master, corner_radius=18, border_width=1, fg_color=CARD, border_color=BORDER)
+        self.frame.grid_columnconfigure(0, weight=1)
+        self.label = ctk.CTkLabel(
+            self.frame,
+            text="",
+            wraplength=520,
+            font=font(13, "normal"),
+            text_color=TEXT,
+        )
+        self.label.grid(row=0, column=0, padx=16, pady=12, sticky="w")
+        self.text = ""
+        self.count = 0
+        self.after_id = None
+
+    def set(self, text: str, count: int) -> None:
+        self.text = text
+        self.count = count
+        self.label.configure(text=text if count <= 1 else f"{text}  ×{count}")
+
+
 class ToastHost(ctk.CTkFrame):
+    """Stack of transient messages (top-right corner).
+
+    - identical messages are merged into one toast with a ×N counter;
+    - at most MAX_VISIBLE toasts are on screen, the rest wait in a queue;
+    - toast widgets are pooled and reused, so bursts cost no widget
+      construction.
+    """
+
+    MAX_VISIBLE = 4
+    MAX_PENDING = 50
+
     def __init__(self, master):
         super().__init__(
             master,
@@ -40,27 +78,68 @@ class ToastHost(ctk.CTkFrame):
         self.grid_propagate(False)
         self.place(relx=1.0, rely=0.0, anchor="ne", x=-18, y=18)
 
-    def show(self, text: str, ttl_ms: int = 3200) -> None:
-        toast = ctk.CTkFrame(self, corner_radius=18, border_width=1, fg_color=CARD, border_color=BORDER)
-        toast.grid_columnconfigure(0, weight=1)
-
-        ctk.CTkLabel(
-            toast,
-            text=text,
-            wraplength=520,
-            font=font(13, "normal"),
-            text_color=TEXT,
-        ).grid(row=0, column=0, padx=16, pady=12, sticky="w")
+        self._active: Dict[str, _Toast] = {}
+        self._pool: List[_Toast] = []
+        # [text, ttl_ms, count], oldest first
+        self._pending: Deque[list] = deque()
 
-        toast.pack(fill="x", pady=8)
-
-        def kill():
+    def show(self, text: str, ttl_ms: int = 3200) -> None:
+        text = str(text)
+
+        toast = self._active.get(text)
+        if toast is not None:
+            # Same message already on screen: bump the counter, extend its life
+            toast.set(text, toast.count + 1)
+            self._schedule_expire(toast, ttl_ms)
+            return
+
+        if len(self._active) < self.MAX_VISIBLE:
+            self._display(text, ttl_ms, 1)
+            return
+
+        for item in self._pending:
+            if item[0] == text:
+                item[1] = ttl_ms
+                item[2] += 1
+                return
+        if len(self._pending) >= self.MAX_PENDING:
+            self._pending.popleft()
+        self._pending.append([text, ttl_ms, 1])
+
+    def _display(self, text: str, ttl_ms: int, count: int) -> None:
+        toast = self._pool.pop() if self._pool else _Toast(self)
+        toast.set(text, count)
+        toast.frame.pack(fill="x", pady=8)
+        self._active[text] = toast
+        self._schedule_expire(toast, ttl_ms)
+
+    def _schedule_expire(self, toast: _Toast, ttl_ms: int) -> None:
+        try:
+            if toast.after_id is not None:
+                self.after_cancel(toast.after_id)
+        except Exception:
+            pass
+        toast.after_id = self.after(ttl_ms, lambda: self._expire(toast))
+
+    def _expire(self, toast: _Toast) -> None:
+        toast.after_id = None
+        if self._active.get(toast.text) is toast:
+            del self._active[toast.text]
+        try:
+            toast.frame.pack_forget()
+        except Exception:
+            pass
+        if len(self._pool) < self.MAX_VISIBLE:
+            self._pool.append(toast)
+        else:
             try:
-                toast.destroy()
+                toast.frame.destroy()
             except Exception:
                 pass
 
-        toast.after(ttl_ms, kill)
+        if self._pending:
+            text, ttl_ms, count = self._pending.popleft()
+            self._display(text, ttl_ms, count)
 
 
 def btn_primary(master, text: str, command=None, height: int = 44) -> ctk.CTkButton:
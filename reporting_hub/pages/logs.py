@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import threading
+from array import array
+from typing import List, Optional
+
+import customtkinter as ctk
+
+from ..gui.style import BORDER, FIELD, MUTED, TEXT
+from ..gui.widgets import Card, btn_ghost, btn_primary
+from ..services.log_archive import LogArchive
+
+
+_ALL_PROFILES = "All profiles"
+_LINE_PX = 18  # approximate line height of the textbox font
+
+
+class LogViewer:
+    """Virtualized view over the persisted log archive.
+
+    Only the lines visible in the textbox are read from disk (through the
+    archive's mmap line index). Indexing and searches run on a background
+    thread; the latest request wins.
+    """
+
+    def __init__(self, app, card: ctk.CTkFrame):
+        self.app = app
+        self.archive = LogArchive()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        self.view: Optional[array] = None  # None = every line
+        self.total = 0
+        self.top = 0
+
+        bar = ctk.CTkFrame(card, fg_color="transparent")
+        bar.grid(row=2, column=0, padx=18, pady=(0, 12), sticky="ew")
+        bar.grid_columnconfigure(0, weight=1)
+
+        self.query = ctk.CTkEntry(
+            bar,
+            placeholder_text="Search (text or regex)…",
+            fg_color=FIELD,
+            border_color=BORDER,
+            text_color=TEXT,
+            corner_radius=18,
+            height=38,
+        )
+        self.query.grid(row=0, column=0, padx=(0, 8), sticky="ew")
+        self.query.bind("<Return>", lambda _e: self.search())
+
+        self.regex = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(bar, text="Regex", variable=self.regex, width=70).grid(row=0, column=1, padx=8)
+
+        self.run_id = ctk.CTkEntry(
+            bar,
+            placeholder_text="Run id",
+            fg_color=FIELD,
+            border_color=BORDER,
+            text_color=TEXT,
+            corner_radius=18,
+            height=38,
+            width=190,
+        )
+        self.run_id.grid(row=0, column=2, padx=8)
+        self.run_id.bind("<Return>", lambda _e: self.search())
+
+        # Filled with the profiles found in the logs (macro ids, headless --profile...)
+        self.profile = ctk.StringVar(value=_ALL_PROFILES)
+        self.profile_menu = ctk.CTkOptionMenu(
+            bar,
+            values=[_ALL_PROFILES],
+            variable=self.profile,
+            command=lambda _v: self.search(),
+            corner_radius=18,
+            width=150,
+        )
+        self.profile_menu.grid(row=0, column=3, padx=8)
+
+        btn_primary(bar, "Search", command=self.search, height=38).grid(row=0, column=4, padx=8)
+        btn_ghost(bar, "Refresh", command=self.search, height=38).grid(row=0, column=5, padx=(8, 0))
+
+        body = ctk.CTkFrame(card, fg_color="transparent")
+        body.grid(row=3, column=0, padx=18, pady=(0, 8), sticky="nsew")
+        body.grid_columnconfigure(0, weight=1)
+        body.grid_rowconfigure(0, weight=1)
+
+        self.text = ctk.CTkTextbox(
+            body,
+            corner_radius=18,
+            fg_color=("#F7F7FA", "#121214"),
+            border_width=1,
+            border_color=BORDER,
+            wrap="none",
+            activate_scrollbars=False,
+        )
+        self.text.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(body, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns", padx=(6, 0))
+
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.text.bind(seq, self._on_wheel)
+        self.text.bind("<Configure>", lambda _e: self.render())
+
+        self.status = ctk.CTkLabel(card, text="", text_color=MUTED)
+        self.status.grid(row=4, column=0, padx=18, pady=(0, 14), sticky="w")
+
+    # ------------------------------
+    # Data (background thread)
+    # ------------------------------
+    def search(self) -> None:
+        text = self.query.get().strip()
+        regex = bool(self.regex.get())
+        run_id = self.run_id.get().strip()
+        profile = self.profile.get()
+        profile = "" if profile == _ALL_PROFILES else profile
+
+        self._generation += 1
+        gen = self._generation
+        self.status.configure(text="Indexing…")
+
+        def work() -> None:
+            try:
+                with self._lock:
+                    total = self.archive.refresh()
+                    profiles = self.archive.profiles()
+                    view = None
+                    if text or run_id or profile:
+                        view = self.archive.search(text, regex=regex, run_id=run_id, profile=profile)
+                result = (total, view, profiles, None)
+            except Exception as e:
+                result = (0, None, [], e)
+            self.app.dispatcher.post(self._apply, gen, *result)
+
+        threading.Thread(target=work, name="LogViewer", daemon=True).start()
+
+    def _apply(
+        self,
+        gen: int,
+        total: int,
+        view: Optional[array],
+        profiles: List[str],
+        err: Optional[BaseException],
+    ) -> None:
+        if gen != self._generation:
+            return  # a newer request is running
+        if err is not None:
+            self.status.configure(text=f"Search error: {err}")
+            return
+        self.profile_menu.configure(values=[_ALL_PROFILES] + profiles)
+        self.total = total
+        self.view = view
+        # Newest lines are at the end: show the tail
+        self.top = max(0, self._count() - self._rows())
+        self.render()
+
+    # ------------------------------
+    # Rendering (visible window only)
+    # ------------------------------
+    def _count(self) -> int:
+        return self.total if self.view is None else len(self.view)
+
+    def _rows(self) -> int:
+        try:
+            return max(5, self.text.winfo_height() // _LINE_PX)
+        except Exception:
+            return 30
+
+    def render(self) -> None:
+        count, rows = self._count(), self._rows()
+        self.top = max(0, min(self.top, count - rows))
+        stop = min(count, self.top + rows)
+        numbers = range(self.top, stop) if self.view is None else self.view[self.top : stop]
+        # Never wait for a running search on the Tk thread: keep the current
+        # text, the search result triggers a render anyway.
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            lines = self.archive.lines(numbers)
+        except Exception:
+            lines = []
+        finally:
+            self._lock.release()
+
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", "\n".join(lines))
+        self.text.configure(state="disabled")
+
+        if count:
+            self.scrollbar.set(self.top / count, stop / count)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        shown = f"{count:,} matching / {self.total:,} lines" if self.view is not None else f"{self.total:,} lines"
+        self.status.configure(text=f"{shown} — {self.top + 1 if count else 0}-{stop}")
+
+    def _scroll_to(self, top: int) -> None:
+        self.top = top
+        self.render()
+
+    def _on_scrollbar(self, *args) -> None:
+        count, rows = self._count(), self._rows()
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * count))
+        elif args[0] == "scroll":
+            step = rows if len(args) > 2 and args[2] == "pages" else 1
+            self._scroll_to(self.top + int(args[1]) * step)
+
+    def _on_wheel(self, event) -> str:
+        if getattr(event, "num", None) == 4:
+            delta = -3
+        elif getattr(event, "num", None) == 5:
+            delta = 3
+        else:
+            delta = -3 * int(event.delta / 120) if event.delta else 0
+        self._scroll_to(self.top + delta)
+        return "break"
+
+
+def build_logs_page(app, parent) -> ctk.CTkFrame:
+    page = ctk.CTkFrame(parent, fg_color="transparent")
+    page.grid_columnconfigure(0, weight=1)
+    page.grid_rowconfigure(0, weight=1)
+
+    card = Card(page, "Logs", "All runs (rotating files in .reporting_hub/logs)")
+    card.grid(row=0, column=0, sticky="nsew")
+    card.grid_columnconfigure(0, weight=1)
+    card.grid_rowconfigure(3, weight=1)
+
+    app.log_viewer = LogViewer(app, card)
+    app.log_viewer.search()
+    return page
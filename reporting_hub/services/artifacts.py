@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+_CHUNK = 1024 * 1024
+
+
+@dataclass
+class ArtifactEntry:
+    name: str
+    digest: str
+    size: int
+
+
+@dataclass
+class RunManifest:
+    """Files produced (or attached) by one run, by content hash."""
+
+    run_id: str
+    profile: str = ""
+    created: float = field(default_factory=time.time)
+    entries: Dict[str, ArtifactEntry] = field(default_factory=dict)
+    # Names whose content differs from the previous run of the profile
+    # (the attachments the email step sends)
+    changed: List[str] = field(default_factory=list)
+
+
+@dataclass
+class IntegrityReport:
+    checked: int = 0
+    missing: List[str] = field(default_factory=list)
+    corrupted: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and not self.corrupted
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Different volume / FS without hardlinks
+        shutil.copyfile(src, dst)
+
+
+class ArtifactStore:
+    """Local content-addressed store (sha256 -> blob).
+
+    Layout (under root):
+    - objects/ab/abcdef...   one blob per distinct content
+    - manifests/<run_id>.json
+    - runs/<run_id>/<name>   hardlinks to blobs (no extra disk space)
+
+    Source files are never linked into the store: a macro rewriting an export
+    in place must not be able to corrupt a stored blob.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.manifests_dir = self.root / "manifests"
+        self.runs_dir = self.root / "runs"
+
+    # ------------------------------
+    # Blobs
+    # ------------------------------
+    def blob_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    def put(self, path: Path) -> ArtifactEntry:
+        """Store a file (dedup by content) and return its entry."""
+        path = Path(path)
+        digest = file_digest(path)
+        blob = self.blob_path(digest)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(blob.name + ".tmp")
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, blob)
+        return ArtifactEntry(name=path.name, digest=digest, size=blob.stat().st_size)
+
+    def materialize(self, entry: ArtifactEntry, dest: Path) -> Path:
+        """Expose a blob at `dest` (hardlink when possible)."""
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.exists():
+            dest.unlink()
+        _link_or_copy(self.blob_path(entry.digest), dest)
+        return dest
+
+    # ------------------------------
+    # Manifests
+    # ------------------------------
+    def record_run(self, run_id: str, paths: Iterable[Path], profile: str = "") -> RunManifest:
+        """Store every file of a run and write its manifest.
+
+        Each file is hashed once; the names that changed since the previous
+        run of `profile` are kept in `manifest.changed`.
+        """
+        previous = self.latest_manifest(profile)
+        manifest = RunManifest(run_id=run_id, profile=profile)
+        run_dir = self.runs_dir / run_id
+        for p in paths:
+            p = Path(p)
+            if not p.is_file():
+                continue
+            entry = self.put(p)
+            manifest.entries[entry.name] = entry
+            prev = previous.entries.get(entry.name) if previous else None
+            if prev is None or prev.digest != entry.digest:
+                manifest.changed.append(entry.name)
+            self.materialize(entry, run_dir / entry.name)
+        self.save_manifest(manifest)
+        return manifest
+
+    def save_manifest(self, manifest: RunManifest) -> None:
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        path = self.manifests_dir / f"{manifest.run_id}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(manifest), indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def load_manifest(self, path: Path) -> Optional[RunManifest]:
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+            entries = {
+                str(k): ArtifactEntry(name=str(v["name"]), digest=str(v["digest"]), size=int(v["size"]))
+                for k, v in dict(data.get("entries", {})).items()
+            }
+            return RunManifest(
+                run_id=str(data["run_id"]),
+                profile=str(data.get("profile", "")),
+                created=float(data.get("created", 0.0)),
+                entries=entries,
+                # Manifests written before "changed" existed: send everything
+                changed=[str(x) for x in data.get("changed", list(entries))],
+            )
+        except Exception:
+            return None
+
+    def manifests(self) -> List[RunManifest]:
+        """All manifests, oldest first."""
+        if not self.manifests_dir.exists():
+            return []
+        out = [m for m in (self.load_manifest(p) for p in self.manifests_dir.glob("*.json")) if m]
+        out.sort(key=lambda m: m.created)
+        return out
+
+    def latest_manifest(self, profile: str = "") -> Optional[RunManifest]:
+        found = [m for m in self.manifests() if m.profile == profile]
+        return found[-1] if found else None
+
+    # ------------------------------
+    # Email helpers
+    # ------------------------------
+    def attachments_to_send(self, profile: str = "") -> List[Path]:
+        """Stored copies of the files the last run of `profile` changed.
+
+        Read from the manifest written by `record_run`, so it stays right
+        after the run is recorded (the latest manifest is that run itself).
+        """
+        manifest = self.latest_manifest(profile)
+        if manifest is None:
+            return []
+        run_dir = self.runs_dir / manifest.run_id
+        return [run_dir / name for name in manifest.changed if name in manifest.entries]
+
+    # ------------------------------
+    # Maintenance
+    # ------------------------------
+    def _referenced(self, manifests: Iterable[RunManifest]) -> Dict[str, int]:
+        refs: Dict[str, int] = {}
+        for m in manifests:
+            for e in m.entries.values():
+                refs[e.digest] = e.size
+        return refs
+
+    def _drop_run(self, manifest: RunManifest) -> None:
+        shutil.rmtree(self.runs_dir / manifest.run_id, ignore_errors=True)
+        try:
+            (self.manifests_dir / f"{manifest.run_id}.json").unlink()
+        except FileNotFoundError:
+            pass
+
+    def prune(self, max_bytes: int) -> int:
+        """Drop the oldest runs until blobs fit in `max_bytes`; returns freed bytes.
+
+        The latest run of each profile is always kept (needed to detect
+        changed attachments).
+        """
+        manifests = self.manifests()
+        keep = {m.profile: m.run_id for m in manifests}  # latest wins
+
+        if max_bytes > 0:
+            refs = self._referenced(manifests)
+            total = sum(refs.values())
+            for m in list(manifests):
+                if total <= max_bytes:
+                    break
+                if keep.get(m.profile) == m.run_id:
+                    continue
+                self._drop_run(m)
+                manifests.remove(m)
+                refs = self._referenced(manifests)
+                total = sum(refs.values())
+
+        return self.gc(set(self._referenced(manifests)))
+
+    def gc(self, referenced: set) -> int:
+        """Delete blobs not referenced by any manifest."""
+        freed = 0
+        if not self.objects_dir.exists():
+            return 0
+        for blob in self.objects_dir.glob("*/*"):
+            if blob.name in referenced:
+                continue
+            try:
+                size = blob.stat().st_size
+                blob.unlink()
+                freed += size
+            except OSError:
+                pass
+        return freed
+
+    def verify(self, full: bool = False) -> IntegrityReport:
+        """Check referenced blobs.
+
+        The default check only stats each blob (existence + size), which is
+        enough to catch truncated/missing files. `full=True` re-hashes.
+        """
+        report = IntegrityReport()
+        for digest, size in self._referenced(self.manifests()).items():
+            report.checked += 1
+            blob = self.blob_path(digest)
+            try:
+                st = blob.stat()
+            except OSError:
+                report.missing.append(digest)
+                continue
+            if st.st_size != size or (full and file_digest(blob) != digest):
+                report.corrupted.append(digest)
+        return report
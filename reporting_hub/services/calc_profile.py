@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from ..excel.controller import ExcelController
+
+
+@dataclass
+class SheetCalc:
+    sheet: str
+    seconds: float
+    used_range: str
+    rows: int
+    columns: int
+    formulas: int
+
+    @property
+    def cells(self) -> int:
+        return self.rows * self.columns
+
+
+@dataclass
+class CalcProfile:
+    """Full-recalc time plus per-sheet times, slowest sheet first."""
+
+    workbook: str
+    full_s: float
+    sheets: List[SheetCalc] = field(default_factory=list)
+    measured_at: float = field(default_factory=time.time)
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["sheet_total_s"] = sum(s.seconds for s in self.sheets)
+        return json.dumps(data, indent=2, ensure_ascii=False)
+
+    def to_text(self) -> str:
+        when = datetime.fromtimestamp(self.measured_at).strftime("%Y-%m-%d %H:%M")
+        total = sum(s.seconds for s in self.sheets)
+        lines = [
+            f"Calculation profile: {os.path.basename(self.workbook)} ({when})",
+            f"Full recalculation: {self.full_s:.3f}s, sum of sheets: {total:.3f}s",
+        ]
+        if not self.sheets:
+            return "\n".join(lines)
+        width = max(5, max(len(s.sheet) for s in self.sheets))
+        lines.append(
+            f"  {'#':>3}  {'sheet':<{width}}  {'calc s':>9}  {'share':>6}  "
+            f"{'used range':<14}  {'cells':>12}  {'formulas':>10}"
+        )
+        for rank, s in enumerate(self.sheets, 1):
+            share = (s.seconds / total * 100.0) if total else 0.0
+            lines.append(
+                f"  {rank:>3}  {s.sheet:<{width}}  {s.seconds:9.3f}  {share:5.1f}%  "
+                f"{s.used_range:<14}  {s.cells:>12,}  {s.formulas:>10,}"
+            )
+        return "\n".join(lines)
+
+    def write(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.to_json(), encoding="utf-8")
+
+
+def profile_workbook(controller: ExcelController, workbook_path: str) -> CalcProfile:
+    """Open the workbook in the controller's instance and measure it."""
+    wb_name = controller.open_or_activate_by_path(workbook_path)
+    full_s, items = controller.measure_calculation(wb_name)
+    sheets = sorted((SheetCalc(**item) for item in items), key=lambda s: s.seconds, reverse=True)
+    return CalcProfile(workbook=os.path.abspath(workbook_path), full_s=full_s, sheets=sheets)
+
+
+def default_report_path(root: Path, workbook_path: str) -> Path:
+    """One JSON per measurement, named so months sort next to each other."""
+    stem = Path(workbook_path).stem
+    return Path(root) / f"{stem}-{datetime.now():%Y%m%d-%H%M%S}.json"
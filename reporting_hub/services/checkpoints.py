@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from ..config.models import StepSpec
+
+
+def steps_signature(workbook_key: str, steps: Sequence[StepSpec]) -> str:
+    """Changes whenever the workbook or the step list changes."""
+    payload = json.dumps([workbook_key] + [[s.macro, s.args, s.save_after] for s in steps])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class StepRecord:
+    index: int  # 0-based
+    macro: str
+    duration_s: float
+    saved: bool  # the workbook was saved after this step
+    ended_at: float  # epoch seconds
+
+
+@dataclass
+class Checkpoint:
+    """Steps completed by the last (failed) attempt of a multi-step run."""
+
+    signature: str
+    run_id: str
+    excel_pid: Optional[int] = None  # instance holding the unsaved results
+    completed: List[StepRecord] = field(default_factory=list)
+    excel_created: Optional[float] = None  # its creation time (PIDs are reused)
+
+    def resume_index(self, excel_pid: Optional[int], excel_created: Optional[float] = None) -> int:
+        """First step to run.
+
+        In the same Excel instance (same PID and creation time) the workbook
+        still holds every completed step's result. In a new instance only
+        what was saved survives, so the run restarts after the last step
+        followed by a save.
+        """
+        if (
+            excel_pid is not None
+            and excel_pid == self.excel_pid
+            and excel_created is not None
+            and self.excel_created is not None
+            and abs(excel_created - self.excel_created) < 1.0  # rounding between APIs only
+        ):
+            return len(self.completed)
+        return max((i + 1 for i, r in enumerate(self.completed) if r.saved), default=0)
+
+
+class CheckpointStore:
+    """One small JSON file per step list, under STATE_DIR/checkpoints."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, signature: str) -> Path:
+        return self.root / f"{signature}.json"
+
+    def load(self, signature: str) -> Optional[Checkpoint]:
+        try:
+            data = json.loads(self._path(signature).read_text(encoding="utf-8"))
+            return Checkpoint(
+                signature=str(data["signature"]),
+                run_id=str(data.get("run_id", "")),
+                excel_pid=data.get("excel_pid"),
+                excel_created=data.get("excel_created"),
+                completed=[StepRecord(**r) for r in data.get("completed", [])],
+            )
+        except Exception:
+            return None
+
+    def save(self, cp: Checkpoint) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(cp.signature)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(cp), indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def clear(self, signature: str) -> None:
+        try:
+            self._path(signature).unlink()
+        except OSError:
+            pass
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import csv
+import math
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover
+    pa = None
+    pq = None
+
+
+Rows = Sequence[Sequence[object]]
+
+# Column kinds inferred from the first chunk
+FLOAT = "float64"
+BOOL = "bool"
+TEXT = "str"
+
+
+# Value2 returns error cells as these ints (CVErr codes), not as text:
+# written as numbers they would pass for data, so they become null.
+EXCEL_ERRORS = {
+    -2146826281: "#DIV/0!",
+    -2146826246: "#N/A",
+    -2146826259: "#NAME?",
+    -2146826288: "#NULL!",
+    -2146826252: "#NUM!",
+    -2146826265: "#REF!",
+    -2146826273: "#VALUE!",
+}
+
+
+def _is_error(v: object) -> bool:
+    return type(v) is int and v in EXCEL_ERRORS  # real numbers come back as float
+
+
+def errors_to_null(rows: Rows) -> Rows:
+    """Replace error cells (#N/A, #DIV/0!, ...) with None."""
+    return [tuple(None if _is_error(v) else v for v in r) if any(map(_is_error, r)) else r for r in rows]
+
+
+def _is_number(v: object) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def column_names(header_row: Sequence[object], width: int) -> List[str]:
+    """Header cells -> unique, non-empty column names."""
+    names: List[str] = []
+    seen: Dict[str, int] = {}
+    for i in range(width):
+        raw = header_row[i] if i < len(header_row) else None
+        name = str(raw).strip() if raw not in (None, "") else f"col{i + 1}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}_{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _blank(v: object) -> bool:
+    return v is None or v == ""
+
+
+def infer_kinds(rows: Rows, width: int) -> List[str]:
+    """Excel Value2 only yields float/str/bool/None (errors aside), so three kinds suffice.
+
+    A column with no value in `rows` is TEXT: any later value fits it.
+    """
+    kinds: List[str] = []
+    for c in range(width):
+        values = [r[c] for r in rows if c < len(r) and not _blank(r[c])]
+        if not values:
+            kinds.append(TEXT)
+        elif all(isinstance(v, bool) for v in values):
+            kinds.append(BOOL)
+        elif all(_is_number(v) for v in values):
+            kinds.append(FLOAT)
+        else:
+            kinds.append(TEXT)
+    return kinds
+
+
+def _fits(v: object, kind: str) -> bool:
+    if _blank(v) or kind == TEXT:
+        return True
+    if kind == BOOL:
+        return isinstance(v, bool)
+    return _is_number(v)
+
+
+def check_width(rows: Rows, width: int, first_row: int) -> None:
+    """Raise on a row with values beyond the header (never truncate)."""
+    for i, r in enumerate(rows):
+        if len(r) > width and any(not _blank(v) for v in r[width:]):
+            col = width + next(k for k, v in enumerate(r[width:]) if not _blank(v)) + 1
+            raise ValueError(f"Row {first_row + i}, column {col}: value beyond the {width} header column(s).")
+
+
+def to_columns(rows: Rows, names: List[str], kinds: List[str], first_row: int = 1) -> Dict[str, "np.ndarray"]:
+    """Row tuples -> typed NumPy columns (blank cells become null).
+
+    A value that does not fit the inferred kind raises ValueError with its
+    row (`first_row` = number of the first row of `rows`) and column.
+    """
+    if np is None:
+        raise RuntimeError("numpy is required for Parquet output.")
+    out: Dict[str, "np.ndarray"] = {}
+    for c, (name, kind) in enumerate(zip(names, kinds)):
+        cells = [r[c] if c < len(r) else None for r in rows]
+        for i, v in enumerate(cells):
+            if not _fits(v, kind):
+                raise ValueError(
+                    f"Row {first_row + i}, column {c + 1} ({name}): {v!r} does not fit the column type "
+                    f"({kind}, from the first rows). Use a .csv output for mixed columns."
+                )
+        if kind == FLOAT:
+            out[name] = np.fromiter(
+                (math.nan if _blank(v) else float(v) for v in cells), dtype=np.float64, count=len(cells)
+            )
+        elif kind == BOOL:
+            out[name] = np.array([None if _blank(v) else v for v in cells], dtype=object)  # None -> null
+        else:
+            out[name] = np.array([None if _blank(v) else str(v) for v in cells], dtype=object)
+    return out
+
+
+def _csv_cell(v: object) -> object:
+    if v is None:
+        return ""
+    if isinstance(v, float) and v.is_integer() and abs(v) < 2**53:
+        return int(v)  # Value2 numbers are floats: ids stay "1", not "1.0"
+    return v
+
+
+class _CsvSink:
+    """CSV has no column types: cells are written as they are."""
+
+    def __init__(self, path: Path, names: List[str]):
+        self._f = open(path, "w", encoding="utf-8", newline="")
+        self._w = csv.writer(self._f)
+        self._w.writerow(names)
+        self._width = len(names)
+
+    def write(self, rows: Rows, first_row: int) -> None:
+        pad = [""] * self._width
+        self._w.writerows([_csv_cell(v) for v in r] + pad[len(r):] for r in rows)
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class _ParquetSink:
+    def __init__(self, path: Path, names: List[str], kinds: List[str]):
+        if pa is None:
+            raise RuntimeError("pyarrow is required for Parquet output.")
+        types = {FLOAT: pa.float64(), BOOL: pa.bool_(), TEXT: pa.string()}
+        self._names = names
+        self._kinds = kinds
+        self._schema = pa.schema([(n, types[k]) for n, k in zip(names, kinds)])
+        self._w = pq.ParquetWriter(str(path), self._schema)
+
+    def write(self, rows: Rows, first_row: int) -> None:
+        columns = to_columns(rows, self._names, self._kinds, first_row)
+        arrays = [
+            pa.array(col, type=field.type, from_pandas=True)  # NaN / None -> null
+            for col, field in zip(columns.values(), self._schema)
+        ]
+        self._w.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        self._w.close()
+
+
+def write_table(chunks: Iterable[Rows], output: Path, header: bool = True) -> int:
+    """Stream row chunks to CSV or Parquet (by extension); returns data rows.
+
+    Only one chunk is held in memory. Error cells (#N/A, ...) are written
+    as empty / null. CSV cells are written as they come;
+    Parquet column types are inferred from the first chunk and a later
+    value that does not fit raises ValueError (row, column), as does a
+    row wider than the header. The file is written next to `output` and
+    renamed when complete.
+    """
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(output.name + ".part")
+    parquet = output.suffix.lower() == ".parquet"
+
+    sink = None
+    names: Optional[List[str]] = None
+    kinds: List[str] = []
+    total = 0
+    row_no = 1  # number of the next row read (header included)
+    try:
+        for rows in chunks:
+            rows = errors_to_null(list(rows))
+            if not rows:
+                continue
+            if names is None:
+                width = max(len(r) for r in rows)
+                if header:
+                    names = column_names(rows[0], width)
+                    rows = rows[1:]
+                    row_no += 1
+                else:
+                    names = [f"col{i + 1}" for i in range(width)]
+            if not rows:
+                continue
+            check_width(rows, len(names), row_no)
+            if sink is None:
+                kinds = infer_kinds(rows, len(names))
+                sink = _ParquetSink(tmp, names, kinds) if parquet else _CsvSink(tmp, names)
+            sink.write(rows, row_no)
+            total += len(rows)
+            row_no += len(rows)
+
+        if sink is None:
+            # No data row: still produce a file (header only)
+            names = names or []
+            kinds = [TEXT] * len(names)
+            sink = _ParquetSink(tmp, names, kinds) if parquet else _CsvSink(tmp, names)
+    except BaseException:
+        if sink is not None:
+            sink.close()
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+    sink.close()
+    os.replace(tmp, output)
+    return total
+
+
+def resolve_path(path: str, base_dir: str) -> Path:
+    """Paths in profiles are relative to the workbook folder."""
+    path = Path(path)
+    return path if path.is_absolute() else Path(base_dir) / path
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import csv
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+try:
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover
+    pq = None
+
+
+Rows = Sequence[Sequence[object]]
+
+# One Value2 assignment per block: large enough that marshalling dominates
+# the COM call overhead, small enough to keep the SAFEARRAY reasonable.
+CELLS_PER_BLOCK = 250_000
+
+_NUMBER = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+# ";"-delimited files come from a decimal-comma locale: "1,5", "-1 234,5"
+_COMMA_NUMBER = re.compile(r"^[+-]?(\d{1,3}([ \u00a0\u202f]\d{3})+|\d+)(,\d+)?([eE][+-]?\d+)?$")
+# Excel keeps 15 significant digits: longer digit strings are IDs, not numbers
+_MAX_DIGITS = 15
+
+
+def block_rows(width: int, chunk_rows: int = 0) -> int:
+    if chunk_rows > 0:
+        return chunk_rows
+    return max(1, CELLS_PER_BLOCK // max(1, width))
+
+
+def _cell(text: str, decimal_comma: bool = False) -> object:
+    """CSV text -> value Excel would store (numbers as float, '' as blank).
+
+    Numbers with a leading zero ('00123') and digit strings longer than 15
+    digits (account numbers) stay text, like IDs typed in Excel with a text
+    format. With `decimal_comma`, "1,5" and "1 234,5" are numbers too.
+    """
+    if text == "":
+        return None
+    t = text.strip()
+    digits = t.lstrip("+-")
+    if len(digits) > 1 and digits[0] == "0" and digits[1] not in ".,":
+        return text
+    if digits.isdigit() and len(digits) > _MAX_DIGITS:
+        return text
+    if _NUMBER.match(t):
+        return float(t)
+    if decimal_comma and _COMMA_NUMBER.match(t):
+        return float(re.sub(r"[ \u00a0\u202f]", "", t).replace(",", "."))
+    return text
+
+
+@dataclass
+class InputFile:
+    path: Path
+    header: Optional[List[str]]
+    width: int
+
+    def chunks(self, chunk_rows: int = 0) -> Iterator[Rows]:
+        """Rectangular row blocks (tuples of tuples, padded to `width`)."""
+        n = block_rows(self.width, chunk_rows)
+        if self.path.suffix.lower() == ".parquet":
+            yield from self._parquet_chunks(n)
+        else:
+            yield from self._csv_chunks(n)
+
+    def _fit(self, row: Sequence[object]) -> tuple:
+        # Only blank trailing cells are cut (checked by the caller)
+        row = tuple(row[: self.width])
+        if len(row) < self.width:
+            row += (None,) * (self.width - len(row))
+        return row
+
+    def _csv_chunks(self, n: int) -> Iterator[Rows]:
+        with open(self.path, "r", encoding="utf-8-sig", newline="") as f:
+            dialect = _sniff(f)
+            decimal_comma = dialect.delimiter == ";"
+            reader = csv.reader(f, dialect=dialect)
+            if self.header is not None:
+                next(reader, None)
+            block: List[tuple] = []
+            for row in reader:
+                if not row:
+                    continue
+                if len(row) > self.width and any(v.strip() for v in row[self.width :]):
+                    raise ValueError(
+                        f"{self.path.name}, line {reader.line_num}: {len(row)} cells, "
+                        f"wider than the {self.width} column(s) of the first row."
+                    )
+                block.append(self._fit([_cell(v, decimal_comma) for v in row]))
+                if len(block) >= n:
+                    yield tuple(block)
+                    block = []
+            if block:
+                yield tuple(block)
+
+    def _parquet_chunks(self, n: int) -> Iterator[Rows]:
+        pf = pq.ParquetFile(str(self.path))
+        for batch in pf.iter_batches(batch_size=n):
+            columns = [col.to_pylist() for col in batch.columns]
+            yield tuple(self._fit(row) for row in zip(*columns))
+
+
+def _sniff(f) -> type:
+    sample = f.read(64 * 1024)
+    f.seek(0)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        return csv.excel
+
+
+def open_input(path: Path, header: bool = True) -> InputFile:
+    """Inspect an input file (header + width) without loading it."""
+    path = Path(path)
+    if not path.is_file():
+        raise RuntimeError(f"Input file not found: {path}")
+
+    if path.suffix.lower() == ".parquet":
+        if pq is None:
+            raise RuntimeError("pyarrow is required for Parquet inputs.")
+        names = list(pq.ParquetFile(str(path)).schema_arrow.names)
+        return InputFile(path=path, header=names if header else None, width=len(names))
+
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        first = next(csv.reader(f, dialect=_sniff(f)), [])
+    return InputFile(path=path, header=list(first) if header else None, width=len(first))
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import getpass
+import hashlib
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from ..utils.log import get_logger
+
+
+ON_BUSY = ("abort", "wait", "attach")
+
+
+class RunBusy(RuntimeError):
+    """Another process holds the run lease of the workbook."""
+
+
+@dataclass
+class LeaseInfo:
+    """Content of a lease file (one JSON object)."""
+
+    token: str  # unique per acquisition: tells our lease apart from a successor's
+    run_id: str
+    workbook: str
+    owner: str  # user@host
+    host: str
+    pid: int
+    acquired_at: float  # epoch seconds (holder's clock)
+    heartbeat_at: float
+    ttl_s: float  # expired when no heartbeat for that long
+    status: str = "starting"  # current run phase
+    state: str = "running"  # running | done
+    ok: Optional[bool] = None  # result, once done
+    ended_at: Optional[float] = None
+
+    def expired(self, now: float) -> bool:
+        return now - self.heartbeat_at > self.ttl_s
+
+    def describe(self, now: Optional[float] = None) -> str:
+        now = time.time() if now is None else now
+        minutes = max(0.0, now - self.acquired_at) / 60
+        return f"{self.owner} (run {self.run_id}, {self.status}, started {minutes:.0f} min ago)"
+
+
+def lease_key(workbook_path: str) -> str:
+    """Normalized workbook path, the same on every machine syncing the folder.
+
+    Paths under a OneDrive root are taken relative to it, since each user
+    syncs the folder to their own profile.
+    """
+    path = os.path.normcase(os.path.abspath(workbook_path))
+    for var in ("OneDriveCommercial", "OneDriveConsumer", "OneDrive"):
+        root = os.environ.get(var)
+        if root:
+            root = os.path.normcase(os.path.abspath(root))
+            if path.startswith(root + os.sep):
+                return "onedrive:" + path[len(root) + 1 :].replace(os.sep, "/").lower()
+    return path.replace(os.sep, "/")
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    if sys.platform == "win32":
+        import ctypes
+
+        k32 = ctypes.windll.kernel32
+        handle = k32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            code = ctypes.c_ulong()
+            return bool(k32.GetExitCodeProcess(handle, ctypes.byref(code))) and code.value == 259
+        finally:
+            k32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists, owned by another user
+    return True
+
+
+def _read(path: Path) -> Optional[LeaseInfo]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return LeaseInfo(**{f.name: data[f.name] for f in fields(LeaseInfo) if f.name in data})
+    except Exception:
+        return None
+
+
+class RunLease:
+    """A held lease: heartbeats (with the current phase) until released."""
+
+    def __init__(self, path: Path, info: LeaseInfo, heartbeat_s: float, logger: logging.Logger):
+        self.path = path
+        self.info = info
+        self.heartbeat_s = heartbeat_s
+        self.logger = logger
+        self.lost = False  # taken over by another process (our heartbeats stopped)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="RunLease", daemon=True)
+        self._thread.start()
+
+    def _write(self) -> bool:
+        """Rewrite the lease file if it is still ours."""
+        current = _read(self.path)
+        if current is not None and current.token != self.info.token:
+            if not self.lost:
+                self.lost = True
+                self.logger.warning(f"Run lease lost: taken over by {current.describe()}.")
+            return False
+        self.info.heartbeat_at = time.time()
+        tmp = self.path.with_name(f"{self.path.name}.{self.info.token}.tmp")
+        tmp.write_text(json.dumps(asdict(self.info), indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)  # the file never disappears: O_EXCL keeps failing for others
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.heartbeat_s):
+            try:
+                with self._lock:
+                    if not self._write():
+                        return
+            except OSError:
+                self.logger.warning("Run lease: heartbeat not written.", exc_info=True)
+
+    def update(self, status: str) -> None:
+        """Publish the current phase (written with the next heartbeat)."""
+        with self._lock:
+            self.info.status = status
+
+    def release(self, ok: bool) -> None:
+        """Stop heartbeats and leave the result for processes following the run."""
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+        with self._lock:
+            self.info.state = "done"
+            self.info.ok = bool(ok)
+            self.info.ended_at = time.time()
+            self.info.status = "done" if ok else "failed"
+            try:
+                self._write()
+            except OSError:
+                self.logger.warning("Run lease: release not written.", exc_info=True)
+
+
+class LeaseManager:
+    """Cross-process (and cross-machine) lease on a workbook run.
+
+    The lease is a JSON file created with O_CREAT | O_EXCL, next to the
+    workbook or in a shared folder. The holder rewrites it every
+    `heartbeat_s`; a lease with no heartbeat for `ttl_s`, ended ("done")
+    or held by a dead process of this host is free and can be taken over.
+
+    Exclusive creation is atomic on a local disk and on an SMB share; in a
+    OneDrive-synced folder it only holds within the sync delay, so use a
+    network share (`directory`) when machines may start the same run at
+    once.
+    """
+
+    def __init__(
+        self,
+        directory: str = "",
+        ttl_s: float = 120.0,
+        heartbeat_s: Optional[float] = None,
+        poll_s: float = 5.0,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.directory = directory  # "" = next to the workbook
+        self.ttl_s = max(1.0, float(ttl_s))
+        self.heartbeat_s = heartbeat_s if heartbeat_s else self.ttl_s / 4
+        self.poll_s = poll_s
+        self.logger = logger or get_logger("runner")
+        self.host = socket.gethostname()
+        try:
+            user = getpass.getuser()
+        except Exception:
+            user = "?"
+        self.owner = f"{user}@{self.host}"
+
+    def path_for(self, workbook_path: str) -> Path:
+        name = os.path.basename(workbook_path)
+        if not self.directory:
+            return Path(os.path.abspath(workbook_path)).with_name(f".{name}.lease.json")
+        digest = hashlib.sha256(lease_key(workbook_path).encode("utf-8")).hexdigest()[:16]
+        return Path(self.directory) / f"{os.path.splitext(name)[0]}-{digest}.lease.json"
+
+    def read(self, workbook_path: str) -> Optional[LeaseInfo]:
+        return _read(self.path_for(workbook_path))
+
+    def _free(self, path: Path, info: Optional[LeaseInfo], now: float) -> bool:
+        if info is None:
+            # Being created (not written yet) or corrupt: wait one TTL
+            try:
+                return now - path.stat().st_mtime > self.ttl_s
+            except OSError:
+                return True
+        if info.state == "done" or info.expired(now):
+            return True
+        return info.host == self.host and not _pid_alive(info.pid)
+
+    def _take_over(self, path: Path, stale: Optional[LeaseInfo]) -> bool:
+        """Move a free lease aside; only one contender can win the rename."""
+        aside = path.with_name(f"{path.name}.{uuid.uuid4().hex}.old")
+        try:
+            os.rename(path, aside)
+        except OSError:
+            return False  # gone already: retry the creation
+        moved = _read(aside)
+        if stale is not None and (moved is None or moved.token != stale.token):
+            # A successor created its lease between our read and the rename
+            try:
+                os.rename(aside, path)
+            except OSError:
+                pass
+            return False
+        try:
+            aside.unlink()
+        except OSError:
+            pass
+        return True
+
+    def try_acquire(self, workbook_path: str, run_id: str) -> Tuple[Optional[RunLease], Optional[LeaseInfo]]:
+        """(lease, None) when acquired, else (None, current holder)."""
+        path = self.path_for(workbook_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for _ in range(3):
+            now = time.time()
+            info = LeaseInfo(
+                token=uuid.uuid4().hex,
+                run_id=run_id,
+                workbook=lease_key(workbook_path),
+                owner=self.owner,
+                host=self.host,
+                pid=os.getpid(),
+                acquired_at=now,
+                heartbeat_at=now,
+                ttl_s=self.ttl_s,
+            )
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                holder = _read(path)
+                if not self._free(path, holder, now):
+                    return None, holder
+                self._take_over(path, holder)
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(info), indent=2))
+            return RunLease(path, info, self.heartbeat_s, self.logger), None
+        return None, _read(path)
+
+    def wait_acquire(
+        self,
+        workbook_path: str,
+        run_id: str,
+        on_status: Optional[Callable[[LeaseInfo], None]] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> Optional[RunLease]:
+        """Block until the lease is ours (None if `stop` is set first)."""
+        last = None
+        while True:
+            lease, holder = self.try_acquire(workbook_path, run_id)
+            if lease is not None:
+                return lease
+            if holder is not None and on_status is not None and (holder.token, holder.status) != last:
+                last = (holder.token, holder.status)
+                on_status(holder)
+            if stop is not None:
+                if stop.wait(self.poll_s):
+                    return None
+            else:
+                time.sleep(self.poll_s)
+
+    def follow(
+        self,
+        workbook_path: str,
+        on_status: Optional[Callable[[LeaseInfo], None]] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> Optional[LeaseInfo]:
+        """Follow the current holder until its run ends.
+
+        Returns its final state ("done" + ok), or None when it vanished or
+        expired without a result.
+        """
+        path = self.path_for(workbook_path)
+        first = _read(path)
+        if first is None:
+            return None
+        last = None
+        while True:
+            info = _read(path)
+            if info is None or info.token != first.token:
+                return None  # gone or replaced by another run
+            if info.state == "done":
+                return info
+            if self._free(path, info, time.time()):
+                return None  # holder died
+            if on_status is not None and info.status != last:
+                last = info.status
+                on_status(info)
+            if stop is not None:
+                if stop.wait(self.poll_s):
+                    return None
+            else:
+                time.sleep(self.poll_s)
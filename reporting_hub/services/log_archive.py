@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import logging.handlers
+import mmap
+import os
+import re
+import sys
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Hashable, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+from ..config.constants import LOG_BACKUPS, LOG_DIR, LOG_FILE_NAME, LOG_MAX_BYTES
+
+
+# ------------------------------
+# Writing (file sink of utils.log's pipeline)
+# ------------------------------
+# One self-describing line per physical line:
+# 2026-01-31 08:00:00 INFO  run=20260131-080000-ab12cd profile=monthly phase=run | message
+_LINE_FMT = "{ts} {level:<5} run={run} profile={profile} phase={phase} | {msg}\n"
+_PROFILE_FIELD = re.compile(rb" profile=(.+?) phase=")
+
+
+def format_lines(
+    msg: str,
+    level: str = "INFO",
+    run_id: str = "",
+    profile: str = "",
+    phase: str = "",
+    created: Optional[float] = None,
+) -> str:
+    when = datetime.fromtimestamp(created) if created is not None else datetime.now()
+    ts = when.strftime("%Y-%m-%d %H:%M:%S")
+    return "".join(
+        _LINE_FMT.format(
+            ts=ts, level=level, run=run_id or "-", profile=profile or "-", phase=phase or "-", msg=part
+        )
+        for part in (str(msg).splitlines() or [""])
+    )
+
+
+class ArchiveFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        msg = record.getMessage()
+        if record.exc_text:
+            msg += "\n" + record.exc_text
+        return format_lines(
+            msg,
+            level=record.levelname,
+            run_id=getattr(record, "run_id", ""),
+            profile=getattr(record, "profile", ""),
+            phase=getattr(record, "phase", ""),
+            created=record.created,
+        )
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Exclusive lock shared by every process writing the log."""
+    with open(path, "a+b") as f:
+        if sys.platform == "win32":
+            import msvcrt
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # retries for ~10 s, then raises
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class SharedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler usable by several processes at once (GUI + headless).
+
+    The file is only open while a record is written, under a lock file:
+    any process can rotate it (Windows refuses to rename an open file) and
+    none keeps writing into a file renamed away by another.
+    """
+
+    def __init__(self, filename: Path, maxBytes: int, backupCount: int):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding="utf-8", delay=True)
+        self.lock_path = self.baseFilename + ".lock"
+
+    def _open(self):
+        # "\n" on every platform: the archive's line index splits on it
+        return open(self.baseFilename, self.mode, encoding=self.encoding, errors=self.errors, newline="")
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            data = self.format(record)
+            with _file_lock(self.lock_path):
+                if self.maxBytes > 0:
+                    try:
+                        size = os.path.getsize(self.baseFilename)
+                    except OSError:
+                        size = 0
+                    if size and size + len(data.encode("utf-8")) >= self.maxBytes:
+                        try:
+                            self.doRollover()
+                        except OSError:
+                            pass  # a reader has a file open: rotate with a later record
+                self.stream = self._open()
+                try:
+                    self.stream.write(data)
+                finally:
+                    self.stream.close()
+                    self.stream = None
+        except Exception:
+            self.handleError(record)
+
+
+def file_handler() -> SharedRotatingFileHandler:
+    """Rotating handler writing the archive format into LOG_DIR."""
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    handler = SharedRotatingFileHandler(
+        LOG_DIR / LOG_FILE_NAME, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS
+    )
+    handler.setFormatter(ArchiveFormatter())
+    handler.terminator = ""  # lines already end with "\n"
+    return handler
+
+
+# ------------------------------
+# Reading
+# ------------------------------
+class LineIndex:
+    """Start offsets of every line of one log file, built over mmap.
+
+    The file is only scanned once; when it grows (active log) only the new
+    tail is indexed. The profiles seen are collected on the way.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.offsets = array("Q")  # start of each complete line
+        self.profiles: Set[str] = set()
+        self._indexed = 0  # bytes indexed so far
+        self._inode: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def refresh(self) -> None:
+        try:
+            st = self.path.stat()
+        except OSError:
+            self.offsets = array("Q")
+            self.profiles = set()
+            self._indexed = 0
+            return
+        if st.st_size < self._indexed or (self._inode is not None and st.st_ino != self._inode):
+            # Rotated / truncated: start over
+            self.offsets = array("Q")
+            self.profiles = set()
+            self._indexed = 0
+        self._inode = st.st_ino
+        if st.st_size == self._indexed:
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = self._indexed
+            self._scan(mm, start, st.st_size)
+            found = set(_PROFILE_FIELD.findall(mm, start, self._indexed))
+            self.profiles.update(p.decode("utf-8", errors="replace") for p in found)
+
+    def _scan(self, mm: mmap.mmap, start: int, end: int) -> None:
+        # Only complete lines are indexed; a partial last line waits for its "\n".
+        if np is not None:
+            buf = np.frombuffer(mm, dtype=np.uint8, count=end - start, offset=start)
+            ends = np.flatnonzero(buf == 10) + (start + 1)
+            del buf  # release the exported buffer before mm closes
+            if len(ends):
+                self.offsets.append(start)
+                if len(ends) > 1:
+                    self.offsets.frombytes(ends[:-1].astype(np.uint64).tobytes())
+                self._indexed = int(ends[-1])
+            return
+        pos = start
+        while True:
+            nl = mm.find(b"\n", pos, end)
+            if nl < 0:
+                break
+            self.offsets.append(pos)
+            pos = nl + 1
+        self._indexed = pos
+
+    def line_at(self, i: int, mm: mmap.mmap) -> str:
+        start = self.offsets[i]
+        stop = self.offsets[i + 1] if i + 1 < len(self.offsets) else self._indexed
+        return mm[start:stop].decode("utf-8", errors="replace").rstrip("\r\n")
+
+    def span(self, i: int, mm: mmap.mmap) -> Tuple[int, int]:
+        """Byte range of line `i`, without its line break."""
+        start = self.offsets[i]
+        stop = self.offsets[i + 1] if i + 1 < len(self.offsets) else self._indexed
+        while stop > start and mm[stop - 1] in (10, 13):
+            stop -= 1
+        return start, stop
+
+    def line_of_offset(self, offset: int) -> int:
+        return bisect.bisect_right(self.offsets, offset) - 1
+
+
+class LogArchive:
+    """All rotated log files seen as one sequence of lines (oldest first)."""
+
+    def __init__(self, log_dir: Path = LOG_DIR, name: str = LOG_FILE_NAME):
+        self.log_dir = Path(log_dir)
+        self.name = name
+        self._indexes: Dict[Hashable, LineIndex] = {}  # (st_dev, st_ino) -> index
+        self._files: List[LineIndex] = []
+        self._starts: List[int] = []  # global line number of each file's first line
+
+    def files(self) -> List[Path]:
+        """name.N (oldest) ... name.1, name (newest)."""
+        if not self.log_dir.exists():
+            return []
+        rotated = []
+        for p in self.log_dir.glob(f"{self.name}.*"):
+            suffix = p.name[len(self.name) + 1 :]
+            if suffix.isdigit():
+                rotated.append((int(suffix), p))
+        out = [p for _, p in sorted(rotated, reverse=True)]
+        current = self.log_dir / self.name
+        if current.exists():
+            out.append(current)
+        return out
+
+    def refresh(self) -> int:
+        """(Re)index new content; returns the total line count.
+
+        Rotation renames files (name -> name.1 -> ...), so indexes follow
+        the file itself (device + inode), not its path: a rotated file is
+        never scanned again.
+        """
+        entries: List[Tuple[Hashable, LineIndex]] = []
+        for p in self.files():
+            try:
+                st = p.stat()
+            except OSError:
+                continue  # rotated away meanwhile
+            key: Hashable = (st.st_dev, st.st_ino) if st.st_ino else p
+            idx = self._indexes.get(key)
+            if idx is None:
+                idx = LineIndex(p)
+            idx.path = p
+            idx.refresh()
+            entries.append((key, idx))
+        self._indexes = dict(entries)
+        files = [idx for _, idx in entries]
+        self._files = files
+        self._starts = []
+        total = 0
+        for idx in files:
+            self._starts.append(total)
+            total += len(idx)
+        return total
+
+    def profiles(self) -> List[str]:
+        """Profiles found in the indexed lines (as of the last refresh)."""
+        found: Set[str] = set()
+        for idx in self._files:
+            found |= idx.profiles
+        found.discard("-")
+        return sorted(found)
+
+    def __len__(self) -> int:
+        return (self._starts[-1] + len(self._files[-1])) if self._files else 0
+
+    def _locate(self, n: int) -> Tuple[LineIndex, int]:
+        k = bisect.bisect_right(self._starts, n) - 1
+        return self._files[k], n - self._starts[k]
+
+    def lines(self, numbers: Sequence[int]) -> List[str]:
+        """Text of the given global line numbers (only these are read)."""
+        out: List[str] = []
+        mm_cache: Dict[Path, Tuple[object, mmap.mmap]] = {}
+        try:
+            for n in numbers:
+                idx, i = self._locate(n)
+                if idx.path not in mm_cache:
+                    f = open(idx.path, "rb")
+                    mm_cache[idx.path] = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                out.append(idx.line_at(i, mm_cache[idx.path][1]))
+        finally:
+            for f, mm in mm_cache.values():
+                mm.close()
+                f.close()  # type: ignore[attr-defined]
+        return out
+
+    def search(
+        self,
+        text: str = "",
+        regex: bool = False,
+        run_id: str = "",
+        profile: str = "",
+        ignore_case: bool = True,
+    ) -> array:
+        """Global line numbers matching every given criterion.
+
+        The most selective criterion is scanned over the mmap with a bytes
+        regex (C speed, no per-line Python work); the others are only
+        checked on the candidate lines. A regex is matched line by line:
+        ^ and $ are line bounds, and a match running over a line break
+        (e.g. through "\\s") is re-checked on each line it covers.
+        """
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        tests: List["re.Pattern[bytes]"] = []
+        if run_id:
+            tests.append(re.compile(rb" run=" + re.escape(run_id.encode("utf-8")) + rb" "))
+        if profile:
+            tests.append(re.compile(rb" profile=" + re.escape(profile.encode("utf-8")) + rb" "))
+        if text:
+            body = text.encode("utf-8") if regex else re.escape(text.encode("utf-8"))
+            tests.append(re.compile(body, flags))
+        result = array("Q")
+        if not tests:
+            result.extend(range(len(self)))
+            return result
+
+        primary, others = tests[0], tests[1:]
+        for idx, start in zip(self._files, self._starts):
+            if not len(idx):
+                continue
+            with open(idx.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                last = -1  # lines are found in order: each is checked once
+                for m in primary.finditer(mm, 0, idx._indexed):
+                    first = idx.line_of_offset(m.start())
+                    if mm.find(b"\n", m.start(), m.end()) < 0:
+                        lines: Sequence[int] = [first] if first > last else []
+                    else:
+                        covered = range(max(first, last + 1), idx.line_of_offset(m.end() - 1) + 1)
+                        lines = [i for i in covered if primary.search(mm, *idx.span(i, mm))]
+                        last = max(last, covered.stop - 1)
+                    for i in lines:
+                        last = max(last, i)
+                        if others and not all(t.search(mm, *idx.span(i, mm)) for t in others):
+                            continue
+                        result.append(start + i)
+        return result
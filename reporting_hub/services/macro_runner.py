@@ -1,12 +1,48 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Callable, List, Optional
+import glob
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
 
+from ..config.constants import (
+    ARTIFACTS_DIR,
+    CHECKPOINTS_DIR,
+    LAUNCH_TIMINGS_PATH,
+    MACRO_TIMINGS_PATH,
+    RUN_HISTORY_PATH,
+)
+from ..config.models import ExecutionProfile, ExtractSpec, InjectSpec, LaunchProfile, RequiredInput, StepSpec
+from ..excel.attach import AttachStore
 from ..excel.controller import ExcelController
+from ..excel.tuning import ApplicationTuning
+from ..utils.log import get_logger, log_context
+from ..utils.timing import RunTimer
+from .artifacts import ArtifactStore
+from .checkpoints import Checkpoint, CheckpointStore, StepRecord, steps_signature
+from .extract import resolve_path, write_table
+from .inject import open_input
+from .lease import LeaseInfo, LeaseManager, RunBusy, RunLease
+from .readiness import InputsNotReady, ReadinessGate, format_status
+from .run_history import MacroTimings, RunHistory, macro_key
 
 
-Logger = Callable[[str], None]
+# Excel settings while inputs are written: no recalculation per block
+_INJECT_TUNING = ExecutionProfile(calculation="manual", screen_updating=False, enable_events=False)
+
+
+class RunCancelled(RuntimeError):
+    """The run was cancelled (worker stopping) while it was waiting."""
+
+
+def new_run_id() -> str:
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
 
 
 @dataclass
@@ -16,21 +52,383 @@ class RunRequest:
     args: List[str]
     excel_mode: str = "minimized"
 
+    # Main window mode while the macro runs (None = excel_mode).
+    # excel_mode is restored afterwards.
+    run_mode: Optional[str] = None
+
+    profile: str = ""
+    outputs: List[str] = field(default_factory=list)  # glob patterns
+    inputs: List[InjectSpec] = field(default_factory=list)
+    extracts: List[ExtractSpec] = field(default_factory=list)
+    execution: Optional[ExecutionProfile] = None
+    launch: Optional[LaunchProfile] = None  # lean launch (add-ins)
+    run_id: str = field(default_factory=new_run_id)
+
+    # Multi-step run (replaces macro_name/args when set)
+    steps: List[StepSpec] = field(default_factory=list)
+    resume: bool = True  # False = ignore the checkpoint of a failed run
+
+    # Readiness gate: files waited for before Excel is launched
+    requires: List[RequiredInput] = field(default_factory=list)
+    wait_inputs_s: Optional[float] = 600.0  # None = no limit
+
+
+def resolve_outputs(patterns: List[str], base_dir: str) -> List[Path]:
+    """Expand output patterns (relative to the workbook folder)."""
+    found: List[Path] = []
+    for pattern in patterns:
+        for p in sorted(glob.glob(os.path.join(base_dir, pattern))):
+            path = Path(p)
+            if path.is_file() and path not in found:
+                found.append(path)
+    return found
+
 
 class MacroRunner:
     """Orchestrates the full 'open workbook -> run macro' flow."""
 
-    def __init__(self, logger: Logger):
-        self.log = logger
-        self.controller = ExcelController(logger)
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        controller: Optional[ExcelController] = None,
+        store: Optional[ArtifactStore] = None,
+        artifacts_max_mb: int = 0,
+        attach_store: Optional[AttachStore] = None,
+        leases: Optional[LeaseManager] = None,
+        on_busy: str = "abort",
+        cancel: Optional[threading.Event] = None,
+    ):
+        self.logger = logger or get_logger("runner")
+        self.log = self.logger.info
+        self.controller = controller or ExcelController()
+        self.store = store
+        self.artifacts_max_mb = int(artifacts_max_mb or 0)
+        # Attach mode: reuse the instance that already has the workbook open
+        self.attach_store = attach_store
+        # Run lease: one run per workbook across processes / machines
+        self.leases = leases
+        self.on_busy = on_busy  # abort | wait | attach
+        # Set to give up waits (inputs, lease) of the run: the worker's stop event
+        self.cancel = cancel
+        self.timer: Optional[RunTimer] = None
+
+    def run(self, req: RunRequest, quit_excel_when_done: bool = False) -> RunTimer:
+        """Run the request; per-phase durations are kept in `self.timer`."""
+        with log_context(req.run_id, req.profile):
+            if self.leases is None:
+                return self._run(req, quit_excel_when_done)
+            lease = self._acquire_lease(req)
+            if lease is None:
+                # attach: the other process ran it, nothing was timed here
+                self.timer = RunTimer(run_id=req.run_id, profile=req.profile)
+                return self.timer
+            ok = False
+            try:
+                timer = self._run(req, quit_excel_when_done, lease)
+                ok = True
+                return timer
+            finally:
+                lease.release(ok)
+
+    def _acquire_lease(self, req: RunRequest) -> Optional[RunLease]:
+        """Our lease, or None when the run of another process was followed (attach)."""
+        lease, holder = self.leases.try_acquire(req.workbook_path, req.run_id)
+        if lease is not None:
+            return lease
+        busy = holder.describe() if holder is not None else "another process"
+        if self.on_busy == "wait":
+            self.log(f"Run lease: {os.path.basename(req.workbook_path)} is being run by {busy}, waiting.")
+            lease = self.leases.wait_acquire(
+                req.workbook_path, req.run_id, on_status=self._log_holder, stop=self.cancel
+            )
+            if lease is None:
+                raise RunCancelled(f"Run cancelled while waiting for the run of {busy}.")
+            return lease
+        if self.on_busy == "attach":
+            self.log(f"Run lease: following the run of {busy}.")
+            final = self.leases.follow(req.workbook_path, on_status=self._log_holder, stop=self.cancel)
+            if final is None and self.cancel is not None and self.cancel.is_set():
+                raise RunCancelled(f"Run cancelled while following the run of {busy}.")
+            if final is None:
+                raise RunBusy(f"The run of {busy} ended without a result (process gone).")
+            if not final.ok:
+                raise RuntimeError(f"The run of {final.owner} (run {final.run_id}) failed.")
+            self.log(f"Run lease: {final.owner} completed run {final.run_id}.")
+            return None
+        raise RunBusy(f"{os.path.basename(req.workbook_path)} is already being run by {busy}.")
+
+    def _log_holder(self, holder: LeaseInfo) -> None:
+        self.log(f"Run lease: {holder.describe()}.")
+
+    def _run(self, req: RunRequest, quit_excel_when_done: bool, lease: Optional[RunLease] = None) -> RunTimer:
+        timer = self.timer = RunTimer(run_id=req.run_id, profile=req.profile)
+        if lease is not None:
+            timer.on_phase = lease.update
+        self.log(f"Run {req.run_id}: {req.macro_name} ({os.path.basename(req.workbook_path)})")
+        record = {
+            "run_id": req.run_id,
+            "profile": req.profile,
+            "workbook": req.workbook_path,
+            "started_at": time.time(),
+            "ok": False,
+            "steps": [],
+        }
+        t0 = time.perf_counter()
+        try:
+            self._run_phases(req, quit_excel_when_done, record)
+            record["ok"] = True
+        finally:
+            record["duration_s"] = round(time.perf_counter() - t0, 3)
+            record["phases"] = {k: round(v, 3) for k, v in timer.totals().items()}
+            try:
+                RunHistory(RUN_HISTORY_PATH).append(record)
+            except Exception:
+                pass
+        return timer
+
+    def _run_phases(self, req: RunRequest, quit_excel_when_done: bool, record: dict) -> None:
+        timer = self.timer
+
+        if req.requires:
+            with timer.phase("wait_inputs"):
+                self._wait_inputs(req)
 
-    def run(self, req: RunRequest, quit_excel_when_done: bool = False) -> None:
         if self.controller.excel is None:
-            self.controller.launch_new_instance()
+            with timer.phase("launch"):
+                if not self._attach(req.workbook_path):
+                    self._launch(req.launch, record)
+        elif req.launch is not None and req.launch.lean:
+            # Instance kept from a previous run: only what differs is changed
+            with timer.phase("launch"):
+                self.controller.apply_launch_profile(req.launch)
+
+        with timer.phase("mode"):
+            self.controller.set_excel_mode(req.run_mode or req.excel_mode)
+        with timer.phase("open"):
+            wb_name = self.controller.open_or_activate_by_path(req.workbook_path)
+        if self.attach_store is not None:
+            c = self.controller
+            self.attach_store.record(c.excel_pid, req.workbook_path, c.excel_created)
+        if req.inputs:
+            with timer.phase("inject"):
+                self._inject_inputs(req, wb_name)
+        try:
+            if req.steps:
+                self._run_steps(req, wb_name, record)
+            else:
+                step = {"index": 0, "macro": req.macro_name, "ok": False}
+                record["steps"].append(step)
+                with timer.phase("run"):
+                    elapsed = self.controller.run_macro(
+                        wb_name, req.macro_name, *req.args, execution=req.execution
+                    )
+                step.update(ok=True, duration_s=round(elapsed, 3))
+                self._log_time_saved(req, elapsed)
+        finally:
+            if req.run_mode and req.run_mode != req.excel_mode:
+                # Restore user preference after macro ends
+                try:
+                    with timer.phase("restore"):
+                        self.controller.set_excel_mode(req.excel_mode)
+                except Exception:
+                    pass
+
+        if req.extracts:
+            with timer.phase("extract"):
+                self._run_extracts(req, wb_name)
 
-        self.controller.set_excel_mode(req.excel_mode)
-        wb_name = self.controller.open_or_activate_by_path(req.workbook_path)
-        self.controller.run_macro(wb_name, req.macro_name, *req.args)
+        if req.outputs:
+            with timer.phase("store"):
+                self._store_outputs(req)
 
         if quit_excel_when_done:
-            self.controller.quit_excel()
+            with timer.phase("quit"):
+                self.controller.quit_excel()
+
+    def own_locks(self, workbook_path: str) -> List[str]:
+        """[workbook_path] when our instance (or the kept attach instance) holds it open.
+
+        Its lock file is then ours: the readiness gate must not wait for it.
+        """
+        state = self.attach_store.load() if self.attach_store is not None else None
+        kept_pid = state.pid if state is not None and state.has(workbook_path) else None
+        try:
+            if self.controller.holds_workbook(workbook_path, kept_pid):
+                return [workbook_path]
+        except Exception:
+            pass  # not ours then: its lock is waited for
+        return []
+
+    def _wait_inputs(self, req: RunRequest) -> None:
+        own = self.own_locks(req.workbook_path)
+        gate = ReadinessGate(req.requires, os.path.dirname(os.path.abspath(req.workbook_path)), own_locks=own)
+        if not gate.wait(req.wait_inputs_s, stop=self.cancel, on_status=self._log_waiting):
+            if self.cancel is not None and self.cancel.is_set():
+                raise RunCancelled(f"Run cancelled while waiting for inputs: {format_status(gate.check())}")
+            raise InputsNotReady(
+                f"Inputs not ready after {req.wait_inputs_s:.0f}s: {format_status(gate.check())}"
+            )
+        self.log(f"Inputs: {len(req.requires)} required input(s) ready.")
+
+    def _log_waiting(self, statuses) -> None:
+        self.log(f"Inputs: waiting ({format_status(statuses)}).")
+
+    def _launch(self, launch: Optional[LaunchProfile], record: dict) -> None:
+        lean = launch is not None and launch.lean
+        self.controller.launch_new_instance(launch)
+        elapsed = self.controller.launch_s  # DispatchEx only: add-in loading / window mode excluded
+        record["launch"] = {"lean": lean, "seconds": round(elapsed, 3)}
+        try:
+            # "tuned" = lean: the baseline is the last standard launch
+            baseline = MacroTimings(LAUNCH_TIMINGS_PATH).record("excel", elapsed, lean)
+        except Exception:
+            return
+        if not lean:
+            self.log(f"Excel launch: {elapsed:.1f}s (standard).")
+        elif baseline:
+            self.log(
+                f"Excel launch: {elapsed:.1f}s lean vs {baseline:.1f}s standard "
+                f"(~{baseline - elapsed:.1f}s saved)."
+            )
+        else:
+            self.log(f"Excel launch: {elapsed:.1f}s lean (no standard launch recorded yet).")
+
+    def _attach(self, workbook_path: str) -> bool:
+        state = self.attach_store.load() if self.attach_store is not None else None
+        if state is None or not state.has(workbook_path):
+            return False
+        try:
+            return self.controller.attach_to_workbook(workbook_path, state.pid, state.created)
+        except Exception:
+            self.logger.warning("Attach failed: launching a new Excel instance.", exc_info=True)
+            return False
+
+    def _run_steps(self, req: RunRequest, wb_name: str, record: dict) -> None:
+        """Run req.steps in order, checkpointing after each successful step."""
+        n = len(req.steps)
+        signature = steps_signature(macro_key(req.workbook_path, req.profile), req.steps)
+        store = CheckpointStore(CHECKPOINTS_DIR)
+        pid, created = self.controller.excel_pid, self.controller.excel_created
+
+        cp = store.load(signature) if req.resume else None
+        start = cp.resume_index(pid, created) if cp is not None else 0
+        if cp is not None and start > 0:
+            cp.completed = cp.completed[:start]
+            record.update(resumed_at=start + 1, resumed_from=cp.run_id)
+            self.log(f"Resuming at step {start + 1}/{n} (checkpoint of run {cp.run_id}).")
+        else:
+            start = 0
+            cp = Checkpoint(signature=signature, run_id=req.run_id)
+
+        for i, spec in enumerate(req.steps):
+            step = {"index": i, "macro": spec.macro}
+            record["steps"].append(step)
+            if i < start:
+                step["skipped"] = True
+                continue
+
+            args = [a.strip() for a in spec.args.split(";") if a.strip()]
+            self.log(f"Step {i + 1}/{n}: {spec.macro}")
+            t0 = time.perf_counter()
+            try:
+                with self.timer.phase(f"step{i + 1}"):
+                    self.controller.run_macro(wb_name, spec.macro, *args, execution=req.execution)
+                    if spec.save_after:
+                        self.controller.save_workbook(wb_name)
+            except BaseException:
+                step.update(ok=False, duration_s=round(time.perf_counter() - t0, 3))
+                self.logger.error(f"Step {i + 1}/{n} failed: {spec.macro} (rerun resumes here).")
+                raise
+            step.update(ok=True, duration_s=round(time.perf_counter() - t0, 3))
+
+            cp.run_id = req.run_id
+            cp.excel_pid = pid
+            cp.excel_created = created
+            cp.completed.append(
+                StepRecord(
+                    index=i,
+                    macro=spec.macro,
+                    duration_s=step["duration_s"],
+                    saved=spec.save_after,
+                    ended_at=time.time(),
+                )
+            )
+            try:
+                store.save(cp)
+            except OSError as e:
+                self.logger.warning(f"Checkpoint not saved ({e}).")
+
+        store.clear(signature)
+
+    def _log_time_saved(self, req: RunRequest, elapsed: float) -> None:
+        tuned = req.execution is not None and not req.execution.is_empty()
+        try:
+            baseline = MacroTimings(MACRO_TIMINGS_PATH).record(
+                macro_key(req.workbook_path, req.macro_name), elapsed, tuned
+            )
+        except Exception:
+            return
+        if not tuned:
+            return
+        if baseline:
+            self.log(
+                f"Execution profile: {elapsed:.1f}s vs {baseline:.1f}s without "
+                f"(~{baseline - elapsed:.1f}s saved)."
+            )
+        else:
+            self.log(f"Execution profile: {elapsed:.1f}s (no untuned run recorded yet).")
+
+    def _inject_inputs(self, req: RunRequest, wb_name: str) -> None:
+        base_dir = os.path.dirname(os.path.abspath(req.workbook_path))
+        with ApplicationTuning(self.controller.excel, _INJECT_TUNING, self.log):
+            for spec in req.inputs:
+                source = open_input(resolve_path(spec.source, base_dir), header=spec.header)
+                t0 = time.perf_counter()
+                rows = self.controller.write_range_rows(
+                    wb_name,
+                    spec.target,
+                    source.chunks(spec.chunk_rows),
+                    source.width,
+                    header=source.header if spec.write_header else None,
+                    clear=spec.clear,
+                )
+                self.log(
+                    f"Input: {source.path.name} -> {spec.target} ({rows:,} rows, {time.perf_counter() - t0:.1f}s)"
+                )
+
+    def _run_extracts(self, req: RunRequest, wb_name: str) -> None:
+        base_dir = os.path.dirname(os.path.abspath(req.workbook_path))
+        for spec in req.extracts:
+            output = resolve_path(spec.output, base_dir)
+            t0 = time.perf_counter()
+            rows = write_table(
+                self.controller.iter_range_values(wb_name, spec.source, spec.chunk_rows),
+                output,
+                header=spec.header,
+            )
+            self.log(f"Extract: {spec.source} -> {output.name} ({rows:,} rows, {time.perf_counter() - t0:.1f}s)")
+
+    def _store_outputs(self, req: RunRequest) -> None:
+        if not req.outputs:
+            return
+        base_dir = os.path.dirname(os.path.abspath(req.workbook_path))
+        paths = resolve_outputs(req.outputs, base_dir)
+        if not paths:
+            self.logger.warning("Artifacts: no output file matched.")
+            return
+
+        # The run itself succeeded: storing artifacts is best effort.
+        try:
+            if self.store is None:
+                self.store = ArtifactStore(ARTIFACTS_DIR)
+            manifest = self.store.record_run(req.run_id, paths, profile=req.profile)
+            self.log(
+                f"Artifacts: {len(manifest.entries)} file(s) stored, {len(manifest.changed)} changed "
+                f"(run {req.run_id})."
+            )
+            if self.artifacts_max_mb > 0:
+                freed = self.store.prune(self.artifacts_max_mb * 1024 * 1024)
+                if freed:
+                    self.log(f"Artifacts: {freed / (1024 * 1024):.1f} MB freed.")
+        except Exception as e:
+            self.logger.warning(f"Artifacts: store failed ({e}).")
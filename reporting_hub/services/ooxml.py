@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import posixpath
+import re
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import Element, iterparse
+
+
+# Minimal streaming access to .xlsx/.xlsm packages (no Excel, no lxml).
+# Every reader uses iterparse and drops parsed rows at once, so memory
+# stays flat whatever the sheet size.
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_M = "{%s}" % NS_MAIN
+
+TAG_ROW = _M + "row"
+TAG_CELL = _M + "c"
+TAG_VALUE = _M + "v"
+TAG_FORMULA = _M + "f"
+TAG_INLINE = _M + "is"
+TAG_TEXT = _M + "t"
+TAG_SI = _M + "si"
+TAG_DIMENSION = _M + "dimension"
+TAG_SHEET_DATA = _M + "sheetData"
+
+_CELL_REF = re.compile(r"^\$?([A-Za-z]{1,3})\$?(\d+)$")
+
+
+def col_index(letters: str) -> int:
+    """'A' -> 1, 'AZ' -> 52."""
+    n = 0
+    for ch in letters.upper():
+        n = n * 26 + (ord(ch) - 64)
+    return n
+
+
+def col_letters(index: int) -> str:
+    out = ""
+    while index > 0:
+        index, rem = divmod(index - 1, 26)
+        out = chr(65 + rem) + out
+    return out
+
+
+def parse_cell_ref(ref: str) -> Tuple[int, int]:
+    """'B12' -> (row 12, column 2); raises ValueError."""
+    m = _CELL_REF.match(ref.strip())
+    if not m:
+        raise ValueError(f"Invalid cell reference: {ref}")
+    return int(m.group(2)), col_index(m.group(1))
+
+
+def parse_range_ref(ref: str) -> Tuple[int, int, int, int]:
+    """'A1:D10' -> (first_row, first_col, last_row, last_col); 'A1' is one cell."""
+    first, _, last = ref.strip().partition(":")
+    r1, c1 = parse_cell_ref(first)
+    r2, c2 = parse_cell_ref(last) if last else (r1, c1)
+    return min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2)
+
+
+@dataclass
+class SheetRef:
+    name: str
+    path: str  # member name inside the ZIP, e.g. "xl/worksheets/sheet1.xml"
+    state: str = "visible"  # visible | hidden | veryHidden
+
+
+@dataclass
+class TableRef:
+    name: str  # displayName, as used in formulas / ListObjects(name)
+    sheet: SheetRef
+    ref: str  # "A1:D10", header row included
+
+
+class XlsxPackage:
+    """A workbook package opened as a ZIP (context manager)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.zip = zipfile.ZipFile(self.path)
+        self._names = set(self.zip.namelist())
+
+    def __enter__(self) -> "XlsxPackage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.zip.close()
+
+    def has(self, member: str) -> bool:
+        return member in self._names
+
+    def open(self, member: str) -> IO[bytes]:
+        return self.zip.open(member)
+
+    def size(self, member: str) -> int:
+        """Uncompressed size of a member (0 if absent)."""
+        try:
+            return self.zip.getinfo(member).file_size
+        except KeyError:
+            return 0
+
+    def members(self, prefix: str) -> List[str]:
+        return sorted(n for n in self._names if n.startswith(prefix))
+
+    def _rels(self, part: str) -> dict:
+        """Relationship id -> target member for a part."""
+        folder, name = posixpath.split(part)
+        rels_path = posixpath.join(folder, "_rels", name + ".rels")
+        if not self.has(rels_path):
+            return {}
+        out = {}
+        with self.open(rels_path) as f:
+            for _, el in iterparse(f):
+                if el.tag == "{%s}Relationship" % NS_PKG_REL:
+                    target = el.get("Target", "")
+                    if el.get("TargetMode") != "External":
+                        target = posixpath.normpath(
+                            target.lstrip("/") if target.startswith("/") else posixpath.join(folder, target)
+                        )
+                    out[el.get("Id", "")] = target
+        return out
+
+    def sheets(self) -> List[SheetRef]:
+        """Worksheets in workbook order (chart sheets / macro sheets excluded)."""
+        rels = self._rels("xl/workbook.xml")
+        out: List[SheetRef] = []
+        with self.open("xl/workbook.xml") as f:
+            for _, el in iterparse(f):
+                if el.tag == _M + "sheet":
+                    target = rels.get(el.get("{%s}id" % NS_REL, ""), "")
+                    if target.startswith("xl/worksheets/") and self.has(target):
+                        out.append(SheetRef(el.get("name", ""), target, el.get("state", "visible")))
+        return out
+
+    def sheet(self, name: str) -> SheetRef:
+        for ref in self.sheets():
+            if ref.name == name:
+                return ref
+        raise KeyError(f"Sheet not found: {name}")
+
+    def defined_names(self) -> Dict[str, str]:
+        """Workbook-level defined names -> formula text ("Sheet1!$A$1:$D$10")."""
+        out: Dict[str, str] = {}
+        with self.open("xl/workbook.xml") as f:
+            for _, el in iterparse(f):
+                if el.tag == _M + "definedName" and el.get("localSheetId") is None:
+                    out[el.get("name", "")] = (el.text or "").strip()
+        return out
+
+    def tables(self) -> List[TableRef]:
+        """Tables (ListObjects) of every worksheet."""
+        out: List[TableRef] = []
+        for sheet in self.sheets():
+            for target in self._rels(sheet.path).values():
+                if not (target.startswith("xl/tables/") and self.has(target)):
+                    continue
+                with self.open(target) as f:
+                    for _, el in iterparse(f, events=("start",)):
+                        name = el.get("displayName") or el.get("name", "")
+                        out.append(TableRef(name, sheet, el.get("ref", "")))
+                        break
+        return out
+
+    def shared_strings_path(self) -> Optional[str]:
+        for target in self._rels("xl/workbook.xml").values():
+            if target.endswith("sharedStrings.xml") and self.has(target):
+                return target
+        return "xl/sharedStrings.xml" if self.has("xl/sharedStrings.xml") else None
+
+    def iter_shared_strings(self) -> Iterator[str]:
+        """Text of each shared string, in index order (rich text runs joined)."""
+        path = self.shared_strings_path()
+        if path is None:
+            return
+        root: Optional[Element] = None
+        with self.open(path) as f:
+            for event, el in iterparse(f, events=("start", "end")):
+                if event == "start":
+                    if root is None:
+                        root = el
+                elif el.tag == TAG_SI:
+                    # Phonetic runs (<rPh>) are not part of the cell text
+                    yield "".join(t.text or "" for r in el if r.tag != _M + "rPh" for t in r.iter(TAG_TEXT))
+                    el.clear()
+                    if len(root) and root[0] is el:
+                        del root[0]
+
+    def iter_sheet(self, sheet: SheetRef) -> Iterator[Element]:
+        """<dimension> and each <row> of a sheet (see iter_sheet_elements).
+
+        A row element is only valid until the next iteration.
+        """
+        with self.open(sheet.path) as f:
+            yield from iter_sheet_elements(f)
+
+
+def iter_sheet_elements(stream: IO[bytes]) -> Iterator[Element]:
+    """<dimension> then every <row> of a worksheet stream (flat memory).
+
+    Rows are removed from <sheetData> once consumed, so the tree never holds
+    more than one row.
+    """
+    sheet_data: Optional[Element] = None
+    for event, el in iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if el.tag == TAG_SHEET_DATA:
+                sheet_data = el
+            continue
+        if el.tag == TAG_ROW:
+            yield el
+            el.clear()
+            if sheet_data is not None and len(sheet_data) and sheet_data[0] is el:
+                del sheet_data[0]
+        elif el.tag == TAG_DIMENSION:
+            yield el
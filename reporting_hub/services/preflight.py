@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import difflib
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .vba_project import NoVbaProject, VbaModule, load_vba_modules
+
+
+# Checks that need neither Excel nor COM, run before launching an instance:
+# a typo in a path or macro name then fails in milliseconds, not after
+# Workbooks.Open.
+
+MACRO_EXTENSIONS = (".xlsm", ".xlsb", ".xltm", ".xlam", ".xls")
+NO_MACRO_EXTENSIONS = (".xlsx", ".xltx", ".csv")
+
+
+@dataclass
+class PreflightResult:
+    workbook_path: str
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    cached: bool = False  # VBA modules came from the fingerprint cache
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def summary(self) -> str:
+        lines = [f"Pre-flight error: {e}" for e in self.errors]
+        lines += [f"Pre-flight warning: {w}" for w in self.warnings]
+        return "\n".join(lines)
+
+
+def split_macro_name(name: str) -> Tuple[str, str, str]:
+    """"'Book.xlsm'!Module1.Proc" -> ("Book.xlsm", "Module1", "Proc")."""
+    book, _, rest = name.strip().rpartition("!")
+    module, _, proc = rest.rpartition(".")
+    return book.strip("'"), module, proc
+
+
+def _fingerprint(st: os.stat_result) -> Dict[str, object]:
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+class ModuleCache:
+    """VBA modules per workbook, valid while size and mtime are unchanged.
+
+    Kept in memory and in a small JSON file, so a second check of the same
+    file (same session or not) does not re-read the VBA project.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._items: Optional[Dict[str, dict]] = None
+
+    def _load(self) -> Dict[str, dict]:
+        if self._items is None:
+            self._items = {}
+            if self.path is not None:
+                try:
+                    data = json.loads(self.path.read_text(encoding="utf-8"))
+                    if isinstance(data, dict):
+                        self._items = data
+                except Exception:
+                    pass
+        return self._items
+
+    def get(self, key: str, fingerprint: Dict[str, object]) -> Optional[List[VbaModule]]:
+        with self._lock:
+            item = self._load().get(key)
+            if not item or item.get("fingerprint") != fingerprint:
+                return None
+            try:
+                return [VbaModule(**m) for m in item.get("modules", [])]
+            except TypeError:
+                return None
+
+    def put(self, key: str, fingerprint: Dict[str, object], modules: List[VbaModule]) -> None:
+        with self._lock:
+            items = self._load()
+            items[key] = {"fingerprint": fingerprint, "modules": [asdict(m) for m in modules]}
+            if self.path is None:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, self.path)
+            except OSError:
+                pass  # the in-memory copy still serves this session
+
+
+def _check_macro(
+    name: str, workbook_path: str, modules: List[VbaModule]
+) -> Tuple[Optional[str], Optional[str]]:
+    """(error, warning) for one macro name."""
+    book, module, proc = split_macro_name(name)
+    if not proc:
+        return "empty macro name.", None
+    if book and os.path.basename(book).lower() != os.path.basename(workbook_path).lower():
+        return None, None  # lives in another workbook (e.g. PERSONAL.XLSB): not checked
+
+    candidates = [m for m in modules if not module or m.name.lower() == module.lower()]
+    if module and not candidates:
+        names = [m.name for m in modules]
+        hint = difflib.get_close_matches(module, names, n=1)
+        msg = f"module '{module}' not found in the VBA project"
+        return msg + (f" (did you mean '{hint[0]}'?)" if hint else "."), None
+
+    for m in candidates:
+        found = [p for p in m.procedures + m.private if p.lower() == proc.lower()]
+        if not found:
+            continue
+        if m.document and not module:
+            # Application.Run only reaches sheet/ThisWorkbook/class code when qualified
+            return f"'{proc}' is in module '{m.name}': use '{m.name}.{proc}'.", None
+        if found[0] in m.private:
+            return None, f"'{proc}' is declared Private in module '{m.name}'."
+        return None, None
+
+    known = sorted({p for m in candidates for p in m.procedures + m.private})
+    hint = difflib.get_close_matches(proc, known, n=3)
+    where = f"module '{module}'" if module else "the VBA project"
+    msg = f"macro '{proc}' not found in {where}"
+    return msg + (f" (did you mean {', '.join(repr(h) for h in hint)}?)" if hint else "."), None
+
+
+def preflight(workbook_path: str, macros: List[str], cache: Optional[ModuleCache] = None) -> PreflightResult:
+    """Check the workbook file and that each macro exists in its VBA project.
+
+    A VBA project that cannot be parsed only yields a warning: Excel may
+    still run it, the check is skipped rather than blocking the run.
+    """
+    res = PreflightResult(workbook_path=workbook_path)
+    path = os.path.abspath(workbook_path.strip()) if workbook_path else ""
+    if not path:
+        res.errors.append("missing workbook path.")
+        return res
+    try:
+        st = os.stat(path)
+    except OSError:
+        res.errors.append(f"workbook not found: {path}")
+        return res
+    if not os.path.isfile(path):
+        res.errors.append(f"not a file: {path}")
+        return res
+    if st.st_size == 0:
+        res.errors.append(f"empty file: {path}")
+        return res
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext in NO_MACRO_EXTENSIONS:
+        res.errors.append(f"'{ext}' files cannot contain macros (save the workbook as .xlsm or .xlsb).")
+        return res
+    if ext not in MACRO_EXTENSIONS:
+        res.warnings.append(f"unexpected extension '{ext}': macros not checked.")
+        return res
+
+    macros = [m for m in macros if m and m.strip()]
+    if not macros:
+        return res
+
+    key = os.path.normcase(path)
+    fingerprint = _fingerprint(st)
+    modules = cache.get(key, fingerprint) if cache is not None else None
+    res.cached = modules is not None
+    if modules is None:
+        try:
+            modules = load_vba_modules(Path(path))
+        except NoVbaProject:
+            res.errors.append(f"{os.path.basename(path)} has no VBA project.")
+            return res
+        except Exception as e:  # VbaError, locked file, truncated ZIP...
+            res.warnings.append(f"VBA project not readable ({e}): macros not checked.")
+            return res
+        if cache is not None:
+            cache.put(key, fingerprint, modules)
+
+    for name in dict.fromkeys(macros):
+        error, warning = _check_macro(name, path, modules)
+        if error:
+            res.errors.append(error)
+        if warning:
+            res.warnings.append(warning)
+    return res
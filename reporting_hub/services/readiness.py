@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import glob
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import win32con
+    import win32event
+    import win32file
+except Exception:  # pragma: no cover
+    win32con = None
+    win32event = None
+    win32file = None
+
+from ..config.models import RequiredInput
+
+
+# Siblings telling that a file is open or still being written:
+# Office owner file, LibreOffice lock, browser / sync partial downloads.
+_LOCK_NAMES = ("~${name}", "~${name2}", ".~lock.{name}#")
+_TEMP_NAMES = ("{name}.tmp", "{name}.partial", "{name}.crdownload", "{name}.download")
+
+
+class InputsNotReady(RuntimeError):
+    """Required inputs still not ready when the wait timed out."""
+
+
+@dataclass
+class InputStatus:
+    spec: RequiredInput
+    ready: bool
+    reason: str = ""  # why not ready: missing, locked, being written, in use, changing
+    paths: List[str] = field(default_factory=list)
+    wait_s: float = 0.0  # > 0: ready in that many seconds if nothing changes
+
+    def line(self) -> str:
+        return f"{self.spec.path}: {'ready' if self.ready else self.reason}"
+
+
+def _blocking_sibling(path: str, names: Sequence[str]) -> str:
+    """Lock / temp file next to `path` ("" if none); `names` = lower-case folder listing."""
+    name = os.path.basename(path).lower()
+    values = {"name": name, "name2": name[2:]}
+    present = set(names)
+    for template in _LOCK_NAMES + _TEMP_NAMES:
+        candidate = template.format(**values)
+        if candidate in present:
+            return candidate
+    return ""
+
+
+def _readable(path: str) -> bool:
+    # Windows: fails while a writer holds the file without read sharing
+    try:
+        with open(path, "rb") as f:
+            f.read(1)
+        return True
+    except OSError:
+        return False
+
+
+class ChangeNotifier:
+    """Sleeps until something changes in the watched folders (or the timeout).
+
+    Uses win32 change notifications when available; elsewhere, and for
+    folders that do not exist yet, it only sleeps (stat polling).
+    """
+
+    def __init__(self, folders: Sequence[str]):
+        self._handles: List = []
+        self.unwatched = 0
+        for folder in sorted(set(folders)):
+            handle = None
+            if win32file is not None and os.path.isdir(folder):
+                try:
+                    handle = win32file.FindFirstChangeNotification(
+                        folder,
+                        False,
+                        win32con.FILE_NOTIFY_CHANGE_FILE_NAME
+                        | win32con.FILE_NOTIFY_CHANGE_SIZE
+                        | win32con.FILE_NOTIFY_CHANGE_LAST_WRITE,
+                    )
+                except Exception:
+                    handle = None
+            if handle is None:
+                self.unwatched += 1
+            else:
+                self._handles.append(handle)
+
+    @property
+    def complete(self) -> bool:
+        """Every folder is watched: a change always wakes the waiter up."""
+        return self.unwatched == 0 and bool(self._handles)
+
+    def wait(self, timeout_s: float, stop: Optional[threading.Event] = None) -> None:
+        if not self._handles:
+            if stop is not None:
+                stop.wait(timeout_s)
+            else:
+                time.sleep(timeout_s)
+            return
+        deadline = time.monotonic() + timeout_s
+        while True:
+            # The stop event cannot be waited on with the handles: short slices
+            slice_s = min(max(0.0, deadline - time.monotonic()), 1.0 if stop is not None else timeout_s)
+            rc = win32event.WaitForMultipleObjects(self._handles, False, int(slice_s * 1000))
+            index = rc - win32event.WAIT_OBJECT_0
+            if 0 <= index < len(self._handles):
+                win32file.FindNextChangeNotification(self._handles[index])
+                return
+            if (stop is not None and stop.is_set()) or time.monotonic() >= deadline:
+                return
+
+    def close(self) -> None:
+        for handle in self._handles:
+            try:
+                win32file.FindCloseChangeNotification(handle)
+            except Exception:
+                pass
+        self._handles = []
+
+
+class ReadinessGate:
+    """Waits until every RequiredInput is ready.
+
+    A file is ready when it exists, can be read, has no lock / temp sibling
+    (~$name, name.tmp, ...) and its size and modification time have not
+    changed for `stable_s`. A file already quiet for that long when first
+    seen counts as stable at once, so the common case costs one stat.
+    """
+
+    def __init__(
+        self,
+        specs: Sequence[RequiredInput],
+        base_dir: str,
+        poll_s: float = 2.0,
+        idle_s: float = 30.0,
+        own_locks: Sequence[str] = (),
+    ):
+        self.specs = list(specs)
+        self.base_dir = base_dir
+        # Files held open by our own Excel instance (attach mode): their lock is ours
+        self.own_locks = {os.path.normcase(os.path.abspath(p)) for p in own_locks}
+        self.poll_s = poll_s  # stat polling period
+        self.idle_s = idle_s  # longest sleep when change notifications cover every folder
+        # path -> ((size, mtime_ns), stable since (epoch seconds))
+        self._seen: Dict[str, Tuple[Tuple[int, int], float]] = {}
+
+    def _pattern(self, spec: RequiredInput) -> str:
+        return os.path.join(self.base_dir, os.path.expanduser(spec.path))
+
+    def folders(self) -> List[str]:
+        return [os.path.dirname(self._pattern(spec)) or "." for spec in self.specs]
+
+    def _stable_for(self, path: str, st: os.stat_result, now: float) -> float:
+        sig = (st.st_size, st.st_mtime_ns)
+        prev = self._seen.get(path)
+        if prev is None:
+            since = min(now, st.st_mtime)  # first sight: quiet since its last write
+        elif prev[0] != sig:
+            since = now
+        else:
+            since = prev[1]
+        self._seen[path] = (sig, since)
+        return now - since
+
+    def check(self) -> List[InputStatus]:
+        now = time.time()
+        listings: Dict[str, List[str]] = {}
+        out: List[InputStatus] = []
+        for spec in self.specs:
+            paths = sorted(p for p in glob.glob(self._pattern(spec)) if os.path.isfile(p))
+            status = InputStatus(spec=spec, ready=False, paths=paths)
+            out.append(status)
+            if not paths:
+                status.reason = "missing"
+                continue
+            for path in paths:
+                folder = os.path.dirname(path)
+                if folder not in listings:
+                    try:
+                        listings[folder] = [n.lower() for n in os.listdir(folder)]
+                    except OSError:
+                        listings[folder] = []
+                sibling = ""
+                if os.path.normcase(os.path.abspath(path)) not in self.own_locks:
+                    sibling = _blocking_sibling(path, listings[folder])
+                if sibling:
+                    kind = "locked" if sibling.startswith(("~$", ".~lock")) else "being written"
+                    status.reason = f"{kind} ({sibling})"
+                    break
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    status.reason = "missing"
+                    break
+                quiet = self._stable_for(path, st, now)
+                if quiet < spec.stable_s:
+                    status.reason = f"changing ({os.path.basename(path)})"
+                    status.wait_s = max(status.wait_s, spec.stable_s - quiet)
+                    break
+                if not _readable(path):
+                    status.reason = f"in use ({os.path.basename(path)})"
+                    break
+            else:
+                status.ready = True
+        return out
+
+    def wait(
+        self,
+        timeout_s: Optional[float],
+        stop: Optional[threading.Event] = None,
+        on_status: Optional[Callable[[List[InputStatus]], None]] = None,
+    ) -> bool:
+        """True once everything is ready; False on timeout (None = no limit) or stop."""
+        deadline = None if timeout_s is None else time.monotonic() + timeout_s
+        notifier = ChangeNotifier(self.folders())
+        last = None
+        try:
+            while True:
+                statuses = self.check()
+                if all(s.ready for s in statuses):
+                    return True
+                summary = format_status(statuses)
+                if on_status is not None and summary != last:
+                    on_status(statuses)
+                last = summary
+
+                now = time.monotonic()
+                if (deadline is not None and now >= deadline) or (stop is not None and stop.is_set()):
+                    return False
+                # Sleep until a file can become stable, a folder changes or the
+                # next poll; "in use" has no notification, it is polled.
+                nap = self.idle_s if notifier.complete else self.poll_s
+                if any(s.reason.startswith("in use") for s in statuses):
+                    nap = self.poll_s
+                pending = [s.wait_s for s in statuses if s.wait_s > 0]
+                if pending:
+                    nap = min(nap, min(pending) + 0.05)
+                if deadline is not None:
+                    nap = min(nap, deadline - now)
+                notifier.wait(max(0.05, nap), stop)
+        finally:
+            notifier.close()
+
+
+def format_status(statuses: Sequence[InputStatus]) -> str:
+    return "; ".join(s.line() for s in statuses if not s.ready) or "all inputs ready"
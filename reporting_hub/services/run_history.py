@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+
+def macro_key(workbook_path: str, macro_name: str) -> str:
+    return f"{os.path.normcase(os.path.abspath(workbook_path))}|{macro_name.strip()}"
+
+
+class MacroTimings:
+    """Last macro duration with and without an execution profile.
+
+    Stored as a small JSON file so the 'time saved' of a tuned run can be
+    reported against the last untuned run, across restarts.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def baseline(self, key: str) -> Optional[float]:
+        value = self._load().get(key, {}).get("baseline_s")
+        return float(value) if value else None
+
+    def record(self, key: str, seconds: float, tuned: bool) -> Optional[float]:
+        """Store a duration; returns the untuned baseline (if any)."""
+        data = self._load()
+        item = data.setdefault(key, {})
+        item["tuned_s" if tuned else "baseline_s"] = round(float(seconds), 3)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+        value = item.get("baseline_s")
+        return float(value) if value else None
+
+
+class RunHistory:
+    """One JSON line per run (append only): phases and per-step durations."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def read(self, limit: int = 20, profile: str = "") -> List[Dict[str, Any]]:
+        """Last `limit` runs (oldest first), optionally for one profile."""
+        out: Deque[Dict[str, Any]] = deque(maxlen=max(1, limit))
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line
+                    if not profile or rec.get("profile") == profile:
+                        out.append(rec)
+        except OSError:
+            pass
+        return list(out)
+
+
+def format_history(records: List[Dict[str, Any]]) -> str:
+    if not records:
+        return "No run recorded."
+    lines: List[str] = []
+    for rec in records:
+        status = "OK" if rec.get("ok") else "FAILED"
+        head = f"{rec.get('run_id', '?')}  {rec.get('profile') or '-'}  {status}  {rec.get('duration_s', 0.0):.1f}s"
+        if rec.get("resumed_at"):
+            head += f"  (resumed at step {rec['resumed_at']}, from run {rec.get('resumed_from', '?')})"
+        lines.append(head)
+        steps = rec.get("steps", [])
+        width = max((len(s.get("macro", "")) for s in steps), default=0)
+        for s in steps:
+            if s.get("skipped"):
+                detail = "skipped (checkpoint)"
+            else:
+                detail = f"{s.get('duration_s', 0.0):9.1f}s" + ("" if s.get("ok") else "  FAILED")
+            lines.append(f"  {s.get('index', 0) + 1:>2}. {s.get('macro', ''):<{width}}  {detail}")
+    return "\n".join(lines)
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import re
+import struct
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# Reads VBA module sources without Excel or oletools:
+# - [MS-CFB] compound file (vbaProject.bin, or a whole .xls),
+# - [MS-OVBA] "dir" stream and module stream decompression.
+
+_CFB_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+_END_OF_CHAIN = 0xFFFFFFFE
+_FREE = 0xFFFFFFFF
+_NO_STREAM = 0xFFFFFFFF
+
+_STREAM = 2
+_ROOT = 5
+
+
+class VbaError(RuntimeError):
+    """The file has no readable VBA project."""
+
+
+class NoVbaProject(VbaError):
+    """The workbook holds no VBA project at all."""
+
+
+@dataclass
+class _DirEntry:
+    name: str
+    kind: int
+    left: int
+    right: int
+    child: int
+    start: int
+    size: int
+
+
+class CompoundFile:
+    """Read-only [MS-CFB] container (version 3 and 4)."""
+
+    def __init__(self, data: bytes):
+        if len(data) < 512 or data[:8] != _CFB_MAGIC:
+            raise VbaError("Not a compound file.")
+        self.data = data
+        sector_shift, mini_shift = struct.unpack_from("<HH", data, 0x1E)
+        self.sector_size = 1 << sector_shift
+        self.mini_size = 1 << mini_shift
+        n_fat, first_dir, _, self.mini_cutoff = struct.unpack_from("<IIII", data, 0x2C)
+        first_minifat, n_minifat, first_difat, n_difat = struct.unpack_from("<IIII", data, 0x3C)
+
+        # FAT sector numbers: 109 in the header, the rest in DIFAT sectors
+        fat_sectors = [s for s in struct.unpack_from("<109I", data, 0x4C) if s != _FREE]
+        per_difat = self.sector_size // 4 - 1
+        sector, seen = first_difat, 0
+        while sector not in (_END_OF_CHAIN, _FREE) and seen < n_difat:
+            values = struct.unpack_from(f"<{per_difat + 1}I", self._sector(sector))
+            fat_sectors.extend(v for v in values[:per_difat] if v != _FREE)
+            sector = values[per_difat]
+            seen += 1
+        fat_sectors = fat_sectors[:n_fat]
+
+        fat_bytes = b"".join(self._sector(s) for s in fat_sectors)
+        self.fat = struct.unpack(f"<{len(fat_bytes) // 4}I", fat_bytes)
+
+        dir_bytes = self._read_chain(first_dir)
+        self.entries: List[_DirEntry] = []
+        for off in range(0, len(dir_bytes) - 127, 128):
+            name_len = struct.unpack_from("<H", dir_bytes, off + 0x40)[0]
+            kind = dir_bytes[off + 0x42]
+            left, right, child = struct.unpack_from("<III", dir_bytes, off + 0x44)
+            start, size = struct.unpack_from("<IQ", dir_bytes, off + 0x74)
+            if self.sector_size == 512:
+                size &= 0xFFFFFFFF  # v3: high dword may hold garbage
+            name = dir_bytes[off : off + max(0, name_len - 2)].decode("utf-16-le", errors="replace")
+            self.entries.append(_DirEntry(name, kind, left, right, child, start, size))
+        if not self.entries or self.entries[0].kind != _ROOT:
+            raise VbaError("Compound file without root entry.")
+
+        root = self.entries[0]
+        self._mini_stream = self._read_chain(root.start)[: root.size] if root.size else b""
+        minifat_bytes = self._read_chain(first_minifat) if n_minifat else b""
+        self.minifat = struct.unpack(f"<{len(minifat_bytes) // 4}I", minifat_bytes)
+
+    def _sector(self, n: int) -> bytes:
+        off = (n + 1) * self.sector_size
+        return self.data[off : off + self.sector_size]
+
+    def _chain(self, start: int, table, limit: int) -> List[int]:
+        out: List[int] = []
+        n = start
+        while n not in (_END_OF_CHAIN, _FREE) and n < len(table):
+            out.append(n)
+            if len(out) > limit:
+                raise VbaError("Corrupted sector chain (loop).")
+            n = table[n]
+        return out
+
+    def _read_chain(self, start: int) -> bytes:
+        limit = len(self.data) // self.sector_size + 1
+        return b"".join(self._sector(n) for n in self._chain(start, self.fat, limit))
+
+    def _children(self, index: int) -> Dict[str, int]:
+        """Entries of a storage (red-black tree walked iteratively)."""
+        out: Dict[str, int] = {}
+        stack = [self.entries[index].child]
+        while stack:
+            i = stack.pop()
+            if i == _NO_STREAM or i >= len(self.entries) or self.entries[i].name.upper() in out:
+                continue
+            e = self.entries[i]
+            out[e.name.upper()] = i
+            stack.extend((e.left, e.right))
+        return out
+
+    def find(self, path: str) -> Optional[int]:
+        """Entry index of 'Storage/Sub/Stream' (names are case-insensitive)."""
+        index = 0
+        for part in [p for p in path.split("/") if p]:
+            index = self._children(index).get(part.upper())
+            if index is None:
+                return None
+        return index
+
+    def exists(self, path: str) -> bool:
+        return self.find(path) is not None
+
+    def read(self, path: str) -> bytes:
+        index = self.find(path)
+        if index is None or self.entries[index].kind != _STREAM:
+            raise VbaError(f"Stream not found: {path}")
+        e = self.entries[index]
+        if e.size < self.mini_cutoff:
+            limit = len(self._mini_stream) // self.mini_size + 1
+            chunks = []
+            for n in self._chain(e.start, self.minifat, limit):
+                off = n * self.mini_size
+                chunks.append(self._mini_stream[off : off + self.mini_size])
+            return b"".join(chunks)[: e.size]
+        return self._read_chain(e.start)[: e.size]
+
+
+def decompress(data: bytes) -> bytes:
+    """[MS-OVBA] 2.4.1 decompression of a CompressedContainer."""
+    if not data or data[0] != 1:
+        raise VbaError("Invalid compressed container signature.")
+    out = bytearray()
+    pos, n = 1, len(data)
+    while pos + 2 <= n:
+        header = data[pos] | (data[pos + 1] << 8)
+        chunk_end = min(n, pos + (header & 0x0FFF) + 3)
+        pos += 2
+        if not header & 0x8000:
+            out += data[pos : pos + 4096]  # raw (uncompressed) chunk
+            pos += 4096
+            continue
+        chunk_start = len(out)
+        while pos < chunk_end:
+            flags = data[pos]
+            pos += 1
+            for bit in range(8):
+                if pos >= chunk_end:
+                    break
+                if not flags & (1 << bit):
+                    out.append(data[pos])
+                    pos += 1
+                    continue
+                token = data[pos] | (data[pos + 1] << 8)
+                pos += 2
+                bit_count = max((len(out) - chunk_start - 1).bit_length(), 4)
+                length = (token & (0xFFFF >> bit_count)) + 3
+                src = len(out) - ((token >> (16 - bit_count)) + 1)
+                if src < chunk_start:
+                    raise VbaError("Invalid copy token.")
+                if src + length <= len(out):
+                    out += out[src : src + length]
+                else:  # overlapping copy: repeats the last bytes
+                    for i in range(length):
+                        out.append(out[src + i])
+    return bytes(out)
+
+
+@dataclass
+class VbaModule:
+    name: str
+    stream: str
+    offset: int = 0
+    document: bool = False  # ThisWorkbook / sheet / class module
+    procedures: List[str] = field(default_factory=list)
+    private: List[str] = field(default_factory=list)
+
+
+_PROC = re.compile(
+    r"^[ \t]*(?:(Public|Private|Friend)[ \t]+)?(?:Static[ \t]+)?"
+    r"(?:Sub|Function|Property[ \t]+(?:Get|Let|Set))[ \t]+([A-Za-z_][A-Za-z0-9_]*)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def _parse_dir(d: bytes) -> Tuple[str, List[VbaModule]]:
+    """(codepage, modules) from a decompressed "dir" stream."""
+    codepage = "cp1252"
+    modules: List[VbaModule] = []
+    cur: Optional[VbaModule] = None
+    pos = 0
+    while pos + 6 <= len(d):
+        rid, size = struct.unpack_from("<HI", d, pos)
+        pos += 6
+        if rid == 0x0009:
+            size = 6  # PROJECTVERSION: declared size 4, 6 bytes follow
+        data = d[pos : pos + size]
+        pos += size
+        if rid == 0x0003 and len(data) >= 2:  # PROJECTCODEPAGE
+            codepage = f"cp{struct.unpack_from('<H', data)[0]}"
+            try:
+                "".encode(codepage)
+            except LookupError:
+                codepage = "cp1252"
+        elif rid == 0x0019:  # MODULENAME
+            cur = VbaModule(name=data.decode(codepage, errors="replace"), stream="")
+        elif cur is None:
+            continue
+        elif rid == 0x0047:  # MODULENAMEUNICODE
+            cur.name = data.decode("utf-16-le", errors="replace") or cur.name
+        elif rid == 0x001A:  # MODULESTREAMNAME
+            cur.stream = data.decode(codepage, errors="replace")
+        elif rid == 0x0032:  # MODULESTREAMNAME (unicode part)
+            cur.stream = data.decode("utf-16-le", errors="replace") or cur.stream
+        elif rid == 0x0031 and len(data) >= 4:  # MODULEOFFSET
+            cur.offset = struct.unpack_from("<I", data)[0]
+        elif rid == 0x0022:  # MODULETYPE: document / class
+            cur.document = True
+        elif rid == 0x002B:  # end of module
+            modules.append(cur)
+            cur = None
+    return codepage, modules
+
+
+def read_modules(cfb: CompoundFile, root: str = "") -> List[VbaModule]:
+    """Modules of the VBA storage under `root` with their procedure names."""
+    base = f"{root}/VBA" if root else "VBA"
+    codepage, modules = _parse_dir(decompress(cfb.read(f"{base}/dir")))
+    for m in modules:
+        try:
+            raw = cfb.read(f"{base}/{m.stream or m.name}")
+            source = decompress(raw[m.offset :]).decode(codepage, errors="replace")
+        except VbaError:
+            continue  # module stream missing / unreadable: no procedure known
+        for match in _PROC.finditer(source):
+            (m.private if (match.group(1) or "").lower() == "private" else m.procedures).append(match.group(2))
+    return modules
+
+
+def load_vba_modules(path: Path) -> List[VbaModule]:
+    """VBA modules of an .xlsm/.xlsb/.xltm/.xlam (ZIP) or .xls (compound file)."""
+    path = Path(path)
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as z:
+            names = [n for n in z.namelist() if n.lower().endswith("vbaproject.bin")]
+            if not names:
+                raise NoVbaProject("No VBA project in this workbook.")
+            return read_modules(CompoundFile(z.read(names[0])))
+    cfb = CompoundFile(path.read_bytes())
+    if not cfb.exists("_VBA_PROJECT_CUR/VBA/dir"):
+        raise NoVbaProject("No VBA project in this workbook.")
+    return read_modules(cfb, "_VBA_PROJECT_CUR")
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .ooxml import (
+    TAG_CELL,
+    TAG_DIMENSION,
+    TAG_FORMULA,
+    TAG_ROW,
+    TAG_VALUE,
+    SheetRef,
+    XlsxPackage,
+    col_index,
+    parse_range_ref,
+)
+
+
+# Functions that recalculate on every calculation, whatever changed
+VOLATILE_FUNCTIONS = ("OFFSET", "INDIRECT", "NOW", "TODAY", "RAND", "RANDBETWEEN", "CELL", "INFO")
+
+_VOLATILE = re.compile(r"(?<![A-Za-z0-9_.])(" + "|".join(VOLATILE_FUNCTIONS) + r")\s*\(", re.IGNORECASE)
+_STRING_LITERAL = re.compile(r'"(?:[^"]|"")*"')
+# A:A, $B:$D, Sheet1!A:C  /  1:1, $3:$10 (whole rows)
+_WHOLE_COLUMN = re.compile(r"(?<![A-Za-z0-9_$.\]])\$?[A-Z]{1,3}:\$?[A-Z]{1,3}(?![A-Za-z0-9_(])")
+_WHOLE_ROW = re.compile(r"(?<![A-Za-z0-9_$.:\]])\$?\d+:\$?\d+(?![0-9:])")
+_EXTERNAL = re.compile(r"\[\d+\]")
+_DIGITS = "0123456789$"
+
+# Declared used range counted as bloated when it exceeds the real extent
+# by this factor and by at least this many cells.
+BLOAT_FACTOR = 2.0
+BLOAT_MIN_CELLS = 100_000
+
+
+@dataclass
+class FormulaStats:
+    formulas: int = 0
+    volatile: Dict[str, int] = field(default_factory=dict)  # function -> cells
+    whole_column_refs: int = 0  # cells with an A:A / 1:1 style reference
+    external_refs: int = 0  # cells referencing another workbook ([n]Sheet!A1)
+
+    def add(self, other: "FormulaStats", times: int = 1) -> None:
+        self.formulas += other.formulas * times
+        for k, v in other.volatile.items():
+            self.volatile[k] = self.volatile.get(k, 0) + v * times
+        self.whole_column_refs += other.whole_column_refs * times
+        self.external_refs += other.external_refs * times
+
+
+def scan_formula(text: str) -> FormulaStats:
+    """Stats of one formula (string literals are ignored)."""
+    body = _STRING_LITERAL.sub('""', text)
+    st = FormulaStats(formulas=1)
+    for name in {m.group(1).upper() for m in _VOLATILE.finditer(body)}:
+        st.volatile[name] = 1
+    if _WHOLE_COLUMN.search(body) or _WHOLE_ROW.search(body):
+        st.whole_column_refs = 1
+    if _EXTERNAL.search(body):
+        st.external_refs = 1
+    return st
+
+
+@dataclass
+class SheetReport:
+    name: str
+    xml_bytes: int
+    declared_range: str = ""  # <dimension ref>
+    last_row: int = 0  # extent of cells holding a value or a formula
+    last_col: int = 0
+    cells: int = 0  # <c> elements (styled empty cells included)
+    value_cells: int = 0
+    shared_string_cells: int = 0
+    formulas: FormulaStats = field(default_factory=FormulaStats)
+
+    @property
+    def declared_cells(self) -> int:
+        if not self.declared_range:
+            return 0
+        try:
+            r1, c1, r2, c2 = parse_range_ref(self.declared_range)
+        except ValueError:
+            return 0
+        return (r2 - r1 + 1) * (c2 - c1 + 1)
+
+    @property
+    def used_cells(self) -> int:
+        return self.last_row * self.last_col
+
+    @property
+    def bloated(self) -> bool:
+        declared = self.declared_cells
+        return declared > self.used_cells * BLOAT_FACTOR and declared - self.used_cells >= BLOAT_MIN_CELLS
+
+
+@dataclass
+class WorkbookReport:
+    path: str
+    file_bytes: int
+    sheets: List[SheetReport] = field(default_factory=list)
+    external_links: int = 0  # xl/externalLinks parts
+    shared_strings: int = 0
+    shared_strings_bytes: int = 0
+    parse_s: float = 0.0
+
+    @property
+    def xml_bytes(self) -> int:
+        return sum(s.xml_bytes for s in self.sheets) + self.shared_strings_bytes
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        for item, sheet in zip(data["sheets"], self.sheets):
+            item.update(
+                declared_cells=sheet.declared_cells,
+                used_cells=sheet.used_cells,
+                bloated=sheet.bloated,
+            )
+        data["xml_bytes"] = self.xml_bytes
+        data["mb_per_s"] = self.throughput_mb_s()
+        return json.dumps(data, indent=2, ensure_ascii=False)
+
+    def throughput_mb_s(self) -> float:
+        return (self.xml_bytes / 1e6 / self.parse_s) if self.parse_s else 0.0
+
+    def to_text(self) -> str:
+        mb = 1024 * 1024
+        lines = [
+            f"Workbook: {os.path.basename(self.path)} ({self.file_bytes / mb:.1f} MB, "
+            f"{self.xml_bytes / mb:.1f} MB of XML parsed in {self.parse_s:.2f}s, "
+            f"{self.throughput_mb_s():.0f} MB/s)",
+            f"External links: {self.external_links}  "
+            f"Shared strings: {self.shared_strings:,} ({self.shared_strings_bytes / mb:.1f} MB)",
+        ]
+        for s in sorted(self.sheets, key=lambda s: s.formulas.formulas, reverse=True):
+            f = s.formulas
+            lines.append(f"- {s.name}: {f.formulas:,} formulas, {s.value_cells:,} values, {s.xml_bytes / mb:.1f} MB XML")
+            volatile = ", ".join(f"{k} x{v:,}" for k, v in sorted(f.volatile.items(), key=lambda kv: -kv[1]))
+            if volatile:
+                lines.append(f"    volatile: {volatile}")
+            if f.whole_column_refs:
+                lines.append(f"    whole-column/row references: {f.whole_column_refs:,} cells")
+            if f.external_refs:
+                lines.append(f"    external references: {f.external_refs:,} cells")
+            if s.shared_string_cells:
+                lines.append(f"    shared-string cells: {s.shared_string_cells:,}")
+            if s.bloated:
+                lines.append(
+                    f"    bloated used range: {s.declared_range} ({s.declared_cells:,} cells) "
+                    f"vs data up to row {s.last_row:,}, column {s.last_col:,}"
+                )
+        return "\n".join(lines)
+
+
+def _analyze_sheet(pkg: XlsxPackage, sheet: SheetRef) -> SheetReport:
+    rep = SheetReport(name=sheet.name, xml_bytes=pkg.size(sheet.path))
+    # Shared formulas: only the master cell holds the text; the others
+    # carry its si index and are charged the master's stats.
+    shared: Dict[str, FormulaStats] = {}
+    cols: Dict[str, int] = {}  # "AZ" -> 52
+    last_row = last_col = 0
+    row_no = 0
+
+    for el in pkg.iter_sheet(sheet):
+        if el.tag == TAG_DIMENSION:
+            rep.declared_range = el.get("ref", "")
+            continue
+        if el.tag != TAG_ROW:
+            continue
+        row_no = int(el.get("r") or row_no + 1)
+        col_no = 0
+        for c in el:
+            if c.tag != TAG_CELL:
+                continue
+            rep.cells += 1
+            ref = c.get("r")
+            if ref:
+                letters = ref.rstrip(_DIGITS)
+                col_no = cols.get(letters) or cols.setdefault(letters, col_index(letters))
+            else:
+                col_no += 1
+
+            f_el = None
+            has_value = False
+            for child in c:
+                if child.tag == TAG_VALUE:
+                    has_value = True
+                elif child.tag == TAG_FORMULA:
+                    f_el = child
+            kind = c.get("t")
+            if kind == "inlineStr":
+                has_value = True
+            if f_el is None and not has_value:
+                continue  # style-only cell: counts in Excel's UsedRange only
+
+            if has_value:
+                rep.value_cells += 1
+                if kind == "s":
+                    rep.shared_string_cells += 1
+            if f_el is not None:
+                text = f_el.text or ""
+                si = f_el.get("si")
+                if text:
+                    st = scan_formula(text)
+                    if f_el.get("t") == "shared" and si is not None:
+                        shared[si] = st
+                else:
+                    st = shared.get(si or "", FormulaStats(formulas=1))
+                rep.formulas.add(st)
+            last_row = max(last_row, row_no)
+            last_col = max(last_col, col_no)
+
+    rep.last_row, rep.last_col = last_row, last_col
+    return rep
+
+
+def analyze_workbook(path: Path) -> WorkbookReport:
+    """Static analysis of an .xlsx/.xlsm; Excel is not needed."""
+    path = Path(path)
+    t0 = time.perf_counter()
+    report = WorkbookReport(path=str(path.resolve()), file_bytes=path.stat().st_size)
+    with XlsxPackage(path) as pkg:
+        report.external_links = len([m for m in pkg.members("xl/externalLinks/") if m.endswith(".xml")])
+        ss = pkg.shared_strings_path()
+        if ss:
+            report.shared_strings_bytes = pkg.size(ss)
+            report.shared_strings = sum(1 for _ in pkg.iter_shared_strings())
+        for sheet in pkg.sheets():
+            report.sheets.append(_analyze_sheet(pkg, sheet))
+    report.parse_s = time.perf_counter() - t0
+    return report
+
+
+def benchmark(path: Path, repeat: int = 3) -> Dict[str, float]:
+    """Best-of-N parse time of analyze_workbook (throughput on sheet XML)."""
+    best: Optional[WorkbookReport] = None
+    for _ in range(max(1, repeat)):
+        rep = analyze_workbook(path)
+        if best is None or rep.parse_s < best.parse_s:
+            best = rep
+    cells = sum(s.cells for s in best.sheets)
+    return {
+        "best_s": best.parse_s,
+        "xml_mb": best.xml_bytes / 1e6,
+        "mb_per_s": best.throughput_mb_s(),
+        "cells_per_s": cells / best.parse_s if best.parse_s else 0.0,
+    }
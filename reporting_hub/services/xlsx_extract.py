@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .extract import Rows, write_table
+from .ooxml import (
+    TAG_CELL,
+    TAG_DIMENSION,
+    TAG_INLINE,
+    TAG_ROW,
+    TAG_TEXT,
+    TAG_VALUE,
+    SheetRef,
+    XlsxPackage,
+    col_index,
+    parse_range_ref,
+)
+
+
+# Reads the values a pilot saved, straight from the .xlsx/.xlsm package.
+# Values follow Range.Value2: numbers (dates included) as float, text,
+# bool, None for blanks and error cells (#N/A, ...: null, as in extract.write_table).
+
+_WHOLE_COLUMNS = re.compile(r"^\$?([A-Za-z]{1,3}):\$?([A-Za-z]{1,3})$")
+_WHOLE_ROWS = re.compile(r"^\$?(\d+):\$?(\d+)$")
+_DIGITS = "0123456789$"
+
+
+@dataclass
+class Bounds:
+    """1-based inclusive area; None = open (up to the last cell with data)."""
+
+    first_row: int = 1
+    first_col: int = 1
+    last_row: Optional[int] = None
+    last_col: Optional[int] = None
+
+
+def parse_bounds(addr: str) -> Bounds:
+    """'A1:D10', 'B5', 'A:D' (whole columns) or '3:10' (whole rows)."""
+    addr = addr.strip()
+    m = _WHOLE_COLUMNS.match(addr)
+    if m:
+        c1, c2 = sorted((col_index(m.group(1)), col_index(m.group(2))))
+        return Bounds(1, c1, None, c2)
+    m = _WHOLE_ROWS.match(addr)
+    if m:
+        r1, r2 = sorted((int(m.group(1)), int(m.group(2))))
+        return Bounds(r1, 1, r2, None)
+    r1, c1, r2, c2 = parse_range_ref(addr)
+    return Bounds(r1, c1, r2, c2)
+
+
+def _split_ref(ref: str) -> Tuple[str, str]:
+    sheet, _, addr = ref.strip().lstrip("=").rpartition("!")
+    return sheet.strip("'").replace("''", "'"), addr
+
+
+def resolve_source(pkg: XlsxPackage, source: str) -> Tuple[SheetRef, Optional[Bounds]]:
+    """Sheet and area of 'Sheet!A1:D10', a sheet name, a defined name or a table.
+
+    A bare sheet name gives no bounds: the sheet's used range is read.
+    """
+    source = (source or "").strip()
+    if "!" in source:
+        sheet, addr = _split_ref(source)
+        try:
+            return pkg.sheet(sheet), parse_bounds(addr)
+        except KeyError:
+            raise ValueError(f"Sheet not found: {sheet}") from None
+
+    sheets = {s.name: s for s in pkg.sheets()}
+    if source in sheets:
+        return sheets[source], None
+
+    names = {k.lower(): v for k, v in pkg.defined_names().items()}
+    formula = names.get(source.lower())
+    if formula is not None:
+        sheet, addr = _split_ref(formula)
+        if not sheet or sheet not in sheets or "," in addr:
+            raise ValueError(f"Defined name {source} is not a single range: {formula}")
+        return sheets[sheet], parse_bounds(addr)
+
+    for table in pkg.tables():
+        if table.name.lower() == source.lower() and table.ref:
+            return table.sheet, parse_bounds(table.ref)
+    raise ValueError(f"Range not found: {source}")
+
+
+def _cell_value(c, kind: Optional[str], shared: List[str]) -> object:
+    if kind == "inlineStr":
+        inline = c.find(TAG_INLINE)
+        return "".join(t.text or "" for t in inline.iter(TAG_TEXT)) if inline is not None else ""
+    v = c.find(TAG_VALUE)
+    if v is None or v.text is None:
+        return None
+    text = v.text
+    if kind is None or kind == "n":
+        try:
+            return float(text)
+        except ValueError:
+            return text
+    if kind == "s":
+        return shared[int(text)]
+    if kind == "b":
+        return text == "1"
+    if kind == "e":
+        return None
+    return text  # "str" (formula text result), "d" (ISO date)
+
+
+def iter_sheet_rows(pkg: XlsxPackage, sheet: SheetRef, bounds: Optional[Bounds] = None) -> Iterator[list]:
+    """Value rows of an area, top to bottom, with flat memory.
+
+    Missing rows inside the area come back as blank rows; rows after the
+    last one holding a cell are not produced (unlike Value2 on a larger
+    range). With an open last column, rows are as long as their data.
+    """
+    shared: Optional[List[str]] = None
+    cols: Dict[str, int] = {}  # "AZ" -> 52
+    next_row = None  # next row number to produce
+    b = bounds
+
+    for el in pkg.iter_sheet(sheet):
+        if el.tag == TAG_DIMENSION:
+            if b is None:
+                # Same area as Excel's UsedRange (ignored when only "A1")
+                ref = el.get("ref", "")
+                b = parse_bounds(ref) if ":" in ref else Bounds()
+            continue
+        if el.tag != TAG_ROW:
+            continue
+        if b is None:
+            b = Bounds()
+        if next_row is None:
+            next_row = b.first_row
+
+        row_no = int(el.get("r") or next_row)
+        if row_no < b.first_row:
+            continue
+        if b.last_row is not None and row_no > b.last_row:
+            break
+
+        width = b.last_col - b.first_col + 1 if b.last_col is not None else 0
+        while next_row < row_no:
+            yield [None] * width
+            next_row += 1
+
+        values: list = [None] * width
+        col_no = b.first_col - 1
+        for c in el:
+            if c.tag != TAG_CELL:
+                continue
+            ref = c.get("r")
+            if ref:
+                letters = ref.rstrip(_DIGITS)
+                col_no = cols.get(letters) or cols.setdefault(letters, col_index(letters))
+            else:
+                col_no += 1
+            i = col_no - b.first_col
+            if i < 0 or (b.last_col is not None and col_no > b.last_col):
+                continue
+            kind = c.get("t")
+            if kind == "s" and shared is None:
+                shared = list(pkg.iter_shared_strings())
+            value = _cell_value(c, kind, shared or [])
+            if value is None:
+                continue
+            if i >= len(values):
+                values.extend([None] * (i + 1 - len(values)))
+            values[i] = value
+        yield values
+        next_row = row_no + 1
+
+
+def iter_values(path: Path, source: str, chunk_rows: int = 50_000) -> Iterator[Rows]:
+    """Row blocks of `chunk_rows` rows read from a saved workbook."""
+    chunk_rows = max(1, int(chunk_rows))
+    with XlsxPackage(Path(path)) as pkg:
+        sheet, bounds = resolve_source(pkg, source)
+        block: list = []
+        for row in iter_sheet_rows(pkg, sheet, bounds):
+            block.append(row)
+            if len(block) >= chunk_rows:
+                yield block
+                block = []
+        if block:
+            yield block
+
+
+def extract_file(path: Path, source: str, output: Path, header: bool = True, chunk_rows: int = 50_000) -> int:
+    """Write one area of a saved workbook to CSV/Parquet; returns data rows."""
+    return write_table(iter_values(path, source, chunk_rows), output, header=header)
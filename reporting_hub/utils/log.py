@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import atexit
+import contextvars
+import logging
+import logging.handlers
+import queue
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+ROOT_LOGGER = "reporting_hub"
+
+# Context attached to every record by the producing thread
+_run_id: contextvars.ContextVar[str] = contextvars.ContextVar("run_id", default="")
+_profile: contextvars.ContextVar[str] = contextvars.ContextVar("profile", default="")
+_phase: contextvars.ContextVar[str] = contextvars.ContextVar("phase", default="")
+
+GuiSink = Callable[[logging.LogRecord], None]
+
+
+@contextmanager
+def log_context(run_id: str = "", profile: str = "") -> Iterator[None]:
+    """Tag records logged by the current thread with a run id / profile."""
+    t1 = _run_id.set(run_id)
+    t2 = _profile.set(profile)
+    try:
+        yield
+    finally:
+        _run_id.reset(t1)
+        _profile.reset(t2)
+
+
+@contextmanager
+def log_phase(name: str) -> Iterator[None]:
+    token = _phase.set(name)
+    try:
+        yield
+    finally:
+        _phase.reset(token)
+
+
+def current_log_context() -> Dict[str, str]:
+    return {"run_id": _run_id.get(), "profile": _profile.get(), "phase": _phase.get()}
+
+
+def get_logger(name: str = "") -> logging.Logger:
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}" if name else ROOT_LOGGER)
+
+
+class _ContextFilter(logging.Filter):
+    """Copies the context onto the record in the producer thread.
+
+    Explicit `extra={"run_id": ...}` values win over the context.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in current_log_context().items():
+            if not getattr(record, key, None):
+                setattr(record, key, value)
+        return True
+
+
+class _EnqueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Keep the record structured (level, context, raw message) instead of
+        # the stdlib default of pre-formatting it into msg.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class ConsoleFormatter(logging.Formatter):
+    """08:00:01 INFO  [ab12cd monthly/run] message (context only when set)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        ts = datetime.fromtimestamp(record.created).strftime("%H:%M:%S")
+        run_id = getattr(record, "run_id", "")
+        tags = ""
+        if run_id:
+            where = "/".join(p for p in (getattr(record, "profile", ""), getattr(record, "phase", "")) if p)
+            tags = f"[{run_id}{' ' + where if where else ''}] "
+        text = f"{ts} {record.levelname:<5} {tags}{record.getMessage()}"
+        if record.exc_text:
+            text += "\n" + record.exc_text
+        return text
+
+
+class _GuiHandler(logging.Handler):
+    def __init__(self, sink: GuiSink):
+        super().__init__()
+        self.sink = sink
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.sink(record)
+        except Exception:
+            pass
+
+
+class LogPipeline:
+    """Producers enqueue records; one listener thread fans them out.
+
+    `logger.info(...)` from any thread only appends to an unbounded queue,
+    so neither the Excel worker nor the Tk thread waits on file or console
+    I/O.
+    """
+
+    def __init__(self, handlers: List[logging.Handler]):
+        self.queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self.handler = _EnqueueHandler(self.queue)
+        self.handler.addFilter(_ContextFilter())
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self._gui: Optional[_GuiHandler] = None
+        self._started = False
+
+    def start(self) -> None:
+        root = get_logger()
+        root.setLevel(logging.INFO)
+        root.propagate = False
+        root.addHandler(self.handler)
+        self.listener.start()
+        self._started = True
+
+    def set_gui_sink(self, sink: Optional[GuiSink]) -> None:
+        """The sink runs on the listener thread: it must hand over to Tk itself."""
+        handlers = [h for h in self.listener.handlers if h is not self._gui]
+        self._gui = _GuiHandler(sink) if sink is not None else None
+        if self._gui is not None:
+            handlers.append(self._gui)
+        self.listener.handlers = tuple(handlers)
+
+    def stop(self) -> None:
+        """Flushes pending records and closes the handlers."""
+        get_logger().removeHandler(self.handler)
+        if self._started:
+            self.listener.stop()
+            self._started = False
+        for h in self.listener.handlers:
+            try:
+                h.close()
+            except Exception:
+                pass
+
+
+_pipeline: Optional[LogPipeline] = None
+
+
+def setup_logging(console: bool = False, gui: Optional[GuiSink] = None, file: bool = True) -> LogPipeline:
+    """Start the logging pipeline once per process (later calls reuse it)."""
+    global _pipeline
+    if _pipeline is None:
+        handlers: List[logging.Handler] = []
+        if file:
+            from ..services.log_archive import file_handler
+
+            try:
+                handlers.append(file_handler())
+            except Exception:
+                pass  # read-only folder: console / GUI still work
+        if console:
+            h = logging.StreamHandler(sys.stdout)
+            h.setFormatter(ConsoleFormatter())
+            handlers.append(h)
+        _pipeline = LogPipeline(handlers)
+        _pipeline.start()
+        atexit.register(shutdown_logging)
+    if gui is not None:
+        _pipeline.set_gui_sink(gui)
+    return _pipeline
+
+
+def shutdown_logging() -> None:
+    global _pipeline
+    if _pipeline is not None:
+        _pipeline.stop()
+        _pipeline = None
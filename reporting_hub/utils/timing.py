@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .log import log_phase
+
+_IMPORT_T0 = time.perf_counter()
+
+
+def process_uptime() -> float:
+    """Seconds since the OS created this process (best effort).
+
+    Falls back to the time since this module was imported.
+    """
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            created, exited, kernel, user = (wintypes.FILETIME() for _ in range(4))
+            k32 = ctypes.windll.kernel32
+            if k32.GetProcessTimes(
+                k32.GetCurrentProcess(),
+                ctypes.byref(created),
+                ctypes.byref(exited),
+                ctypes.byref(kernel),
+                ctypes.byref(user),
+            ):
+                ticks = (created.dwHighDateTime << 32) | created.dwLowDateTime  # 100ns since 1601
+                return time.time() - (ticks / 1e7 - 11644473600.0)
+        else:
+            with open("/proc/self/stat", "r") as f:
+                # Fields after the "(comm)" part; starttime is field 22 overall
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open("/proc/uptime", "r") as f:
+                uptime = float(f.read().split()[0])
+            return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except Exception:
+        pass
+    return time.perf_counter() - _IMPORT_T0
+
+
+@dataclass
+class PhaseEvent:
+    phase: str
+    started_at: float  # epoch seconds
+    duration_s: float
+    ok: bool = True
+
+
+@dataclass
+class RunTimer:
+    """Collects per-phase durations of one run.
+
+    Cost per phase is two perf_counter() calls and a list append, so it can
+    stay on for every run.
+    """
+
+    run_id: str = ""
+    profile: str = ""
+    events: List[PhaseEvent] = field(default_factory=list)
+    # Called with the name of each phase as it starts (run lease status)
+    on_phase: Optional[Callable[[str], None]] = field(default=None, repr=False, compare=False)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if self.on_phase is not None:
+            self.on_phase(name)
+        started_at = time.time()
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            with log_phase(name):
+                yield
+            ok = True
+        finally:
+            self.events.append(PhaseEvent(name, started_at, time.perf_counter() - t0, ok))
+
+    def totals(self) -> Dict[str, float]:
+        """Seconds per phase (phases repeated in a run are summed)."""
+        out: Dict[str, float] = {}
+        for e in self.events:
+            out[e.phase] = out.get(e.phase, 0.0) + e.duration_s
+        return out
+
+    def summary(self) -> str:
+        totals = self.totals()
+        if not totals:
+            return "No timing recorded."
+        width = max(len(k) for k in totals)
+        grand = sum(totals.values())
+        lines = [f"Timing (run {self.run_id})" if self.run_id else "Timing"]
+        for k, v in totals.items():
+            pct = (v / grand * 100.0) if grand else 0.0
+            lines.append(f"  {k:<{width}}  {v:9.3f}s  {pct:5.1f}%")
+        lines.append(f"  {'total':<{width}}  {grand:9.3f}s")
+        return "\n".join(lines)
+
+    def one_line(self) -> str:
+        return "Timing: " + ", ".join(f"{k}={v:.2f}s" for k, v in self.totals().items())
+
+    # ------------------------------
+    # Exports
+    # ------------------------------
+    def to_json_lines(self) -> str:
+        rows = []
+        for e in self.events:
+            row = {"run_id": self.run_id, "profile": self.profile}
+            row.update(asdict(e))
+            rows.append(json.dumps(row, ensure_ascii=False))
+        return "\n".join(rows) + ("\n" if rows else "")
+
+    def to_prometheus(self) -> str:
+        """Text exposition format (node_exporter textfile collector).
+
+        run_id is left out of the labels to keep series cardinality bounded.
+        """
+
+        def esc(v: str) -> str:
+            return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        labels = f'profile="{esc(self.profile)}"'
+        lines = [
+            "# HELP reporting_hub_phase_seconds Duration of each run phase.",
+            "# TYPE reporting_hub_phase_seconds gauge",
+        ]
+        for k, v in self.totals().items():
+            lines.append(f'reporting_hub_phase_seconds{{phase="{esc(k)}",{labels}}} {v:.6f}')
+        lines += [
+            "# HELP reporting_hub_run_ok Whether every phase of the last run succeeded.",
+            "# TYPE reporting_hub_run_ok gauge",
+            f"reporting_hub_run_ok{{{labels}}} {int(all(e.ok for e in self.events))}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """Write metrics to `path`.
+
+        - *.prom / *.txt: Prometheus text file (replaced atomically)
+        - anything else: JSON lines (appended, one event per line)
+        """
+        path = Path(path)
+        if path.parent and not path.parent.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix.lower() in (".prom", ".txt"):
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(self.to_prometheus(), encoding="utf-8")
+            os.replace(tmp, path)
+        else:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(self.to_json_lines())
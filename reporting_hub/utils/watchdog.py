@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+class MainThreadWatchdog:
+    """Detects Tk mainloop stalls (opt-in diagnostics).
+
+    A heartbeat is scheduled with `root.after`; a background thread checks
+    its age. When the mainloop has not ticked for more than `threshold_s`,
+    the main thread's stack is captured with `sys._current_frames` and
+    appended to `log_path` (once per stall, plus its final duration).
+    """
+
+    def __init__(self, root, log_path: Path, threshold_s: float = 1.0, heartbeat_ms: int = 100):
+        self._root = root
+        self.log_path = Path(log_path)
+        self.threshold_s = max(0.1, float(threshold_s))
+        self._heartbeat_ms = max(10, int(heartbeat_ms))
+
+        self._last_beat = time.monotonic()
+        self._main_ident: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._after_id = None
+
+        self._stall_started: Optional[float] = None
+
+    def start(self) -> None:
+        """Must be called from the Tk thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._main_ident = threading.get_ident()
+        self._stop.clear()
+        self._beat()
+        self._thread = threading.Thread(target=self._run, name="TkWatchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        try:
+            if self._after_id is not None:
+                self._root.after_cancel(self._after_id)
+        except Exception:
+            pass
+        self._after_id = None
+
+    # ------------------------------
+    # Internal
+    # ------------------------------
+    def _beat(self) -> None:
+        self._last_beat = time.monotonic()
+        if self._stop.is_set():
+            return
+        try:
+            self._after_id = self._root.after(self._heartbeat_ms, self._beat)
+        except Exception:
+            # Root destroyed
+            self._stop.set()
+
+    def _run(self) -> None:
+        check_s = min(self.threshold_s / 4.0, 0.25)
+        while not self._stop.wait(check_s):
+            lag = time.monotonic() - self._last_beat
+            if lag > self.threshold_s:
+                if self._stall_started is None:
+                    self._stall_started = self._last_beat
+                    self._write(f"UI stall > {self.threshold_s:.2f}s\n{self._main_stack()}")
+            elif self._stall_started is not None:
+                # Heartbeat came back: record how long the stall lasted
+                duration = self._last_beat - self._stall_started
+                self._stall_started = None
+                self._write(f"UI stall ended after ~{duration:.2f}s\n")
+
+    def _main_stack(self) -> str:
+        frame = sys._current_frames().get(self._main_ident or -1)
+        if frame is None:
+            return "(main thread stack unavailable)\n"
+        return "".join(traceback.format_stack(frame))
+
+    def _write(self, text: str) -> None:
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(f"[{ts}] {text}\n")
+        except Exception:
+            pass
@@ -0,0 +1,97 @@
+import pytest
+
+from reporting_hub.services.artifacts import ArtifactStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(tmp_path / "artifacts")
+
+
+def _outputs(folder, **files):
+    folder.mkdir(exist_ok=True)
+    paths = []
+    for name, content in files.items():
+        path = folder / name.replace("_", ".")
+        path.write_bytes(content)
+        paths.append(path)
+    return paths
+
+
+def test_identical_content_is_stored_once(store, tmp_path):
+    m = store.record_run("r1", _outputs(tmp_path / "out", a_csv=b"same", b_csv=b"same"))
+
+    assert m.entries["a.csv"].digest == m.entries["b.csv"].digest
+    assert len(list(store.objects_dir.glob("*/*"))) == 1
+    assert (store.runs_dir / "r1" / "b.csv").read_bytes() == b"same"
+
+
+def test_changed_lists_only_files_that_differ_from_the_previous_run(store, tmp_path):
+    out = tmp_path / "out"
+    first = store.record_run("r1", _outputs(out, a_csv=b"1", b_csv=b"1"), profile="monthly")
+    assert first.changed == ["a.csv", "b.csv"]
+
+    second = store.record_run("r2", _outputs(out, a_csv=b"1", b_csv=b"2", c_csv=b"new"), profile="monthly")
+    assert second.changed == ["b.csv", "c.csv"]
+    assert store.attachments_to_send("monthly") == [
+        store.runs_dir / "r2" / "b.csv",
+        store.runs_dir / "r2" / "c.csv",
+    ]
+
+
+def test_changed_survives_a_reload_and_ignores_other_profiles(store, tmp_path):
+    out = tmp_path / "out"
+    store.record_run("r1", _outputs(out, a_csv=b"1"), profile="monthly")
+    store.record_run("w1", _outputs(out, a_csv=b"other"), profile="weekly")
+    store.record_run("r2", _outputs(out, a_csv=b"1"), profile="monthly")
+
+    assert ArtifactStore(store.root).latest_manifest("monthly").changed == []
+    assert ArtifactStore(store.root).attachments_to_send("monthly") == []
+
+
+def test_stored_blob_is_not_linked_to_the_source(store, tmp_path):
+    (path,) = _outputs(tmp_path / "out", a_csv=b"original")
+    m = store.record_run("r1", [path])
+    path.write_bytes(b"rewritten in place")
+
+    assert store.blob_path(m.entries["a.csv"].digest).read_bytes() == b"original"
+    assert store.verify(full=True).ok
+
+
+def test_gc_removes_only_unreferenced_blobs(store, tmp_path):
+    out = tmp_path / "out"
+    store.record_run("r1", _outputs(out, a_csv=b"old"), profile="p")
+    store.record_run("r2", _outputs(out, a_csv=b"new"), profile="p")
+    old_digest = store.manifests()[0].entries["a.csv"].digest
+
+    store._drop_run(store.manifests()[0])
+    freed = store.gc({e.digest for m in store.manifests() for e in m.entries.values()})
+
+    assert freed == len(b"old")
+    assert not store.blob_path(old_digest).exists()
+    assert store.verify(full=True).ok
+
+
+def test_prune_keeps_the_latest_run_of_each_profile(store, tmp_path):
+    out = tmp_path / "out"
+    for i in range(3):
+        store.record_run(f"p{i}", _outputs(out, a_bin=bytes(100) + bytes([i])), profile="p")
+    store.record_run("q0", _outputs(out, a_bin=b"q" * 100), profile="q")
+
+    store.prune(max_bytes=1)
+
+    assert sorted(m.run_id for m in store.manifests()) == ["p2", "q0"]
+    assert len(list(store.objects_dir.glob("*/*"))) == 2
+
+
+def test_verify_reports_missing_and_corrupted_blobs(store, tmp_path):
+    m = store.record_run("r1", _outputs(tmp_path / "out", a_csv=b"aaaa", b_csv=b"bbbb"))
+    store.blob_path(m.entries["a.csv"].digest).unlink()
+    blob = store.blob_path(m.entries["b.csv"].digest)
+    blob.unlink()  # drop the run hardlink's sibling before rewriting
+    blob.write_bytes(b"bbbX")
+
+    report = store.verify()
+    assert report.missing == [m.entries["a.csv"].digest]
+    assert report.corrupted == []  # same size: only a full check sees it
+    assert store.verify(full=True).corrupted == [m.entries["b.csv"].digest]
@@ -0,0 +1,49 @@
+from reporting_hub.config.models import StepSpec
+from reporting_hub.services.checkpoints import Checkpoint, CheckpointStore, StepRecord, steps_signature
+
+
+def _checkpoint(saved):
+    return Checkpoint(
+        signature="sig",
+        run_id="r1",
+        excel_pid=4242,
+        excel_created=1000.0,
+        completed=[StepRecord(i, f"Step{i}", 1.0, s, 0.0) for i, s in enumerate(saved)],
+    )
+
+
+def test_same_instance_resumes_after_the_last_completed_step():
+    assert _checkpoint([False, True, False]).resume_index(4242, 1000.2) == 3
+
+
+def test_reused_pid_resumes_after_the_last_save_only():
+    # Same PID, later process: the unsaved results of step 3 are gone
+    assert _checkpoint([False, True, False]).resume_index(4242, 5000.0) == 2
+
+
+def test_unknown_creation_time_is_treated_as_another_instance():
+    assert _checkpoint([True, False]).resume_index(4242, None) == 1
+    old = _checkpoint([True, False])
+    old.excel_created = None  # checkpoint written before creation times were kept
+    assert old.resume_index(4242, 1000.0) == 1
+
+
+def test_nothing_saved_restarts_from_the_first_step():
+    assert _checkpoint([False, False]).resume_index(99, 1.0) == 0
+
+
+def test_store_round_trip(tmp_path):
+    store = CheckpointStore(tmp_path)
+    store.save(_checkpoint([True]))
+
+    loaded = store.load("sig")
+    assert loaded == _checkpoint([True])
+    store.clear("sig")
+    assert store.load("sig") is None
+
+
+def test_signature_follows_the_step_list():
+    steps = [StepSpec(macro="A"), StepSpec(macro="B")]
+    assert steps_signature("book", steps) == steps_signature("book", list(steps))
+    assert steps_signature("book", steps) != steps_signature("book", steps[::-1])
+    assert steps_signature("book", steps) != steps_signature("other", steps)
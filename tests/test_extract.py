@@ -0,0 +1,58 @@
+import csv
+
+import pytest
+
+from reporting_hub.services.extract import write_table
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+NA = -2146826246  # #N/A as returned by Value2
+DIV0 = -2146826281  # #DIV/0!
+
+
+def _csv(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_error_cells_are_written_as_blank_csv_cells(tmp_path):
+    out = tmp_path / "out.csv"
+    rows = write_table([[("id", "amount"), (1.0, 2.5), (2.0, NA), (3.0, DIV0)]], out)
+
+    assert rows == 3
+    assert _csv(out) == [["id", "amount"], ["1", "2.5"], ["2", ""], ["3", ""]]
+
+
+def test_error_cells_are_null_in_parquet(tmp_path):
+    out = tmp_path / "out.parquet"
+    write_table([[("id", "amount"), (1.0, NA), (2.0, 4.0)], [(3.0, DIV0)]], out)
+
+    table = pq.read_table(out)
+    assert table.column("amount").to_pylist() == [None, 4.0, None]
+    assert str(table.schema.field("amount").type) == "double"
+
+
+def test_float_equal_to_an_error_code_is_kept(tmp_path):
+    out = tmp_path / "out.csv"
+    write_table([[("v",), (float(NA),)]], out)
+
+    assert _csv(out)[1] == [str(NA)]
+
+
+def test_later_chunk_not_fitting_the_column_type_raises(tmp_path):
+    out = tmp_path / "out.parquet"
+    with pytest.raises(ValueError, match=r"Row 4, column 2 \(amount\)"):
+        write_table([[("id", "amount"), (1.0, 2.0), (2.0, 3.0)], [(3.0, "n/a")]], out)
+    assert not out.exists()
+
+
+def test_row_wider_than_the_header_raises(tmp_path):
+    with pytest.raises(ValueError, match="Row 3, column 3"):
+        write_table([[("a", "b"), (1.0, 2.0)], [(1.0, 2.0, 3.0)]], tmp_path / "out.csv")
+
+
+def test_blank_first_chunk_column_accepts_later_values(tmp_path):
+    out = tmp_path / "out.parquet"
+    write_table([[("a", "b"), (1.0, None)], [(2.0, "late")]], out)
+
+    assert pq.read_table(out).column("b").to_pylist() == [None, "late"]
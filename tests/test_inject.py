@@ -0,0 +1,64 @@
+import pytest
+
+from reporting_hub.services.inject import _cell, open_input
+
+
+def _rows(path, **kwargs):
+    source = open_input(path, **kwargs)
+    return [row for chunk in source.chunks() for row in chunk]
+
+
+@pytest.mark.parametrize(
+    "text, value",
+    [
+        ("12", 12.0),
+        ("-1.5", -1.5),
+        ("0.25", 0.25),
+        ("1e3", 1000.0),
+        ("", None),
+        ("00123", "00123"),  # leading zero: an ID
+        ("1234567890123456", "1234567890123456"),  # 16 digits: beyond Excel's precision
+        ("123456789012345", 123456789012345.0),
+        ("1,5", "1,5"),  # comma only counts in ";" files
+        ("abc", "abc"),
+    ],
+)
+def test_cell(text, value):
+    assert _cell(text) == value
+
+
+@pytest.mark.parametrize(
+    "text, value",
+    [("1,5", 1.5), ("-0,25", -0.25), ("1 234,5", 1234.5), ("1 234", 1234.0), ("1.5", 1.5), ("0,5", 0.5)],
+)
+def test_cell_decimal_comma(text, value):
+    assert _cell(text, decimal_comma=True) == value
+
+
+def test_semicolon_csv_reads_decimal_commas(tmp_path):
+    path = tmp_path / "in.csv"
+    path.write_text("compte;montant;libellé\n00012;1,5;a\n12345678901234567;-2,25;b\n", encoding="utf-8")
+
+    assert _rows(path) == [("00012", 1.5, "a"), ("12345678901234567", -2.25, "b")]
+
+
+def test_comma_csv_keeps_quoted_decimal_commas_as_text(tmp_path):
+    path = tmp_path / "in.csv"
+    path.write_text('id,amount\n1,"1,5"\n2,3.5\n', encoding="utf-8")
+
+    assert _rows(path) == [(1.0, "1,5"), (2.0, 3.5)]
+
+
+def test_short_rows_are_padded(tmp_path):
+    path = tmp_path / "in.csv"
+    path.write_text("a,b,c\n1,2\n", encoding="utf-8")
+
+    assert _rows(path) == [(1.0, 2.0, None)]
+
+
+def test_row_wider_than_the_first_raises_with_its_line(tmp_path):
+    path = tmp_path / "in.csv"
+    path.write_text("a,b\n1,2\n3,4,5\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="line 3"):
+        _rows(path)
@@ -0,0 +1,131 @@
+import multiprocessing as mp
+import os
+import threading
+import time
+
+import pytest
+
+from reporting_hub.excel.controller import ExcelController
+from reporting_hub.services.lease import LeaseManager, RunBusy
+from reporting_hub.services.macro_runner import MacroRunner, RunCancelled, RunRequest
+
+PROCESSES = 16
+ROUNDS = 8
+
+
+def _contend(directory, workbook, index, rounds, tried, released, results):
+    manager = LeaseManager(directory, ttl_s=30.0, poll_s=0.05)
+    for r in range(rounds):
+        tried.wait(timeout=60)  # everybody starts the round at once
+        lease, _ = manager.try_acquire(workbook, f"run-{r}-{index}")
+        results.put((r, index, lease is not None))
+        released.wait(timeout=60)  # the winner holds the lease until all have tried
+        if lease is not None:
+            lease.release(True)
+
+
+def _acquire_and_die(directory, workbook):
+    lease, _ = LeaseManager(directory, ttl_s=30.0).try_acquire(workbook, "crashed")
+    assert lease is not None
+    os._exit(0)  # no release: the lease file still says "running"
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "Pilot.xlsm"
+    path.write_bytes(b"")
+    return str(path)
+
+
+def test_exactly_one_process_wins_each_round(tmp_path, workbook):
+    tried = mp.Barrier(PROCESSES)
+    released = mp.Barrier(PROCESSES)
+    results = mp.Queue()
+    procs = [
+        mp.Process(
+            target=_contend,
+            args=(str(tmp_path / "leases"), workbook, i, ROUNDS, tried, released, results),
+        )
+        for i in range(PROCESSES)
+    ]
+    for p in procs:
+        p.start()
+    outcomes = [results.get(timeout=120) for _ in range(PROCESSES * ROUNDS)]
+    for p in procs:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+    for r in range(ROUNDS):
+        winners = [i for rr, i, won in outcomes if rr == r and won]
+        assert len(winners) == 1, f"round {r}: {winners}"
+
+
+def test_lease_of_a_dead_process_is_taken_over(tmp_path, workbook):
+    p = mp.Process(target=_acquire_and_die, args=(str(tmp_path), workbook))
+    p.start()
+    p.join(timeout=60)
+
+    manager = LeaseManager(str(tmp_path), ttl_s=30.0)
+    assert manager.read(workbook).run_id == "crashed"
+    lease, holder = manager.try_acquire(workbook, "next")
+    assert lease is not None and holder is None
+    lease.release(True)
+
+
+def test_expired_lease_is_taken_over_and_the_old_holder_notices(tmp_path, workbook):
+    first = LeaseManager(str(tmp_path), ttl_s=1.0, heartbeat_s=60.0)
+    second = LeaseManager(str(tmp_path), ttl_s=1.0)
+    old, _ = first.try_acquire(workbook, "slow")
+    assert second.try_acquire(workbook, "too-early")[0] is None
+
+    time.sleep(1.2)  # no heartbeat for longer than the TTL
+    new, _ = second.try_acquire(workbook, "after-expiry")
+    assert new is not None
+    old.release(True)
+    assert old.lost
+    assert second.read(workbook).run_id == "after-expiry"
+    new.release(True)
+
+
+def test_follow_returns_the_final_state(tmp_path, workbook):
+    manager = LeaseManager(str(tmp_path), ttl_s=30.0, poll_s=0.05)
+    lease, _ = manager.try_acquire(workbook, "held")
+    seen = []
+
+    def finish():
+        time.sleep(0.2)
+        lease.update("run")
+        time.sleep(0.2)
+        lease.release(False)
+
+    threading.Thread(target=finish).start()
+    final = LeaseManager(str(tmp_path), ttl_s=30.0, poll_s=0.05).follow(
+        workbook, on_status=lambda info: seen.append(info.status)
+    )
+    assert final is not None and final.state == "done" and final.ok is False
+    assert seen and seen[0] == "starting"
+
+
+def test_wait_acquire_returns_when_cancelled(tmp_path, workbook):
+    manager = LeaseManager(str(tmp_path), ttl_s=30.0, poll_s=0.05)
+    lease, _ = manager.try_acquire(workbook, "held")
+    stop = threading.Event()
+    threading.Timer(0.2, stop.set).start()
+
+    assert LeaseManager(str(tmp_path), ttl_s=30.0, poll_s=0.05).wait_acquire(workbook, "w", stop=stop) is None
+    lease.release(True)
+
+
+@pytest.mark.parametrize(
+    "on_busy, error", [("abort", RunBusy), ("wait", RunCancelled), ("attach", RunCancelled)]
+)
+def test_runner_gives_up_on_a_busy_workbook(tmp_path, workbook, on_busy, error):
+    manager = LeaseManager(str(tmp_path), ttl_s=30.0, poll_s=0.05)
+    lease, _ = manager.try_acquire(workbook, "held")
+    cancel = threading.Event()
+    cancel.set()  # worker stopping
+    runner = MacroRunner(controller=ExcelController(), leases=manager, on_busy=on_busy, cancel=cancel)
+
+    with pytest.raises(error):
+        runner.run(RunRequest(workbook_path=workbook, macro_name="Main", args=[]))
+    lease.release(True)
@@ -0,0 +1,226 @@
+from typing import Dict, List, Optional
+
+import pytest
+
+from reporting_hub.config.models import LaunchProfile
+from reporting_hub.excel import addins
+from reporting_hub.excel.addins import AddinSetup, AddinStateStore, StartupAddins
+from reporting_hub.excel.attach import AttachStore
+from reporting_hub.excel.lifecycle import (
+    ExcelLifecycle,
+    InstanceRecord,
+    PidRegistry,
+    ProcessInfo,
+    ProcessTable,
+)
+
+
+class FakeTable(ProcessTable):
+    def __init__(self, processes: List[ProcessInfo]):
+        self.processes: Dict[int, ProcessInfo] = {p.pid: p for p in processes}
+        self.terminated: List[int] = []
+
+    def info(self, pid: int) -> Optional[ProcessInfo]:
+        return self.processes.get(pid)
+
+    def terminate(self, pid: int) -> bool:
+        self.terminated.append(pid)
+        self.processes.pop(pid, None)
+        return True
+
+
+OWNER = ProcessInfo(pid=100, name="python.exe", created=1000.0)
+EXCEL = ProcessInfo(pid=200, name="excel.exe", created=2000.0)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return PidRegistry(tmp_path / "excel_pids.json")
+
+
+def _record(excel: ProcessInfo, owner: ProcessInfo = OWNER) -> InstanceRecord:
+    return InstanceRecord(excel.pid, excel.created, owner.pid, owner.created, launched_at=excel.created)
+
+
+def test_orphan_of_a_dead_owner_is_terminated(registry):
+    registry.add(_record(EXCEL))
+    table = FakeTable([EXCEL])  # owner gone
+
+    assert ExcelLifecycle(registry, table).reap_orphans() == 1
+    assert table.terminated == [EXCEL.pid]
+    assert registry.entries() == []
+
+
+def test_reused_pid_is_forgotten_not_terminated(registry):
+    registry.add(_record(EXCEL))
+    # Same PID, another process (later creation time)
+    table = FakeTable([ProcessInfo(pid=EXCEL.pid, name="excel.exe", created=EXCEL.created + 60)])
+
+    assert ExcelLifecycle(registry, table).reap_orphans() == 0
+    assert table.terminated == []
+    assert registry.entries() == []
+
+
+def test_reused_pid_by_another_image_is_not_terminated(registry):
+    registry.add(_record(EXCEL))
+    table = FakeTable([ProcessInfo(pid=EXCEL.pid, name="notepad.exe", created=EXCEL.created)])
+
+    assert ExcelLifecycle(registry, table).reap_orphans() == 0
+    assert table.terminated == []
+
+
+def test_instance_of_a_live_owner_is_kept(registry):
+    registry.add(_record(EXCEL))
+    table = FakeTable([OWNER, EXCEL])
+
+    assert ExcelLifecycle(registry, table).reap_orphans() == 0
+    assert table.terminated == []
+    assert [e.pid for e in registry.entries()] == [EXCEL.pid]
+
+
+def test_owner_pid_reused_counts_as_dead(registry):
+    registry.add(_record(EXCEL))
+    table = FakeTable([ProcessInfo(pid=OWNER.pid, name="python.exe", created=OWNER.created + 60), EXCEL])
+
+    assert ExcelLifecycle(registry, table).reap_orphans() == 1
+    assert table.terminated == [EXCEL.pid]
+
+
+def test_instance_kept_for_attach_is_not_reaped(registry, tmp_path):
+    registry.add(_record(EXCEL))
+    store = AttachStore(tmp_path / "excel_attach.json")
+    store.record(EXCEL.pid, str(tmp_path / "book.xlsm"))
+    table = FakeTable([EXCEL])
+
+    assert ExcelLifecycle(registry, table, attach_store=store).reap_orphans() == 0
+    assert table.terminated == []
+    assert [e.pid for e in registry.entries()] == [EXCEL.pid]
+
+
+def test_attach_state_of_a_reused_pid_does_not_keep_the_instance(registry, tmp_path):
+    registry.add(_record(EXCEL))
+    store = AttachStore(tmp_path / "excel_attach.json")
+    store.record(EXCEL.pid, str(tmp_path / "book.xlsm"), created=EXCEL.created - 60)
+    table = FakeTable([EXCEL])
+
+    assert ExcelLifecycle(registry, table, attach_store=store).reap_orphans() == 1
+
+
+def test_attach_store_starts_over_for_a_new_instance(tmp_path):
+    store = AttachStore(tmp_path / "excel_attach.json")
+    store.record(EXCEL.pid, str(tmp_path / "a.xlsm"), created=EXCEL.created)
+    store.record(EXCEL.pid, str(tmp_path / "b.xlsm"), created=EXCEL.created + 0.2)
+    assert [p[-6:] for p in store.load().workbooks] == ["a.xlsm", "b.xlsm"]
+
+    store.record(EXCEL.pid, str(tmp_path / "c.xlsm"), created=EXCEL.created + 60)
+    state = store.load()
+    assert state.created == EXCEL.created + 60 and not state.has(str(tmp_path / "a.xlsm"))
+
+
+def test_unregistered_excel_is_never_touched(registry):
+    users_excel = ProcessInfo(pid=300, name="excel.exe", created=3000.0)
+    registry.add(_record(EXCEL))
+    table = FakeTable([EXCEL, users_excel])
+
+    ExcelLifecycle(registry, table).reap_orphans()
+    assert users_excel.pid not in table.terminated
+    assert table.info(users_excel.pid) is users_excel
+
+
+class FakeAddin:
+    def __init__(self, prog_id: str, connect: bool = True):
+        self.ProgId = prog_id
+        self.Description = prog_id
+        self.Connect = connect
+
+
+class FakeExcel:
+    def __init__(self, addins: List[FakeAddin]):
+        self.COMAddIns = addins
+        self.AddIns: List[object] = []
+
+
+@pytest.fixture
+def written(monkeypatch):
+    values: Dict[str, int] = {}
+    monkeypatch.setattr(addins, "_load_behavior", lambda prog_id: 3)
+
+    def set_load_behavior(prog_id: str, value: int) -> bool:
+        values[prog_id] = value
+        return True
+
+    monkeypatch.setattr(addins, "_set_load_behavior", set_load_behavior)
+    return values
+
+
+def test_addin_states_are_recorded_before_disconnecting_and_cleared_on_restore(tmp_path, written):
+    store = AddinStateStore(tmp_path / "addin_states.json")
+    addin = FakeAddin("Vendor.Addin")
+    setup = AddinSetup(FakeExcel([addin]), lambda msg: None, store, excel_pid=EXCEL.pid)
+
+    setup.apply(LaunchProfile(lean=True))
+    assert addin.Connect is False
+    assert store.entries()["Vendor.Addin"]["connect"] is True
+
+    setup.restore()
+    assert addin.Connect is True
+    assert store.entries() == {}
+
+
+def test_addins_of_a_reaped_instance_are_restored_at_startup(registry, tmp_path, written):
+    store = AddinStateStore(tmp_path / "addin_states.json")
+    AddinSetup(FakeExcel([FakeAddin("Vendor.Addin")]), lambda msg: None, store, EXCEL.pid).apply(
+        LaunchProfile(lean=True)
+    )
+    registry.add(_record(EXCEL))
+    lifecycle = ExcelLifecycle(registry, FakeTable([EXCEL]), addin_store=store)
+
+    lifecycle.reap_orphans()
+    assert lifecycle.restore_addins() == 1
+    assert written == {"Vendor.Addin": 3}
+    assert store.entries() == {}
+
+
+def test_addins_of_a_running_instance_are_left_alone(registry, tmp_path, written):
+    store = AddinStateStore(tmp_path / "addin_states.json")
+    AddinSetup(FakeExcel([FakeAddin("Vendor.Addin")]), lambda msg: None, store, EXCEL.pid).apply(
+        LaunchProfile(lean=True)
+    )
+    lifecycle = ExcelLifecycle(registry, FakeTable([OWNER, EXCEL]), addin_store=store)
+
+    assert lifecycle.restore_addins() == 0
+    assert written == {}
+    assert list(store.entries()) == ["Vendor.Addin"]
+
+
+@pytest.fixture
+def registered(monkeypatch, written):
+    monkeypatch.setattr(
+        addins,
+        "_startup_addins",
+        lambda: {"Vendor.Addin": (3, "Vendor tools"), "Power.Pivot": (3, "Power Pivot")},
+    )
+    return written
+
+
+def test_unlisted_startup_addins_are_off_during_the_launch_only(tmp_path, registered):
+    store = AddinStateStore(tmp_path / "addin_states.json")
+    startup = StartupAddins(lambda msg: None, store)
+
+    startup.suppress(LaunchProfile(lean=True, addins=["power pivot"]))
+    assert registered == {"Vendor.Addin": 2}  # what the new instance reads at startup
+    assert store.entries()["Vendor.Addin"]["load_behavior"] == 3
+
+    startup.restore()
+    assert registered == {"Vendor.Addin": 3}
+    assert store.entries() == {}
+
+
+def test_launch_interrupted_before_restore_is_undone_at_next_start(registry, tmp_path, registered):
+    store = AddinStateStore(tmp_path / "addin_states.json")
+    StartupAddins(lambda msg: None, store).suppress(LaunchProfile(lean=True))
+    assert registered == {"Vendor.Addin": 2, "Power.Pivot": 2}
+
+    lifecycle = ExcelLifecycle(registry, FakeTable([OWNER]), addin_store=store)
+    assert lifecycle.restore_addins() == 2
+    assert registered == {"Vendor.Addin": 3, "Power.Pivot": 3}
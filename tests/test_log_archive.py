@@ -0,0 +1,91 @@
+import logging
+import multiprocessing as mp
+
+import pytest
+
+from reporting_hub.services.log_archive import (
+    ArchiveFormatter,
+    LogArchive,
+    SharedRotatingFileHandler,
+    format_lines,
+)
+
+
+def _write(path, *lines, **fields):
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        for msg in lines:
+            f.write(format_lines(msg, created=0.0, **fields))
+
+
+@pytest.fixture
+def archive(tmp_path):
+    log = tmp_path / "hub.log"
+    _write(log, "starting", "loaded 12 rows", run_id="r1", profile="monthly")
+    _write(log, "rows done", run_id="r2", profile="macro-42")
+    _write(log, "error: rows missing", run_id="r2", profile="macro-42", level="ERROR")
+    a = LogArchive(tmp_path, "hub.log")
+    a.refresh()
+    return a
+
+
+def _found(archive, text, **kwargs):
+    return [line.rsplit("| ", 1)[1] for line in archive.lines(archive.search(text, **kwargs))]
+
+
+def test_plain_search_and_filters(archive):
+    assert _found(archive, "rows") == ["loaded 12 rows", "rows done", "error: rows missing"]
+    assert _found(archive, "rows", run_id="r2") == ["rows done", "error: rows missing"]
+    assert _found(archive, "", profile="monthly") == ["starting", "loaded 12 rows"]
+
+
+def test_regex_anchors_are_line_bounds(archive):
+    assert _found(archive, r"rows$", regex=True) == ["loaded 12 rows"]
+    assert _found(archive, r"^\S+ \S+ ERROR", regex=True) == ["error: rows missing"]
+
+
+def test_regex_never_matches_across_lines(archive):
+    # "\s+" would run from "rows" over the line break into the next line
+    assert _found(archive, r"rows\s+\d{4}", regex=True) == []
+    assert _found(archive, r"starting[^x]*loaded", regex=True) == []
+    assert _found(archive, r"12\s+rows", regex=True) == ["loaded 12 rows"]
+
+
+def test_profiles_come_from_the_logs(archive):
+    assert archive.profiles() == ["macro-42", "monthly"]
+
+
+def test_rotated_files_keep_their_index(tmp_path):
+    log = tmp_path / "hub.log"
+    _write(log, "one", "two")
+    archive = LogArchive(tmp_path, "hub.log")
+    assert archive.refresh() == 2
+    index = archive._files[0]
+
+    log.rename(tmp_path / "hub.log.1")
+    _write(log, "three")
+    assert archive.refresh() == 3
+    assert archive._files[0] is index
+    assert [line.rsplit("| ", 1)[1] for line in archive.lines(range(3))] == ["one", "two", "three"]
+
+
+def _log_many(path, index, count):
+    handler = SharedRotatingFileHandler(path, maxBytes=4000, backupCount=100)
+    handler.setFormatter(ArchiveFormatter())
+    handler.terminator = ""
+    for i in range(count):
+        handler.handle(logging.makeLogRecord({"msg": f"process {index} line {i}", "levelname": "INFO"}))
+    handler.close()
+
+
+def test_several_processes_share_the_rotating_file(tmp_path):
+    procs = [mp.Process(target=_log_many, args=(tmp_path / "hub.log", i, 200)) for i in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+    archive = LogArchive(tmp_path, "hub.log")
+    assert archive.refresh() == 800
+    assert len(archive.files()) > 1
+    assert len(archive.search("process 3 line ")) == 200
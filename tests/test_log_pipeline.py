@@ -0,0 +1,70 @@
+import logging
+import threading
+
+import pytest
+
+from reporting_hub.utils.log import LogPipeline, get_logger, log_context, log_phase
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def pipeline():
+    handler = ListHandler()
+    p = LogPipeline([handler])
+    p.start()
+    yield p, handler
+    p.stop()
+
+
+def test_records_keep_the_context_of_the_producing_thread(pipeline):
+    p, handler = pipeline
+    log = get_logger("test")
+
+    def produce(n):
+        with log_context(f"run{n}", "monthly"), log_phase("macro"):
+            for i in range(50):
+                log.info("step %d of %s", i, n)
+
+    threads = [threading.Thread(target=produce, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    log.info("outside")
+    p.stop()
+
+    assert len(handler.records) == 201
+    for r in handler.records[:-1]:
+        assert r.msg.endswith(r.run_id[3:]) and r.profile == "monthly" and r.phase == "macro"
+    assert handler.records[-1].run_id == "" and handler.records[-1].args is None
+
+
+def test_exceptions_are_formatted_in_the_producer(pipeline):
+    p, handler = pipeline
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        get_logger("test").exception("failed")
+    p.stop()
+
+    (record,) = handler.records
+    assert record.exc_info is None and "ValueError: boom" in record.exc_text
+
+
+def test_gui_sink_receives_records_next_to_the_file_handlers(pipeline):
+    p, handler = pipeline
+    seen = []
+    p.set_gui_sink(lambda r: seen.append(r.getMessage()))
+    get_logger("test").info("to the gui")
+    p.stop()
+
+    assert seen == ["to the gui"]
+    assert [r.msg for r in handler.records] == ["to the gui"]
@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+
+import pytest
+
+from reporting_hub.config.models import RequiredInput
+from reporting_hub.excel.controller import ExcelController
+from reporting_hub.services.macro_runner import MacroRunner, RunCancelled, RunRequest
+from reporting_hub.services.readiness import ReadinessGate, format_status
+
+
+def _old(path, age_s=3600):
+    t = time.time() - age_s
+    os.utime(path, (t, t))
+
+
+def _status(tmp_path, *specs, **kwargs):
+    return ReadinessGate(list(specs), str(tmp_path), **kwargs).check()
+
+
+def test_missing_file(tmp_path):
+    (status,) = _status(tmp_path, RequiredInput("in/*.csv"))
+
+    assert not status.ready and status.reason == "missing"
+
+
+def test_quiet_file_is_ready_at_first_sight(tmp_path):
+    (tmp_path / "a.csv").write_text("x")
+    _old(tmp_path / "a.csv")
+
+    assert all(s.ready for s in _status(tmp_path, RequiredInput("*.csv")))
+
+
+def test_recent_file_is_changing_until_stable(tmp_path):
+    (tmp_path / "a.csv").write_text("x")
+    gate = ReadinessGate([RequiredInput("a.csv", stable_s=0.3)], str(tmp_path))
+
+    (status,) = gate.check()
+    assert status.reason == "changing (a.csv)" and 0 < status.wait_s <= 0.3
+    time.sleep(0.35)
+    assert gate.check()[0].ready
+
+
+def test_rewrite_restarts_the_stable_clock(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_text("x")
+    _old(path)
+    gate = ReadinessGate([RequiredInput("a.csv", stable_s=60)], str(tmp_path))
+    assert gate.check()[0].ready
+
+    path.write_text("xy")
+    assert gate.check()[0].reason == "changing (a.csv)"
+
+
+@pytest.mark.parametrize(
+    "sibling, reason",
+    [
+        ("~$book.xlsx", "locked (~$book.xlsx)"),
+        ("~$ok.xlsx", "locked (~$ok.xlsx)"),  # Office drops the first two characters
+        (".~lock.book.xlsx#", "locked (.~lock.book.xlsx#)"),
+        ("book.xlsx.partial", "being written (book.xlsx.partial)"),
+    ],
+)
+def test_lock_and_temp_siblings_block(tmp_path, sibling, reason):
+    (tmp_path / "book.xlsx").write_text("x")
+    (tmp_path / sibling).write_text("")
+    _old(tmp_path / "book.xlsx")
+
+    (status,) = _status(tmp_path, RequiredInput("book.xlsx"))
+    assert not status.ready and status.reason == reason
+
+
+def test_own_lock_is_not_waited_for(tmp_path):
+    (tmp_path / "book.xlsx").write_text("x")
+    (tmp_path / "~$book.xlsx").write_text("")
+    _old(tmp_path / "book.xlsx")
+
+    (status,) = _status(tmp_path, RequiredInput("book.xlsx"), own_locks=[str(tmp_path / "book.xlsx")])
+    assert status.ready
+
+
+def test_wait_returns_once_ready(tmp_path):
+    gate = ReadinessGate([RequiredInput("a.csv", stable_s=0.2)], str(tmp_path), poll_s=0.05)
+    seen = []
+    threading.Timer(0.1, (tmp_path / "a.csv").write_text, args=("x",)).start()
+
+    assert gate.wait(5.0, on_status=lambda st: seen.append(format_status(st)))
+    assert seen[0] == "a.csv: missing" and seen[-1] == "a.csv: changing (a.csv)"
+
+
+def test_wait_times_out_or_stops(tmp_path):
+    gate = ReadinessGate([RequiredInput("a.csv")], str(tmp_path), poll_s=0.05)
+    assert not gate.wait(0.2)
+
+    stop = threading.Event()
+    threading.Timer(0.1, stop.set).start()
+    t0 = time.monotonic()
+    assert not gate.wait(None, stop=stop)
+    assert time.monotonic() - t0 < 2.0
+
+
+def test_runner_gives_up_the_wait_when_cancelled(tmp_path):
+    cancel = threading.Event()
+    cancel.set()
+    runner = MacroRunner(controller=ExcelController(), cancel=cancel)
+    req = RunRequest(
+        workbook_path=str(tmp_path / "book.xlsm"),
+        macro_name="Main",
+        args=[],
+        requires=[RequiredInput("book.xlsm")],
+        wait_inputs_s=None,
+    )
+
+    assert runner.own_locks(req.workbook_path) == []  # no instance: nothing is ours
+    with pytest.raises(RunCancelled, match="book.xlsm: missing"):
+        runner._wait_inputs(req)
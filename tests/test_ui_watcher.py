@@ -0,0 +1,109 @@
+from typing import Dict, List, Tuple
+
+from reporting_hub.excel.ui_watcher import ExcelUIWatcher, UIWatcherService, WindowOps
+
+
+class FakeOps(WindowOps):
+    """Desktop of (hwnd, pid, class) windows; records what the watcher does."""
+
+    def __init__(self, windows: List[Tuple[int, int, str]], available: bool = False):
+        self.windows = windows
+        self._available = available
+        self.enumerations = 0
+        self.enforced: List[Tuple[int, str]] = []
+        self.brought: List[int] = []
+
+    def available(self) -> bool:
+        return self._available
+
+    def enumerate(self) -> List[Tuple[int, int]]:
+        self.enumerations += 1
+        return [(hwnd, pid) for hwnd, pid, _ in self.windows]
+
+    def class_name(self, hwnd) -> str:
+        classes: Dict[int, str] = {h: cls for h, _, cls in self.windows}
+        return classes.get(hwnd, "")
+
+    def enforce_main(self, hwnd, mode: str) -> None:
+        self.enforced.append((hwnd, mode))
+
+    def bring_dialog(self, hwnd) -> None:
+        self.brought.append(hwnd)
+
+
+def test_one_enumeration_serves_every_instance():
+    ops = FakeOps([(1, 10, "XLMAIN"), (2, 20, "XLMAIN"), (3, 30, "XLMAIN"), (4, 10, "EXCEL7")])
+    service = UIWatcherService(ops, main_enforce_period_s=0)
+    service.register(10, "hidden")
+    service.register(20)
+
+    service.tick()
+
+    assert ops.enumerations == 1
+    assert sorted(ops.enforced) == [(1, "hidden"), (2, "minimized"), (4, "hidden")]  # pid 30 is not ours
+
+
+def test_dialog_is_brought_once_and_pauses_main_enforcement():
+    ops = FakeOps([(1, 10, "XLMAIN")])
+    service = UIWatcherService(ops, main_enforce_period_s=0)
+    service.register(10)
+
+    ops.windows.append((5, 10, "#32770"))
+    for _ in range(3):
+        service.tick()
+    assert ops.brought == [5]
+    assert ops.enforced == [(1, "minimized")]  # once, when the dialog appeared
+
+    ops.windows.pop()
+    service.tick()
+    ops.windows.append((6, 10, "ThunderDFrame"))  # a UserForm after the MsgBox
+    service.tick()
+    assert ops.brought == [5, 6]
+
+
+def test_main_window_is_enforced_only_every_period():
+    ops = FakeOps([(1, 10, "XLMAIN")])
+    service = UIWatcherService(ops, main_enforce_period_s=3600)
+    service.register(10)
+
+    for _ in range(3):
+        service.tick()
+
+    assert ops.enforced == [(1, "minimized")]
+
+
+def test_unregistered_instance_is_left_alone():
+    ops = FakeOps([(1, 10, "XLMAIN")])
+    service = UIWatcherService(ops, main_enforce_period_s=0)
+    state = service.register(10)
+    service.register(10)  # a later instance reusing the PID replaced the state
+
+    service.unregister(state)
+    assert service.watched() == [10]
+    service.unregister(service._states[10])
+    service.tick()
+
+    assert service.watched() == [] and ops.enumerations == 0
+
+
+def test_watcher_handle_registers_and_follows_the_mode():
+    service = UIWatcherService(FakeOps([], available=True), poll_s=0.01)
+    watcher = ExcelUIWatcher(10, "bogus", service=service)
+    try:
+        watcher.start()
+        assert service.watched() == [10] and service._states[10].main_mode == "minimized"
+
+        watcher.set_main_mode("Visible")
+        assert service._states[10].main_mode == "visible"
+    finally:
+        watcher.stop()
+        service.stop()
+
+    assert service.watched() == []
+
+
+def test_nothing_is_registered_without_win32():
+    service = UIWatcherService(FakeOps([]))
+    ExcelUIWatcher(10, service=service).start()
+
+    assert service.watched() == []
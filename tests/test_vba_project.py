@@ -0,0 +1,177 @@
+import struct
+import zipfile
+
+import pytest
+
+from reporting_hub.services.preflight import ModuleCache, preflight
+from reporting_hub.services.vba_project import VbaError, _parse_dir, decompress, load_vba_modules
+
+# [MS-OVBA] 3.2 examples: (decompressed, compressed container)
+SPEC_EXAMPLES = [
+    (
+        b"abcdefghijklmnopqrstuv.",
+        "01 19 B0 00 61 62 63 64 65 66 67 68 00 69 6A 6B 6C 6D 6E 6F 70 00 71 72 73 74 75 76 2E",
+    ),
+    (
+        b"#aaabcdefaaaaghijaaaaaklaaamnopqaaaaaaaaaaaarstuvwxyzaaa",
+        "01 2F B0 00 23 61 61 61 62 63 64 65 82 66 00 70 61 67 68 69 6A 01 38 08 61 6B 6C 00 30"
+        " 6D 6E 6F 70 06 71 02 70 04 10 72 73 74 75 76 10 77 78 79 7A 00 3C",
+    ),
+    (b"a" * 73, "01 03 B0 02 61 45 00"),
+]
+
+
+def _compress(data):
+    """Compressed container: raw chunks for full 4096-byte blocks, literal tokens for the tail."""
+    out = bytearray(b"\x01")
+    for start in range(0, len(data), 4096):
+        chunk = data[start : start + 4096]
+        if len(chunk) == 4096:
+            out += struct.pack("<H", 0x3FFF) + chunk
+            continue
+        body = bytearray()
+        for i in range(0, len(chunk), 8):
+            body += b"\x00" + chunk[i : i + 8]
+        out += struct.pack("<H", 0xB000 | (len(body) + 2 - 3)) + body
+    return bytes(out)
+
+
+def _record(rid, data=b""):
+    return struct.pack("<HI", rid, len(data)) + data
+
+
+def _dir_stream(*modules):
+    d = _record(0x0003, struct.pack("<H", 1252))
+    for name, document in modules:
+        d += _record(0x0019, name.encode()) + _record(0x001A, name.encode())
+        d += _record(0x0031, struct.pack("<I", 0))
+        d += _record(0x0022 if document else 0x0021) + _record(0x002B)
+    return d
+
+
+def _entry(name, kind, left=0xFFFFFFFF, right=0xFFFFFFFF, child=0xFFFFFFFF, start=0xFFFFFFFE, size=0):
+    raw = (name + "\0").encode("utf-16-le") if name else b""
+    e = raw.ljust(64, b"\0") + struct.pack("<HBB3I", len(raw), kind, 1, left, right, child)
+    return e.ljust(0x74, b"\0") + struct.pack("<IQ", start, size)
+
+
+def _compound_file(streams):
+    """Minimal v3 [MS-CFB] file: Root > VBA > streams, all in regular sectors."""
+    sectors, entries = [], [None, None]
+    for i, (name, data) in enumerate(streams.items()):
+        start = len(sectors)
+        sectors += [data[o : o + 512].ljust(512, b"\0") for o in range(0, len(data), 512)] or [b"\0" * 512]
+        right = 3 + i if i + 1 < len(streams) else 0xFFFFFFFF
+        entries.append((_entry(name, 2, right=right, start=start, size=len(data)), start, len(sectors)))
+
+    n_dir = (len(entries) * 128 + 511) // 512
+    fat_sector, first_dir, first_data = 0, 1, 1 + n_dir
+    fat = [0xFFFFFFFD] + [first_dir + i + 1 for i in range(n_dir - 1)] + [0xFFFFFFFE]
+    dir_bytes = _entry("Root Entry", 5, child=1) + _entry("VBA", 1, child=2)
+    for raw, start, end in entries[2:]:
+        size = struct.unpack_from("<Q", raw, 0x78)[0]
+        dir_bytes += raw[:0x74] + struct.pack("<IQ", first_data + start, size)
+        fat += [first_data + n + 1 for n in range(start, end - 1)] + [0xFFFFFFFE]
+    fat = struct.pack(f"<{len(fat)}I", *fat).ljust(512, b"\xff")
+
+    header = bytearray(512)
+    header[:8] = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+    struct.pack_into("<HHHHH", header, 0x18, 0x3E, 3, 0xFFFE, 9, 6)
+    struct.pack_into("<IIII", header, 0x2C, 1, first_dir, 0, 0)  # cutoff 0: no mini stream
+    struct.pack_into("<IIII", header, 0x3C, 0xFFFFFFFE, 0, 0xFFFFFFFE, 0)
+    struct.pack_into("<109I", header, 0x4C, fat_sector, *[0xFFFFFFFF] * 108)
+    return bytes(header) + fat + dir_bytes.ljust(n_dir * 512, b"\0") + b"".join(sectors)
+
+
+MODULE1 = (
+    b'Attribute VB_Name = "Module1"\r\n'
+    b"Public Sub Main()\r\nEnd Sub\r\n"
+    b"Private Sub Helper()\r\nEnd Sub\r\n"
+    b"Function Total(x)\r\nEnd Function\r\n"
+)
+THIS_WORKBOOK = b'Attribute VB_Name = "ThisWorkbook"\r\nSub Workbook_Refresh()\r\nEnd Sub\r\n'
+
+
+@pytest.fixture
+def xlsm(tmp_path):
+    vba = _compound_file(
+        {
+            "dir": _compress(_dir_stream(("Module1", False), ("ThisWorkbook", True))),
+            "Module1": _compress(MODULE1 * 40),  # > 4096 bytes: several chunks
+            "ThisWorkbook": _compress(THIS_WORKBOOK),
+        }
+    )
+    path = tmp_path / "Book.xlsm"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("[Content_Types].xml", "<Types/>")
+        z.writestr("xl/vbaProject.bin", vba)
+    return path
+
+
+@pytest.mark.parametrize("plain, packed", SPEC_EXAMPLES)
+def test_decompress_spec_examples(plain, packed):
+    assert decompress(bytes.fromhex(packed)) == plain
+
+
+def test_decompress_raw_and_literal_chunks():
+    data = bytes(range(256)) * 20
+    assert decompress(_compress(data)) == data
+    assert decompress(_compress(b"Sub Main()")) == b"Sub Main()"
+
+
+def test_decompress_rejects_bad_containers():
+    with pytest.raises(VbaError, match="signature"):
+        decompress(b"\x00\x19\xb0")
+    with pytest.raises(VbaError, match="copy token"):
+        decompress(b"\x01\x03\xb0\x01\x00\x00")  # copy before any literal
+
+
+def test_parse_dir_reads_modules():
+    codepage, modules = _parse_dir(_dir_stream(("Module1", False), ("Feuil1", True)))
+
+    assert codepage == "cp1252"
+    assert [(m.name, m.stream, m.document) for m in modules] == [
+        ("Module1", "Module1", False),
+        ("Feuil1", "Feuil1", True),
+    ]
+
+
+def test_load_vba_modules_lists_procedures(xlsm):
+    module1, this_workbook = load_vba_modules(xlsm)
+
+    assert module1.procedures[:2] == ["Main", "Total"] and len(module1.procedures) == 80
+    assert set(module1.private) == {"Helper"}
+    assert this_workbook.document and this_workbook.procedures[0] == "Workbook_Refresh"
+
+
+def test_preflight_checks_macro_names(xlsm, tmp_path):
+    cache = ModuleCache(tmp_path / "cache.json")
+    res = preflight(str(xlsm), ["Module1.Main", "Module1.Helper", "Mian", "Workbook_Refresh"], cache)
+
+    assert not res.cached
+    assert res.warnings == ["'Helper' is declared Private in module 'Module1'."]
+    assert res.errors == [
+        "macro 'Mian' not found in the VBA project (did you mean 'Main'?)",
+        "'Workbook_Refresh' is in module 'ThisWorkbook': use 'ThisWorkbook.Workbook_Refresh'.",
+    ]
+    assert preflight(str(xlsm), ["Main"], ModuleCache(tmp_path / "cache.json")).cached
+
+
+def test_preflight_file_errors(tmp_path):
+    empty = tmp_path / "empty.xlsm"
+    empty.write_bytes(b"")
+    no_vba = tmp_path / "NoVba.xlsm"
+    with zipfile.ZipFile(no_vba, "w") as z:
+        z.writestr("[Content_Types].xml", "<Types/>")
+    broken = tmp_path / "Broken.xlsm"
+    with zipfile.ZipFile(broken, "w") as z:
+        z.writestr("xl/vbaProject.bin", b"not a compound file")
+    xlsx = tmp_path / "Book.xlsx"
+    xlsx.write_bytes(b"PK")
+
+    assert preflight(str(tmp_path / "missing.xlsm"), ["Main"]).errors[0].startswith("workbook not found")
+    assert preflight(str(empty), ["Main"]).errors[0].startswith("empty file")
+    assert "cannot contain macros" in preflight(str(xlsx), ["Main"]).errors[0]
+    assert preflight(str(no_vba), ["Main"]).errors == ["NoVba.xlsm has no VBA project."]
+    res = preflight(str(broken), ["Main"])
+    assert not res.errors and res.warnings[0].startswith("VBA project not readable")
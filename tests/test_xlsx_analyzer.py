@@ -0,0 +1,94 @@
+import json
+import zipfile
+
+import pytest
+
+from reporting_hub.services.xlsx_analyzer import analyze_workbook, scan_formula
+
+MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+WORKBOOK = f"""<workbook xmlns="{MAIN}" xmlns:r="{REL}"><sheets>
+<sheet name="Calc" sheetId="1" r:id="rId1"/><sheet name="Bloated" sheetId="2" r:id="rId2"/>
+</sheets></workbook>"""
+
+WORKBOOK_RELS = f"""<Relationships xmlns="{PKG_REL}">
+<Relationship Id="rId1" Type="{REL}/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="{REL}/worksheet" Target="worksheets/sheet2.xml"/>
+</Relationships>"""
+
+SHARED_STRINGS = f'<sst xmlns="{MAIN}"><si><t>label</t></si><si><t>OFFSET(</t></si></sst>'
+
+# B2:B4 share the master formula of B2; C2 only mentions NOW in a string
+SHEET1 = f"""<worksheet xmlns="{MAIN}"><dimension ref="A1:C4"/><sheetData>
+<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c></row>
+<row r="2"><c r="A2"><v>1</v></c>
+<c r="B2"><f t="shared" ref="B2:B4" si="0">OFFSET(A2,0,0)+SUM(A:A)</f><v>2</v></c>
+<c r="C2" t="str"><f>"NOW()"&amp;[1]Rates!A1</f><v>x</v></c></row>
+<row r="3"><c r="A3"><v>2</v></c><c r="B3"><f t="shared" si="0"/><v>3</v></c></row>
+<row r="4"><c r="A4"><v>3</v></c><c r="B4"><f t="shared" si="0"/><v>4</v></c></row>
+</sheetData></worksheet>"""
+
+SHEET2 = f"""<worksheet xmlns="{MAIN}"><dimension ref="A1:Z10000"/><sheetData>
+<row r="1"><c r="A1"><v>1</v></c><c r="B1" s="3"/></row>
+<row r="9999"><c r="Z9999" s="3"/></row>
+</sheetData></worksheet>"""
+
+
+@pytest.fixture
+def book(tmp_path):
+    path = tmp_path / "book.xlsx"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("xl/workbook.xml", WORKBOOK)
+        z.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS)
+        z.writestr("xl/sharedStrings.xml", SHARED_STRINGS)
+        z.writestr("xl/worksheets/sheet1.xml", SHEET1)
+        z.writestr("xl/worksheets/sheet2.xml", SHEET2)
+        z.writestr("xl/externalLinks/externalLink1.xml", f'<externalLink xmlns="{MAIN}"/>')
+    return path
+
+
+@pytest.mark.parametrize(
+    "formula, volatile, whole, external",
+    [
+        ("SUM(A1:B2)", {}, 0, 0),
+        ("INDIRECT(\"A\"&ROW())+now()", {"INDIRECT": 1, "NOW": 1}, 0, 0),
+        ('"OFFSET(A:A)"&A1', {}, 0, 0),  # string literals are ignored
+        ("SUM($A:$C)", {}, 1, 0),
+        ("SUM(3:3)", {}, 1, 0),
+        ("MYOFFSET(A1)+Sheet1!A1", {}, 0, 0),
+        ("VLOOKUP(A1,[2]Rates!$A$1:$B$9,2,0)", {}, 0, 1),
+        ("SUM(Table1[Amount])", {}, 0, 0),
+    ],
+)
+def test_scan_formula(formula, volatile, whole, external):
+    st = scan_formula(formula)
+
+    assert st.formulas == 1 and st.volatile == volatile
+    assert (st.whole_column_refs, st.external_refs) == (whole, external)
+
+
+def test_analyze_workbook(book):
+    report = analyze_workbook(book)
+    calc, bloated = report.sheets
+
+    assert (report.external_links, report.shared_strings) == (1, 2)
+    assert calc.formulas.formulas == 4
+    assert calc.formulas.volatile == {"OFFSET": 3}  # the master is charged to B3 and B4
+    assert calc.formulas.whole_column_refs == 3 and calc.formulas.external_refs == 1
+    assert (calc.cells, calc.value_cells, calc.shared_string_cells) == (9, 9, 2)
+    assert (calc.last_row, calc.last_col) == (4, 3) and not calc.bloated
+
+    # style-only cells count in <dimension> but not in the used extent
+    assert (bloated.cells, bloated.value_cells, bloated.last_row, bloated.last_col) == (3, 1, 1, 1)
+    assert bloated.declared_cells == 260_000 and bloated.bloated
+
+
+def test_report_outputs(book):
+    report = analyze_workbook(book)
+    data = json.loads(report.to_json())
+    text = report.to_text()
+
+    assert data["sheets"][1]["bloated"] is True and data["xml_bytes"] == report.xml_bytes
+    assert "volatile: OFFSET x3" in text and "bloated used range: A1:Z10000" in text
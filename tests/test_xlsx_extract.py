@@ -0,0 +1,130 @@
+import csv
+import zipfile
+
+import pytest
+
+from reporting_hub.services.ooxml import XlsxPackage
+from reporting_hub.services.xlsx_extract import (
+    Bounds,
+    extract_file,
+    iter_values,
+    parse_bounds,
+    resolve_source,
+)
+
+MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+WORKBOOK = f"""<workbook xmlns="{MAIN}" xmlns:r="{REL}"><sheets>
+<sheet name="Data" sheetId="1" r:id="rId1"/><sheet name="Other" sheetId="2" r:id="rId2"/>
+</sheets><definedNames>
+<definedName name="Amounts">Data!$B$1:$B$4</definedName>
+<definedName name="Local" localSheetId="0">Data!$A$1</definedName>
+</definedNames></workbook>"""
+
+WORKBOOK_RELS = f"""<Relationships xmlns="{PKG_REL}">
+<Relationship Id="rId1" Type="{REL}/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="{REL}/worksheet" Target="/xl/worksheets/sheet2.xml"/>
+<Relationship Id="rId3" Type="{REL}/sharedStrings" Target="sharedStrings.xml"/>
+</Relationships>"""
+
+SHARED_STRINGS = f"""<sst xmlns="{MAIN}" count="3" uniqueCount="3">
+<si><t>id</t></si>
+<si><t>amount</t></si>
+<si><r><t>Paris </t></r><r><t>Nord</t></r><rPh><t>pari</t></rPh></si>
+</sst>"""
+
+# Row 3 is missing; B4 is #N/A; D2 sits right of the header
+SHEET1 = f"""<worksheet xmlns="{MAIN}"><dimension ref="A1:D5"/><sheetData>
+<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c>
+<c r="C1" t="inlineStr"><is><t>site</t></is></c></row>
+<row r="2"><c r="A2"><v>1</v></c><c r="B2"><v>2.5</v></c>
+<c r="C2" t="s"><v>2</v></c><c r="D2" t="b"><v>1</v></c></row>
+<row r="4"><c r="A4"><v>3</v></c><c r="B4" t="e"><v>#N/A</v></c>
+<c r="C4" t="inlineStr"><is><r><t>Lyon</t></r></is></c></row>
+<row r="5"><c r="A5" s="1"/></row>
+</sheetData></worksheet>"""
+
+SHEET2 = f"""<worksheet xmlns="{MAIN}"><dimension ref="A1"/><sheetData>
+<row><c><v>10</v></c><c t="str"><v>x</v></c></row>
+<row><c><v>20</v></c></row>
+</sheetData></worksheet>"""
+
+SHEET2_RELS = f"""<Relationships xmlns="{PKG_REL}">
+<Relationship Id="rId1" Type="{REL}/table" Target="../tables/table1.xml"/>
+</Relationships>"""
+
+TABLE = f'<table xmlns="{MAIN}" id="1" name="Table1" displayName="tblOther" ref="A1:B2"/>'
+
+
+@pytest.fixture
+def book(tmp_path):
+    path = tmp_path / "book.xlsx"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("xl/workbook.xml", WORKBOOK)
+        z.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS)
+        z.writestr("xl/sharedStrings.xml", SHARED_STRINGS)
+        z.writestr("xl/worksheets/sheet1.xml", SHEET1)
+        z.writestr("xl/worksheets/sheet2.xml", SHEET2)
+        z.writestr("xl/worksheets/_rels/sheet2.xml.rels", SHEET2_RELS)
+        z.writestr("xl/tables/table1.xml", TABLE)
+    return path
+
+
+def _rows(path, source, **kwargs):
+    return [row for block in iter_values(path, source, **kwargs) for row in block]
+
+
+def test_sheet_name_reads_the_used_range(book):
+    assert _rows(book, "Data") == [
+        ["id", "amount", "site", None],
+        [1.0, 2.5, "Paris Nord", True],
+        [None, None, None, None],
+        [3.0, None, "Lyon", None],
+        [None, None, None, None],
+    ]
+
+
+def test_area_and_chunks(book):
+    blocks = list(iter_values(book, "'Data'!B2:C4", chunk_rows=2))
+
+    assert blocks == [[[2.5, "Paris Nord"], [None, None]], [[None, "Lyon"]]]
+
+
+def test_defined_name_and_table(book):
+    assert _rows(book, "amounts") == [["amount"], [2.5], [None], [None]]
+    assert _rows(book, "tblOther") == [[10.0, "x"], [20.0, None]]
+
+
+def test_open_bounds(book):
+    assert _rows(book, "Data!C:D")[:2] == [["site", None], ["Paris Nord", True]]
+    assert _rows(book, "Other") == [[10.0, "x"], [20.0]]  # "A1" dimension: rows as long as their data
+    assert _rows(book, "Data!2:2") == [[1.0, 2.5, "Paris Nord", True]]
+
+
+def test_unknown_sources_raise(book):
+    with XlsxPackage(book) as pkg:
+        with pytest.raises(ValueError, match="Sheet not found: Nope"):
+            resolve_source(pkg, "Nope!A1")
+        with pytest.raises(ValueError, match="Range not found: Local"):
+            resolve_source(pkg, "Local")  # sheet-scoped names are not looked up
+
+
+def test_parse_bounds():
+    assert parse_bounds("$B$5") == Bounds(5, 2, 5, 2)
+    assert parse_bounds("D:A") == Bounds(1, 1, None, 4)
+    assert parse_bounds("10:3") == Bounds(3, 1, 10, None)
+
+
+def test_extract_file_writes_error_cells_as_blanks(book, tmp_path):
+    out = tmp_path / "out.csv"
+    assert extract_file(book, "Data!A1:C4", out) == 3
+
+    with open(out, encoding="utf-8", newline="") as f:
+        assert list(csv.reader(f)) == [
+            ["id", "amount", "site"],
+            ["1", "2.5", "Paris Nord"],
+            ["", "", ""],
+            ["3", "", "Lyon"],
+        ]